@@ -2,6 +2,9 @@ import sqlite3
 import pickle
 import streamlit as st
 from src.SearchEngine import SearchEngine
+from src.RegistreMoteurs import RegistreMoteurs
+from src.RechercheFederee import RechercheFederee
+from src.GenerateurExtraits import GenerateurExtraits
 from src.ClassificateurThemesDiscours import ClassificateurThemesDiscours
 import pandas as pd
 from datetime import datetime
@@ -10,6 +13,7 @@ from wordcloud import WordCloud
 import matplotlib.pyplot as plt
 import tempfile
 import base64
+from collections import Counter
 from src.constantes import *
 
 class StreamlitApp:
@@ -24,6 +28,10 @@ class StreamlitApp:
         """
         self.resultats_par_corpus = {}
         self.resultats_corpus_discours = {}
+        self.top_k_global = pd.DataFrame()
+        self.durees_corpus = {}
+        self.corpus_expires = []
+        self.suggestion = None
 
     def inject_css(self, file_name="streamlit_style.css"):
         """
@@ -119,6 +127,19 @@ class StreamlitApp:
                     valeur = THEMESCORPUS[theme]
                     liste_noms_corpus.extend(valeur)
 
+        # Les corpus indexés sont interrogés en parallèle ; les corpus classifiés sont lus ensuite
+        noms_moteurs = [nom for nom in liste_noms_corpus if not (nom.startswith("csv") and nom != "csvdiscours")]
+        parametres = dict(n_resultats=nombre_docs, auteur=auteur, date_debut=date_debut, date_fin=date_fin)
+        federation = self.recherche_index_unifie(noms_moteurs, mot_cle, parametres) if INDEX_UNIFIE else None
+        if federation is None:
+            federation = RechercheFederee().rechercher(noms_moteurs, mot_cle, **parametres)
+        self.top_k_global = federation["top_k"]
+        self.durees_corpus = federation["durees"]
+        self.corpus_expires = federation["expires"]
+        for nom_corpus, duree in self.durees_corpus.items():
+            print(f"Corpus '{nom_corpus}' : {duree * 1000:.1f} ms")
+        self.suggestion = self.suggestion_requete([NOM_CORPUS_UNIFIE] if INDEX_UNIFIE else noms_moteurs, mot_cle)
+
         for nom_corpus in liste_noms_corpus:
             print("nom_corpus resultat ", nom_corpus)
             if nom_corpus.startswith("csv") and nom_corpus != "csvdiscours":
@@ -135,17 +156,58 @@ class StreamlitApp:
                 } for chemin_document, score in documents_scores
                     for document in [self.charger_document_par_chemin(chemin_document)]
                     if mot_cle.lower() in document.texte.lower()])
+            elif nom_corpus in federation["resultats_par_corpus"]:
+                resultats = federation["resultats_par_corpus"][nom_corpus]
             else:
-                moteur = SearchEngine(nom_corpus)
-                resultats = moteur.search(
-                    mot_cle,
-                    n_resultats=nombre_docs,
-                    auteur=auteur,
-                    date_debut=date_debut,
-                    date_fin=date_fin
-                )
+                continue
             self.resultats_par_corpus[nom_corpus] = resultats
 
+    def suggestion_requete(self, noms_corpus, mot_cle):
+        """
+        @brief Cherche une correction de la requête ("Vouliez-vous dire...") dans les corpus interrogés.
+        @details Les moteurs sont pris dans le registre, où la recherche vient de les charger.
+        @param noms_corpus Noms des corpus interrogés.
+        @param mot_cle Mots-clés recherchés.
+        @return Requête corrigée proposée par le plus de corpus, ou None si aucun mot n'a été corrigé.
+        """
+        suggestions = Counter()
+        for nom_corpus in noms_corpus:
+            try:
+                suggestion = RegistreMoteurs().obtenir(nom_corpus).suggestion(mot_cle)
+            except ValueError as e:
+                print(f"Suggestion indisponible pour '{nom_corpus}' : {e}")
+                continue
+            if suggestion:
+                suggestions[suggestion] += 1
+        return suggestions.most_common(1)[0][0] if suggestions else None
+
+    def recherche_index_unifie(self, noms_corpus, mot_cle, parametres):
+        """
+        @brief Effectue la recherche dans l'index unifié, la sélection de corpus devenant un filtre.
+        @param noms_corpus Noms des corpus sélectionnés.
+        @param mot_cle Mots-clés recherchés.
+        @param parametres Paramètres de SearchEngine.search (nombre de résultats, auteur, dates).
+        @return Dictionnaire au format de RechercheFederee.rechercher, ou None si l'index unifié n'est pas disponible.
+        """
+        try:
+            moteur = RegistreMoteurs().obtenir(NOM_CORPUS_UNIFIE)
+        except ValueError as e:
+            print(f"Index unifié indisponible, recherche corpus par corpus : {e}")
+            return None
+
+        resultats_par_corpus, durees = {}, {}
+        for nom_corpus in noms_corpus:
+            debut = datetime.now()
+            resultats_par_corpus[nom_corpus] = moteur.search(mot_cle, noms_corpus=[nom_corpus], **parametres)
+            durees[nom_corpus] = (datetime.now() - debut).total_seconds()
+        return {
+            "resultats_par_corpus": resultats_par_corpus,
+            "top_k": moteur.search(mot_cle, noms_corpus=noms_corpus, **parametres),
+            "durees": durees,
+            "expires": [],
+            "erreurs": {},
+        }
+
     def afficher_resultats(self, choix_recherche, mot_cle, auteur,date_debut,date_fin):
         """
         @brief Affiche les résultats de recherche dans différents formats.
@@ -157,10 +219,20 @@ class StreamlitApp:
         """
         col1, col2 = st.columns([1, 3])
         with col2:
-            
+            if self.corpus_expires:
+                st.warning(f"Corpus sans réponse dans le délai imparti : {', '.join(self.corpus_expires)}")
+            if self.suggestion:
+                st.info(f"Vouliez-vous dire : **{self.suggestion}** ?")
+
             # choix recherche textuelle
             if choix_recherche["Recherche textuelle"]:
                 resultats_trouves = False  # Ajout d'un drapeau pour suivre l'état des résultats trouvés
+                # Classement global : meilleurs documents tous corpus confondus, avant le détail par corpus
+                if len(self.resultats_par_corpus) > 1 and not self.top_k_global.empty:
+                    st.subheader("Meilleurs résultats, tous corpus confondus")
+                    for rang, row in enumerate(self.top_k_global.itertuples(index=False), start=1):
+                        st.write(f"{rang}. **{row.Titre}** ({row.Corpus}) : score {row.Score:.2f}, {row.URL}")
+                    st.markdown("---")
                 corpus_trie = sorted(self.resultats_par_corpus.items(), key=lambda x: len(x[1]), reverse=True)            
                 for corpus, resultats in corpus_trie:
                     if not resultats.empty:
@@ -177,7 +249,11 @@ class StreamlitApp:
                             st.write(f"**Titre :** {row['Titre']}")
                             st.write(f"**Auteur :** {row.get('Auteur', 'Non disponible')}")
                             st.write(f"**Date :** {row.get('Date', 'Non disponible')}")
-                            st.write(f"**Extrait :** {row.get('Extrait', 'Pas d extrait disponible')}")
+                            extrait = row.get('Extrait', 'Pas d extrait disponible')
+                            surlignages = row.get('Surlignages')
+                            if isinstance(surlignages, list):
+                                extrait = GenerateurExtraits.surligner(extrait, surlignages)
+                            st.write(f"**Extrait :** {extrait}")
                             st.write(f"**URL :** {row.get('URL', 'Non disponible')}")
                             st.write(f"**Score :** {row['Score']:.2f}")
                             st.markdown("---")
@@ -352,7 +428,12 @@ class StreamlitApp:
         mot_cle, themes_selectionnes, date_debut, date_fin, auteur, sources, nombre_docs, choix_recherche = self.filtres()
         if any(choix_recherche.values()) and mot_cle:
             
-            self.resultats_corpus(mot_cle, themes_selectionnes, sources, nombre_docs, auteur, date_debut, date_fin)
+            try:
+                self.resultats_corpus(mot_cle, themes_selectionnes, sources, nombre_docs, auteur, date_debut, date_fin)
+            except ValueError as e:
+                # Requête refusée par le moteur (par exemple un motif "*ati*" sans préfixe ni suffixe)
+                st.error(str(e))
+                return
             self.afficher_resultats(choix_recherche, mot_cle, auteur,date_debut,date_fin)
 
 if __name__ == "__main__":
@@ -3,6 +3,7 @@ import os
 import pickle
 from src.Corpus import Corpus
 from src.SearchEngine import SearchEngine
+from src.RegistreMoteurs import RegistreMoteurs
 from dotenv import load_dotenv
 import time
 from src.constantes import *
@@ -73,7 +74,7 @@ def main():
     # Bouton de recherche
     if st.button("Rechercher"):
         st.write("Recherche en cours...")
-        moteur = SearchEngine(nom_corpus=nom_corpus)
+        moteur = RegistreMoteurs().obtenir(nom_corpus)
         
         debut = time.time()
         # Exécution de la recherche
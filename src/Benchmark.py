@@ -0,0 +1,874 @@
+import os
+import re
+import fnmatch
+import time
+import string
+import shutil
+import tempfile
+import tracemalloc
+import pickle
+import unicodedata
+import numpy as np
+import pandas as pd
+from scipy.sparse import vstack
+from datetime import date
+# Les mesures portent sur le calcul des résultats : le cache est désactivé sauf pour mesurer_cache()
+os.environ.setdefault("TAILLE_CACHE_RESULTATS", "0")
+
+from src.SearchEngine import SearchEngine
+from src.CacheResultats import CacheResultats
+from src.RegistreMoteurs import RegistreMoteurs
+from src.RechercheFederee import RechercheFederee
+from src.Utils import Utils
+from src.GenerateurExtraits import GenerateurExtraits
+from src.Tokeniseur import Tokeniseur
+from src.MagasinDocuments import MagasinDocuments
+from src.MatriceCSR import MatriceCSR
+from src.IndexInverse import IndexInverse
+from src.Vocabulaire import Vocabulaire
+from src.IndexCorrections import IndexCorrections
+from src.RequeteBooleenne import RequeteBooleenne
+from src.SegmentPostings import SegmentPostings
+from src.ScoresParBlocs import ScoresParBlocs
+from src.Corpus import Corpus
+from src.MatriceDocuments import MatriceDocuments
+from src.IndexFragmente import IndexFragmente
+from src.constantes import *
+
+"""
+@file Benchmark.py
+@brief Mesures de performance du moteur de recherche.
+
+@details
+Chaque méthode mesure un aspect du moteur sur les corpus du dossier DataPkl et affiche les temps obtenus.
+Exécution : python -m src.Benchmark
+"""
+
+REQUETES_BENCHMARK = ["climate", "public college", "health care", "america", "jobs", "we are going", "the"]
+"""
+@var REQUETES_BENCHMARK
+@brief Requêtes utilisées par défaut pour les mesures (mots rares, fréquents et expressions).
+"""
+
+
+class Benchmark:
+    """
+    @brief Classe utilitaire regroupant les mesures de performance.
+    """
+
+    @staticmethod
+    def chronometrer(fonction, repetitions=20):
+        """
+        @brief Mesure le temps moyen d'exécution d'une fonction.
+        @param fonction Fonction sans argument à exécuter.
+        @param repetitions Nombre d'exécutions.
+        @return Temps moyen en millisecondes.
+        """
+        fonction()  # échauffement
+        debut = time.perf_counter()
+        for _ in range(repetitions):
+            fonction()
+        return (time.perf_counter() - debut) * 1000 / repetitions
+
+    @staticmethod
+    def comparer_calcul_scores(nom_corpus="csvdiscours", requetes=REQUETES_BENCHMARK, repetitions=50):
+        """
+        @brief Compare le calcul des scores par index inversé et par produit matrice CSR x vecteur.
+        @param nom_corpus Nom du corpus à utiliser.
+        @param requetes Liste des requêtes mesurées.
+        @param repetitions Nombre d'exécutions par requête.
+        @return Dictionnaire {requete: (temps_index_ms, temps_csr_ms)}.
+        """
+        moteur = SearchEngine(nom_corpus)
+        mesures = {}
+        print(f"\nCalcul des scores sur '{nom_corpus}' ({moteur.mat_TFxIDF.shape[0]} documents)")
+        for requete in requetes:
+            moteur.calcul_scores = "index"
+            temps_index = Benchmark.chronometrer(lambda: moteur.calculer_scores(requete), repetitions)
+            moteur.calcul_scores = "csr"
+            temps_csr = Benchmark.chronometrer(lambda: moteur.calculer_scores(requete), repetitions)
+            termes_ids, _ = moteur.termes_requete(requete)
+            postings = sum(moteur.index.longueur_postings(t) for t in termes_ids)
+            mesures[requete] = (temps_index, temps_csr)
+            print(f"  {requete!r:18} postings={postings:6d}  index={temps_index:7.3f} ms  csr={temps_csr:7.3f} ms")
+        moteur.calcul_scores = "index"
+        return mesures
+
+    @staticmethod
+    def comparer_ponderations(nom_corpus="RedditArxivhealth", requetes=REQUETES_BENCHMARK, k=10, repetitions=50):
+        """
+        @brief Compare TF-IDF et BM25 : longueur moyenne des k premiers documents et temps de calcul des scores.
+        @param nom_corpus Nom du corpus à utiliser.
+        @param requetes Liste des requêtes mesurées.
+        @param k Nombre de premiers documents examinés.
+        @param repetitions Nombre d'exécutions par requête.
+        @return Dictionnaire {requete: {ponderation: (longueur_moyenne_top_k, temps_ms)}}.
+        """
+        moteurs = {ponderation: SearchEngine(nom_corpus, ponderation=ponderation) for ponderation in SearchEngine.PONDERATIONS}
+        longueurs = moteurs["bm25"].longueurs
+        mesures = {}
+        print(f"\nPondérations sur '{nom_corpus}' (longueur moyenne des documents : {longueurs['longueur_moyenne']:.0f} mots)")
+        for requete in requetes:
+            mesures[requete] = {}
+            for ponderation, moteur in moteurs.items():
+                doc_ids, scores = moteur.calculer_scores(requete)
+                premiers = doc_ids[Utils.selection_top_k(doc_ids, scores, k)]
+                longueur = float(longueurs["longueurs"][premiers].mean()) if len(premiers) else 0.0
+                temps = Benchmark.chronometrer(lambda: moteur.calculer_scores(requete), repetitions)
+                mesures[requete][ponderation] = (longueur, temps)
+            print(f"  {requete!r:18} " + "  ".join(
+                f"{ponderation}: longueur top-{k}={longueur:7.0f} scores={temps:6.3f} ms"
+                for ponderation, (longueur, temps) in mesures[requete].items()))
+        return mesures
+
+    @staticmethod
+    def comparer_selection_top_k(nom_corpus="csvdiscours", requetes=REQUETES_BENCHMARK, k=20, repetitions=50):
+        """
+        @brief Compare la sélection partielle des k meilleurs documents au tri complet des candidats.
+        @param nom_corpus Nom du corpus à utiliser.
+        @param requetes Liste des requêtes mesurées.
+        @param k Nombre de résultats retenus.
+        @param repetitions Nombre d'exécutions par requête.
+        @return Dictionnaire {requete: (temps_top_k_ms, temps_tri_ms)}.
+        """
+        moteur = SearchEngine(nom_corpus)
+        mesures = {}
+        print(f"\nSélection des {k} meilleurs documents sur '{nom_corpus}'")
+        for requete in requetes:
+            doc_ids, scores = moteur.calculer_scores(requete)
+
+            def tri_complet():
+                resultats = [(moteur.documents[doc_id], score) for doc_id, score in zip(doc_ids, scores)]
+                return sorted(resultats, key=lambda x: x[1], reverse=True)[:k]
+
+            temps_top_k = Benchmark.chronometrer(lambda: moteur.meilleurs_documents(doc_ids, scores, k), repetitions)
+            temps_tri = Benchmark.chronometrer(tri_complet, repetitions)
+            mesures[requete] = (temps_top_k, temps_tri)
+            print(f"  {requete!r:18} candidats={len(doc_ids):6d}  top-k={temps_top_k:7.3f} ms  tri={temps_tri:7.3f} ms")
+        return mesures
+
+    @staticmethod
+    def comparer_filtres(nom_corpus="csvdiscours", repetitions=50):
+        """
+        @brief Compare le filtrage auteur/dates par masque NumPy au test Python document par document.
+        @param nom_corpus Nom du corpus à utiliser.
+        @param repetitions Nombre d'exécutions.
+        @return Tuple (temps_masque_ms, temps_python_ms).
+        """
+        moteur = SearchEngine(nom_corpus)
+        auteur, date_debut, date_fin = "CLINTON", date(2016, 1, 1), date(2016, 6, 30)
+        temps_masque = Benchmark.chronometrer(
+            lambda: moteur.metadonnees.masque(auteur, date_debut, date_fin), repetitions)
+        temps_python = Benchmark.chronometrer(lambda: [
+            doc.auteur == auteur and date_debut <= doc.date <= date_fin for doc in moteur.documents
+        ], repetitions)
+        print(f"\nFiltre auteur + dates sur '{nom_corpus}' ({len(moteur.documents)} documents)")
+        print(f"  masque={temps_masque:7.3f} ms  python={temps_python:7.3f} ms")
+        return temps_masque, temps_python
+
+    @staticmethod
+    def comparer_expression_exacte(nom_corpus="csvdiscours", expressions=("public college", "health care", "we are going"), repetitions=20):
+        """
+        @brief Compare la recherche d'expression par l'index positionnel au parcours du texte des documents candidats.
+        @param nom_corpus Nom du corpus à utiliser.
+        @param expressions Expressions de plusieurs mots mesurées.
+        @param repetitions Nombre d'exécutions par expression.
+        @return Dictionnaire {expression: (temps_positions_ms, temps_texte_ms)}.
+        """
+        moteur = SearchEngine(nom_corpus)
+        mesures = {}
+        print(f"\nExpression exacte sur '{nom_corpus}'")
+        for expression in expressions:
+            ids_mots = [(mot, moteur.vocab[mot]['id']) for mot in expression.split()]
+            doc_ids, _ = moteur.calculer_scores(expression)
+            temps_positions = Benchmark.chronometrer(
+                lambda: moteur.index_positionnel.documents_expression(ids_mots, moteur.vocab), repetitions)
+            temps_texte = Benchmark.chronometrer(
+                lambda: [doc_id for doc_id in doc_ids if expression in moteur.documents[doc_id].texte.lower()], repetitions)
+            mesures[expression] = (temps_positions, temps_texte)
+            print(f"  {expression!r:18} candidats={len(doc_ids):6d}  positions={temps_positions:7.3f} ms  texte={temps_texte:7.3f} ms")
+        return mesures
+
+    @staticmethod
+    def requetes_aleatoires(moteur, n_requetes, graine=0):
+        """
+        @brief Génère des requêtes d'un ou deux mots tirés parmi les 2000 mots les plus fréquents du corpus.
+        @param moteur Moteur de recherche chargé.
+        @param n_requetes Nombre de requêtes à générer.
+        @param graine Graine du générateur aléatoire.
+        @return Liste de requêtes.
+        """
+        generateur = np.random.default_rng(graine)
+        mots_par_id = moteur.vocab.mots_par_id()
+        mots = [mots_par_id[i] for i in np.argsort(-moteur.vocab.frequences.astype(np.int64), kind="stable")[:2000]]
+        return [" ".join(generateur.choice(mots, size=generateur.integers(1, 3))) for _ in range(n_requetes)]
+
+    @staticmethod
+    def debit_search_batch(nom_corpus="csvdiscours", n_requetes=2000, k=20):
+        """
+        @brief Mesure le débit (requêtes par seconde) de search_batch face à des appels requête par requête.
+        @param nom_corpus Nom du corpus à utiliser.
+        @param n_requetes Nombre de requêtes du lot.
+        @param k Nombre de résultats par requête.
+        @return Tuple (debit_lot, debit_unitaire) en requêtes par seconde.
+        """
+        moteur = SearchEngine(nom_corpus)
+        requetes = Benchmark.requetes_aleatoires(moteur, n_requetes)
+
+        def une_par_une():
+            for requete in requetes:
+                doc_ids, scores = moteur.calculer_scores(requete)
+                doc_ids, scores, _ = moteur.filtrer_candidats(requete, doc_ids, scores)
+                Utils.selection_top_k(doc_ids, scores, k)
+
+        debit_lot = n_requetes * 1000 / Benchmark.chronometrer(lambda: moteur.search_batch(requetes, k), 3)
+        debit_unitaire = n_requetes * 1000 / Benchmark.chronometrer(une_par_une, 3)
+        print(f"\nsearch_batch sur '{nom_corpus}' ({n_requetes} requêtes, k={k})")
+        print(f"  lot={debit_lot:9.0f} requêtes/s  une par une={debit_unitaire:9.0f} requêtes/s")
+        return debit_lot, debit_unitaire
+
+    @staticmethod
+    def comparer_recherche_federee(requete="health care", repetitions=20):
+        """
+        @brief Compare la recherche fédérée (fils, processus) sur tous les corpus à la recherche séquentielle.
+        @param requete Requête mesurée.
+        @param repetitions Nombre d'exécutions.
+        @return Dictionnaire {mode: temps_ms} avec les modes "fils", "processus", "sequentiel" et "plus_lent".
+        """
+        noms_corpus = [valeur[0] for valeur in THEMESCORPUS.values()] + ["csvdiscours"]
+        registre = RegistreMoteurs()
+        temps_corpus = {nom: Benchmark.chronometrer(lambda: registre.obtenir(nom).search(requete), repetitions)
+                        for nom in noms_corpus}
+        mesures = {mode: Benchmark.chronometrer(lambda: RechercheFederee(registre, mode).rechercher(noms_corpus, requete),
+                                                repetitions)
+                   for mode in RechercheFederee.MODES}
+        mesures["sequentiel"] = Benchmark.chronometrer(
+            lambda: [registre.obtenir(nom).search(requete) for nom in noms_corpus], repetitions)
+        mesures["plus_lent"] = max(temps_corpus.values())
+        RechercheFederee.arreter()
+        print(f"\nRecherche sur {len(noms_corpus)} corpus : {requete!r}")
+        for nom, temps in temps_corpus.items():
+            print(f"  {nom:26} {temps:7.3f} ms")
+        print("  " + "  ".join(f"{mode}={temps:7.3f} ms" for mode, temps in mesures.items()))
+        return mesures
+    @staticmethod
+    def octets_index(moteur):
+        """
+        @brief Mémoire occupée par les tableaux NumPy des index d'un moteur (matrice TF-IDF, index inversé, positions).
+        @param moteur Moteur de recherche chargé.
+        @return Nombre d'octets.
+        """
+        matrice, index, positions = moteur.mat_TFxIDF, moteur.index, moteur.index_positionnel
+        tableaux = [matrice.data, matrice.indices, matrice.indptr, index.pointeurs, index.docs, index.poids,
+                    positions.docs, positions.pointeurs_positions, positions.termes, positions.pointeurs_termes, positions.ecarts]
+        return sum(tableau.nbytes for tableau in tableaux)
+
+    @staticmethod
+    def comparer_index_unifie(requetes=REQUETES_BENCHMARK, repetitions=10):
+        """
+        @brief Compare l'index unifié (filtré par corpus) aux moteurs séparés de chaque corpus : mémoire et latence.
+        @details L'index unifié doit avoir été construit (CorpusMatriceManager.creer_corpus_unifie()).
+        @param requetes Liste des requêtes mesurées.
+        @param repetitions Nombre d'exécutions par requête.
+        @return Dictionnaire des mesures (octets, nombre de mots, millisecondes), ou None si l'index unifié est absent.
+        """
+        noms_corpus = [valeur[0] for valeur in THEMESCORPUS.values()] + ["csvdiscours"]
+        try:
+            unifie = SearchEngine(NOM_CORPUS_UNIFIE)
+        except ValueError as e:
+            print(f"\nIndex unifié absent, à construire avec CorpusMatriceManager().creer_corpus_unifie() : {e}")
+            return None
+        moteurs = [SearchEngine(nom) for nom in noms_corpus]
+
+        mesures = {
+            "octets_separes": sum(Benchmark.octets_index(moteur) for moteur in moteurs),
+            "octets_unifie": Benchmark.octets_index(unifie),
+            "mots_separes": sum(len(moteur.vocab) for moteur in moteurs),
+            "mots_unifie": len(unifie.vocab),
+            "ms_separes": 0.0, "ms_unifie_par_corpus": 0.0, "ms_unifie_global": 0.0,
+        }
+        for requete in requetes:
+            mesures["ms_separes"] += Benchmark.chronometrer(
+                lambda: [moteur.search(requete) for moteur in moteurs], repetitions)
+            mesures["ms_unifie_par_corpus"] += Benchmark.chronometrer(
+                lambda: [unifie.search(requete, noms_corpus=[nom]) for nom in noms_corpus], repetitions)
+            mesures["ms_unifie_global"] += Benchmark.chronometrer(
+                lambda: unifie.search(requete, noms_corpus=noms_corpus), repetitions)
+
+        print(f"\nIndex unifié ({unifie.mat_TFxIDF.shape[0]} documents) contre {len(noms_corpus)} corpus séparés")
+        print(f"  index    : séparés={mesures['octets_separes'] / 1e6:6.1f} Mo  unifié={mesures['octets_unifie'] / 1e6:6.1f} Mo")
+        print(f"  mots     : séparés={mesures['mots_separes']:8d}  unifié={mesures['mots_unifie']:8d}")
+        print(f"  latence ({len(requetes)} requêtes) : séparés={mesures['ms_separes']:8.2f} ms  "
+              f"unifié par corpus={mesures['ms_unifie_par_corpus']:8.2f} ms  unifié global={mesures['ms_unifie_global']:8.2f} ms")
+        return mesures
+
+    @staticmethod
+    def mesurer_cache(nom_corpus="csvdiscours", requetes=("climate", "public college", "health care"), n_recherches=300, graine=0):
+        """
+        @brief Mesure le cache des résultats sur une suite de recherches qui répètent quelques requêtes.
+        @param nom_corpus Nom du corpus à utiliser.
+        @param requetes Requêtes répétées.
+        @param n_recherches Nombre de recherches de la suite.
+        @param graine Graine du générateur aléatoire.
+        @return Tuple (temps_avec_cache_ms, temps_sans_cache_ms, statistiques du cache).
+        """
+        moteur = SearchEngine(nom_corpus)
+        generateur = np.random.default_rng(graine)
+        suite = [requetes[i] for i in generateur.integers(0, len(requetes), n_recherches)]
+
+        def executer():
+            for requete in suite:
+                moteur.search(requete)
+
+        moteur.cache = CacheResultats(taille_max=0)
+        temps_sans_cache = Benchmark.chronometrer(executer, 1) / n_recherches
+        moteur.cache = CacheResultats(taille_max=256)
+        debut = time.perf_counter()
+        executer()
+        temps_avec_cache = (time.perf_counter() - debut) * 1000 / n_recherches
+        statistiques = moteur.cache.statistiques()
+        print(f"\nCache des résultats sur '{nom_corpus}' ({n_recherches} recherches, {len(requetes)} requêtes distinctes)")
+        print(f"  avec cache={temps_avec_cache:7.3f} ms/recherche  sans cache={temps_sans_cache:7.3f} ms/recherche  "
+              f"succès={statistiques['succes']} échecs={statistiques['echecs']}")
+        return temps_avec_cache, temps_sans_cache, statistiques
+
+    @staticmethod
+    def extrait_regex(texte, mot_cle):
+        """
+        @brief Ancienne extraction par expression régulière à retour arrière (référence des mesures).
+        @param texte Texte source.
+        @param mot_cle Mot-clé à rechercher.
+        @return Extrait ou "Extrait non disponible".
+        """
+        mot_cle = mot_cle.lower()
+        pattern = r'(\b\w+\b\s*){0,15}' + re.escape(mot_cle) + r'(\s*\b\w+\b){0,15}'
+        match = re.search(pattern, texte, re.MULTILINE)
+        return match.group() if match else "Extrait non disponible"
+
+    @staticmethod
+    def comparer_extraits(n_mots=20000, repetitions=3):
+        """
+        @brief Compare la génération d'extraits à l'ancienne expression régulière sur des textes pathologiques.
+        @param n_mots Nombre de mots des textes générés.
+        @param repetitions Nombre d'exécutions par texte.
+        @return Dictionnaire {cas: (temps_generateur_ms, temps_regex_ms)}.
+        """
+        cas = {
+            "mot à la fin": ("mot " * n_mots + "climate", "climate"),
+            "mot absent": ("mot " * n_mots, "climate"),
+            "préfixes répétés": ("clim " * n_mots + "climate", "climate"),
+            "expression dispersée": ("health mot " * n_mots + "health care", "health care"),
+            "mot unique très long": ("x" * (n_mots * 5) + " climate", "climate"),
+        }
+        mesures = {}
+        print(f"\nExtraits sur des textes pathologiques ({n_mots} mots)")
+        for nom, (texte, requete) in cas.items():
+            generateur = GenerateurExtraits(requete)
+            temps_generateur = Benchmark.chronometrer(lambda: generateur.extraire(texte), repetitions)
+            temps_regex = Benchmark.chronometrer(lambda: Benchmark.extrait_regex(texte, requete), repetitions)
+            mesures[nom] = (temps_generateur, temps_regex)
+            print(f"  {nom:22} générateur={temps_generateur:9.3f} ms  regex={temps_regex:9.3f} ms")
+        return mesures
+
+    @staticmethod
+    def nettoyer_texte_ancien(texte):
+        """
+        @brief Ancien nettoyage caractère par caractère (référence des mesures, même résultat que Tokeniseur.normaliser()).
+        @param texte Texte brut.
+        @return Texte nettoyé.
+        """
+        texte = texte.lower()
+        texte = ''.join((c for c in unicodedata.normalize('NFD', texte) if unicodedata.category(c) != 'Mn'))
+        texte = re.sub(r"(\w)'(\w)", r"\1\2", texte)
+        texte = texte.translate(str.maketrans('', '', string.punctuation))
+        return ' '.join(texte.split())
+
+    @staticmethod
+    def debit_tokeniseur(chemin_csv=CSV_DISCOURS_PATH, repetitions=3):
+        """
+        @brief Mesure le débit de normalisation (Mo/s) sur les textes bruts du CSV des discours.
+        @details Compare l'ancien nettoyage, Tokeniseur.normaliser() texte par texte, le mode par lots,
+        et les mêmes textes coupés en morceaux de 200 caractères (textes courts, majoritairement ASCII).
+        @param chemin_csv Chemin du CSV des discours (séparateur tabulation, colonne 'text').
+        @param repetitions Nombre d'exécutions par mesure.
+        @return Dictionnaire {mesure: débit en Mo/s}.
+        """
+        textes = [str(texte) for texte in pd.read_csv(chemin_csv, sep='\t')['text']]
+        concatenation = ' '.join(textes)
+        courts = [concatenation[i:i + 200] for i in range(0, len(concatenation), 200)]
+        mega_octets = len(concatenation.encode('utf-8')) / 1e6
+        Tokeniseur.marques_combinantes()  # construction unique de la table, hors mesure
+
+        mesures = {
+            "ancien nettoyage": lambda: [Benchmark.nettoyer_texte_ancien(texte) for texte in textes],
+            "tokeniseur": lambda: [Tokeniseur.normaliser(texte) for texte in textes],
+            "tokeniseur par lots": lambda: Tokeniseur.normaliser_lot(textes),
+            "textes courts": lambda: [Tokeniseur.normaliser(texte) for texte in courts],
+            "textes courts par lots": lambda: [Tokeniseur.normaliser_lot(courts[i:i + 256]) for i in range(0, len(courts), 256)],
+        }
+        debits = {}
+        print(f"\nDébit du tokeniseur sur {len(textes)} discours ({mega_octets:.1f} Mo)")
+        for nom, fonction in mesures.items():
+            debits[nom] = mega_octets / (Benchmark.chronometrer(fonction, repetitions) / 1000)
+            print(f"  {nom:24} {debits[nom]:8.1f} Mo/s")
+        return debits
+
+    @staticmethod
+    def mesurer_memoire(fonction):
+        """
+        @brief Mesure le temps d'exécution et le pic de mémoire Python alloué par une fonction.
+        @param fonction Fonction sans argument.
+        @return Tuple (temps en ms, pic en Mo, résultat de la fonction).
+        """
+        tracemalloc.start()
+        debut = time.perf_counter()
+        resultat = fonction()
+        temps = (time.perf_counter() - debut) * 1000
+        _, pic = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return temps, pic / 1e6, resultat
+
+    @staticmethod
+    def comparer_magasin_documents(noms_corpus=("RedditArxivhealth", "csvdiscours"), k=20):
+        """
+        @brief Compare le chargement du pickle du corpus à l'ouverture du magasin de documents pour afficher k résultats.
+        @param noms_corpus Corpus mesurés.
+        @param k Nombre de documents lus (une page de résultats).
+        @return Dictionnaire {corpus: ((temps_pickle_ms, pic_pickle_mo), (temps_magasin_ms, pic_magasin_mo))}.
+        """
+        mesures = {}
+        print(f"\nDocuments de {k} résultats : pickle du corpus ou magasin de documents")
+        with tempfile.TemporaryDirectory() as dossier:
+            for nom_corpus in noms_corpus:
+                moteur = SearchEngine(nom_corpus)
+                chemin = os.path.join(dossier, f"documents_{nom_corpus}.bin")
+                MagasinDocuments.ecrire(chemin, moteur.documents, moteur.documents.origines())
+                doc_ids = np.linspace(0, len(moteur.documents) - 1, k).astype(int)
+
+                def par_pickle():
+                    with open(moteur.chemins["ch_corpus"], 'rb') as f:
+                        corpus = pickle.load(f)
+                    documents = list(corpus.id2doc.values())
+                    return [documents[doc_id].titre for doc_id in doc_ids]
+
+                def par_magasin():
+                    magasin = MagasinDocuments(chemin)
+                    return [magasin[doc_id].titre for doc_id in doc_ids]
+
+                temps_pickle, pic_pickle, titres_pickle = Benchmark.mesurer_memoire(par_pickle)
+                temps_magasin, pic_magasin, titres_magasin = Benchmark.mesurer_memoire(par_magasin)
+                assert titres_pickle == titres_magasin
+                mesures[nom_corpus] = ((temps_pickle, pic_pickle), (temps_magasin, pic_magasin))
+                print(f"  {nom_corpus:20} pickle={temps_pickle:8.2f} ms {pic_pickle:7.2f} Mo  "
+                      f"magasin={temps_magasin:6.2f} ms {pic_magasin:6.3f} Mo")
+        return mesures
+
+    @staticmethod
+    def comparer_format_matrices(noms_corpus=("RedditArxivhealth", "csvdiscours"), repetitions=20):
+        """
+        @brief Compare le chargement des matrices TF-IDF en pickle et au format ".csr" projeté.
+        @param noms_corpus Corpus mesurés.
+        @param repetitions Nombre de chargements par mesure.
+        @return Dictionnaire {corpus: (temps_pickle_ms, temps_csr_ms)}.
+        """
+        mesures = {}
+        print("\nChargement de la matrice TF-IDF : pickle ou format .csr projeté")
+        with tempfile.TemporaryDirectory() as dossier:
+            for nom_corpus in noms_corpus:
+                chemin_pickle = SearchEngine(nom_corpus).chemins["ch_TFIDF"]
+                chemin_csr = os.path.join(dossier, f"matriceTFIDF_{nom_corpus}{MatriceCSR.EXTENSION}")
+                MatriceCSR.ecrire(chemin_csr, MatriceCSR.charger(chemin_pickle))
+                temps_pickle = Benchmark.chronometrer(lambda: MatriceCSR.charger(chemin_pickle), repetitions)
+                temps_csr = Benchmark.chronometrer(lambda: MatriceCSR.ouvrir(chemin_csr), repetitions)
+                mesures[nom_corpus] = (temps_pickle, temps_csr)
+                print(f"  {nom_corpus:20} pickle={temps_pickle:7.3f} ms  csr={temps_csr:7.3f} ms")
+        return mesures
+
+
+    @staticmethod
+    def comparer_chargement_index(noms_corpus=("RedditArxivhealth", "csvdiscours"), repetitions=20):
+        """
+        @brief Compare le chargement de l'index inversé TF-IDF construit en mémoire à partir de la matrice projetée
+        et celui de l'index enregistré puis projeté (IndexInverse.ouvrir()) : temps et pic de mémoire Python alloué.
+        @details Les tableaux projetés ne sont pas alloués par le processus : le pic de l'index projeté
+        ne dépend pas du nombre de postings.
+        @param noms_corpus Corpus mesurés.
+        @param repetitions Nombre de chargements par mesure.
+        @return Dictionnaire {corpus: ((temps_memoire_ms, pic_memoire_mo), (temps_projete_ms, pic_projete_mo))}.
+        """
+        mesures = {}
+        print("\nChargement de l'index inversé TF-IDF : construit en mémoire ou projeté (.csr)")
+        with tempfile.TemporaryDirectory() as dossier:
+            for nom_corpus in noms_corpus:
+                moteur = SearchEngine(nom_corpus)
+                chemin = os.path.join(dossier, f"index_{nom_corpus}{MatriceCSR.EXTENSION}")
+                IndexInverse.ecrire(chemin, moteur.mat_TFxIDF)
+                construire = lambda: IndexInverse(moteur.mat_TFxIDF)
+                ouvrir = lambda: IndexInverse.ouvrir(chemin)
+
+                _, pic_memoire, index_memoire = Benchmark.mesurer_memoire(construire)
+                _, pic_projete, index_projete = Benchmark.mesurer_memoire(ouvrir)
+                termes_ids, poids = moteur.termes_requete("health care")
+                if not all(np.array_equal(a, b) for a, b in zip(index_memoire.scorer(termes_ids, poids),
+                                                                index_projete.scorer(termes_ids, poids))):
+                    raise AssertionError(f"Scores différents avec l'index projeté de '{nom_corpus}'")
+                temps_memoire = Benchmark.chronometrer(construire, repetitions)
+                temps_projete = Benchmark.chronometrer(ouvrir, repetitions)
+                mesures[nom_corpus] = ((temps_memoire, pic_memoire), (temps_projete, pic_projete))
+                print(f"  {nom_corpus:20} {moteur.index.docs.size:8d} postings  "
+                      f"mémoire={temps_memoire:7.2f} ms {pic_memoire:7.2f} Mo  "
+                      f"projeté={temps_projete:6.2f} ms {pic_projete:6.3f} Mo")
+        return mesures
+
+    @staticmethod
+    def comparer_vocabulaire(noms_corpus=("RedditArxivhealth", "csvdiscours"), repetitions=10):
+        """
+        @brief Compare la taille et le chargement du vocabulaire en dictionnaires et sous forme compacte.
+        @param noms_corpus Corpus mesurés.
+        @param repetitions Nombre de chargements par mesure.
+        @return Dictionnaire {corpus: (octets_dict, octets_compact, temps_dict_ms, temps_compact_ms)}.
+        """
+        mesures = {}
+        print("\nVocabulaire : dictionnaires {mot: {...}} + fréquences, ou Vocabulaire compact")
+        for nom_corpus in noms_corpus:
+            chemins = SearchEngine(nom_corpus).chemins
+            with open(chemins["ch_vocab"], 'rb') as f:
+                vocab = pickle.load(f)
+            with open(chemins["ch_frequence"], 'rb') as f:
+                frequence_mot = pickle.load(f)
+            if isinstance(vocab, Vocabulaire):
+                vocab = {mot: vocab[mot] for mot in vocab}
+            ancien = pickle.dumps((vocab, frequence_mot), protocol=pickle.HIGHEST_PROTOCOL)
+            compact = pickle.dumps(Vocabulaire.depuis_dict(vocab, frequence_mot), protocol=pickle.HIGHEST_PROTOCOL)
+            temps_dict = Benchmark.chronometrer(lambda: pickle.loads(ancien), repetitions)
+            temps_compact = Benchmark.chronometrer(lambda: pickle.loads(compact), repetitions)
+            mesures[nom_corpus] = (len(ancien), len(compact), temps_dict, temps_compact)
+            print(f"  {nom_corpus:20} dict={len(ancien) / 1e6:6.2f} Mo {temps_dict:7.2f} ms  "
+                  f"compact={len(compact) / 1e6:6.2f} Mo {temps_compact:7.2f} ms")
+        return mesures
+
+    @staticmethod
+    def comparer_expansion_jokers(nom_corpus="csvdiscours", motifs=("educat*", "clim*", "c*mate", "*tion"), repetitions=50):
+        """
+        @brief Compare le développement des jokers par plages du vocabulaire trié à un parcours de tous les mots.
+        @param nom_corpus Nom du corpus à utiliser.
+        @param motifs Motifs à jokers mesurés.
+        @param repetitions Nombre d'exécutions par motif.
+        @return Dictionnaire {motif: (temps_plage_ms, temps_parcours_ms)}.
+        """
+        moteur = SearchEngine(nom_corpus)
+        mots = moteur.vocab.mots_par_id()
+        mesures = {}
+        print(f"\nDéveloppement des jokers sur '{nom_corpus}' ({len(mots)} mots)")
+        for motif in motifs:
+            temps_plage = Benchmark.chronometrer(lambda: moteur.vocab.developper(motif, moteur.limite_expansion), repetitions)
+            temps_parcours = Benchmark.chronometrer(
+                lambda: [terme_id for terme_id, mot in enumerate(mots) if fnmatch.fnmatchcase(mot, motif)], repetitions)
+            mesures[motif] = (temps_plage, temps_parcours)
+            print(f"  {motif!r:10} mots={len(moteur.vocab.developper(motif)):5d}  "
+                  f"plage={temps_plage:7.3f} ms  parcours={temps_parcours:7.3f} ms")
+        return mesures
+
+    @staticmethod
+    def comparer_corrections(nom_corpus="csvdiscours", mots=("helth", "goverment", "educaton", "vacine", "ecnomy"), repetitions=20):
+        """
+        @brief Compare la correction d'un mot par l'index des suppressions au calcul de sa distance à tous les mots.
+        @param nom_corpus Nom du corpus à utiliser.
+        @param mots Mots mal orthographiés mesurés.
+        @param repetitions Nombre d'exécutions par mot.
+        @return Dictionnaire {mot: (temps_index_ms, temps_parcours_ms)}.
+        """
+        moteur = SearchEngine(nom_corpus)
+        vocabulaire = moteur.vocab.mots_par_id()
+        debut = time.perf_counter()
+        corrections = IndexCorrections(moteur.vocab)
+        print(f"\nCorrections sur '{nom_corpus}' : index construit en {(time.perf_counter() - debut) * 1000:.0f} ms "
+              f"({len(corrections.cles)} variantes)")
+        mesures = {}
+        for mot in mots:
+            temps_index = Benchmark.chronometrer(lambda: corrections.corriger(mot, moteur.vocab, 3), repetitions)
+            temps_parcours = Benchmark.chronometrer(
+                lambda: [IndexCorrections.distance_edition(mot, autre, 2) for autre in vocabulaire], 3)
+            ids, distance = corrections.corriger(mot, moteur.vocab, 3)
+            mesures[mot] = (temps_index, temps_parcours)
+            print(f"  {mot!r:12} -> {[moteur.vocab.mot(i) for i in ids]} (distance {distance})  "
+                  f"index={temps_index:6.3f} ms  parcours={temps_parcours:7.2f} ms")
+        return mesures
+
+    @staticmethod
+    def comparer_requetes_booleennes(nom_corpus="csvdiscours", repetitions=20,
+                                     requetes=("climate AND NOT politics", "(health OR care) AND NOT insurance",
+                                               "the AND climate", "america AND NOT (jobs OR economy)")):
+        """
+        @brief Compare l'exécution des requêtes booléennes sur les postings au filtrage du texte des documents,
+        et l'intersection par dichotomie à numpy.intersect1d (tri de la concaténation des deux listes).
+        @param nom_corpus Nom du corpus à utiliser.
+        @param repetitions Nombre d'exécutions par requête.
+        @param requetes Requêtes booléennes mesurées.
+        @return Dictionnaire {requete: (temps_postings_ms, temps_texte_ms)}.
+        """
+        moteur = SearchEngine(nom_corpus)
+        mots_docs = [set(doc.texte.split()) for doc in moteur.documents]
+        mesures = {}
+        print(f"\nRequêtes booléennes sur '{nom_corpus}'")
+        for texte in requetes:
+            requete = RequeteBooleenne(texte)
+            documents_mot = lambda mot: moteur.index.documents(moteur.termes_mot(mot))
+
+            def evaluer(noeud):
+                if noeud[0] == "mot":
+                    return lambda mots: noeud[1] in mots
+                if noeud[0] == "non":
+                    enfant = evaluer(noeud[1])
+                    return lambda mots: not enfant(mots)
+                enfants = [evaluer(enfant) for enfant in noeud[1]]
+                combiner = all if noeud[0] == "et" else any
+                return lambda mots: combiner(enfant(mots) for enfant in enfants)
+
+            predicat = evaluer(requete.arbre)
+            temps_postings = Benchmark.chronometrer(lambda: requete.executer(documents_mot, moteur.index.n_docs), repetitions)
+            temps_texte = Benchmark.chronometrer(
+                lambda: [doc_id for doc_id, mots in enumerate(mots_docs) if predicat(mots)], max(1, repetitions // 10))
+            mesures[texte] = (temps_postings, temps_texte)
+            print(f"  {texte!r:38} documents={len(requete.executer(documents_mot, moteur.index.n_docs)):5d}  "
+                  f"postings={temps_postings:7.3f} ms  texte={temps_texte:7.2f} ms")
+
+        courte, longue = moteur.index.documents([moteur.vocab.identifiant("climate")]), moteur.index.documents([moteur.vocab.identifiant("the")])
+        temps_dichotomie = Benchmark.chronometrer(lambda: RequeteBooleenne.intersecter([courte, longue]), 200)
+        temps_intersect1d = Benchmark.chronometrer(lambda: np.intersect1d(courte, longue, assume_unique=True), 200)
+        print(f"  intersection {len(courte)} x {len(longue)} : dichotomie={temps_dichotomie:.4f} ms  "
+              f"intersect1d={temps_intersect1d:.4f} ms")
+        return mesures
+
+    @staticmethod
+    def comparer_pagination(nom_corpus="csvdiscours", requete="the", taille_page=20, pages=(1, 10, 50, 200), repetitions=10):
+        """
+        @brief Compare la lecture d'une page profonde par curseur (tampon des candidats gardé, puis évincé)
+        à la pagination par décalage, qui recalcule les (page x taille_page) premiers résultats et garde la fin.
+        @param nom_corpus Nom du corpus à utiliser.
+        @param requete Requête mesurée (un mot fréquent donne beaucoup de candidats).
+        @param taille_page Nombre de résultats par page.
+        @param pages Numéros des pages mesurées (à partir de 1).
+        @return Dictionnaire {page: (temps_tampon_ms, temps_reprise_ms, temps_decalage_ms)}.
+        """
+        moteur = SearchEngine(nom_corpus)
+        curseurs, curseur = {1: None}, None
+        for numero in range(2, max(pages) + 1):
+            curseur = moteur.search_page(requete, taille_page, curseur)[1]
+            if curseur is None:
+                break
+            curseurs[numero] = curseur
+
+        def reprise(curseur):
+            moteur.tampons.vider()
+            moteur.search_page(requete, taille_page, curseur)
+
+        mesures = {}
+        print(f"\nPagination de '{requete}' sur '{nom_corpus}' ({taille_page} résultats par page)")
+        for numero in pages:
+            if numero not in curseurs:
+                break
+            curseur = curseurs[numero]
+            temps_tampon = Benchmark.chronometrer(lambda: moteur.search_page(requete, taille_page, curseur), repetitions)
+            temps_reprise = Benchmark.chronometrer(lambda: reprise(curseur), repetitions)
+            temps_decalage = Benchmark.chronometrer(
+                lambda: moteur.search(requete, n_resultats=numero * taille_page).iloc[-taille_page:], repetitions)
+            mesures[numero] = (temps_tampon, temps_reprise, temps_decalage)
+            print(f"  page {numero:4d} : curseur+tampon={temps_tampon:7.2f} ms  curseur seul={temps_reprise:7.2f} ms  "
+                  f"décalage={temps_decalage:8.2f} ms")
+        return mesures
+
+    @staticmethod
+    def comparer_elagage(nom_corpus="csvdiscours", k=20, repetitions=50,
+                         requetes=("the climate", "the people jobs", "we the people", "we are going", "the america jobs economy",
+                                   "econom*")):
+        """
+        @brief Compare le calcul des k meilleurs documents avec élagage MaxScore au calcul exhaustif des scores,
+        pour des OU pondérés mêlant mots fréquents et mots plus rares.
+        @param nom_corpus Nom du corpus à utiliser.
+        @param k Nombre de meilleurs documents.
+        @param repetitions Nombre d'exécutions par requête.
+        @param requetes Requêtes mesurées.
+        @return Dictionnaire {(ponderation, requete): (temps_exhaustif_ms, temps_elagage_ms)}.
+        """
+        mesures = {}
+        for ponderation in SearchEngine.PONDERATIONS:
+            moteur = SearchEngine(nom_corpus, ponderation=ponderation)
+            print(f"\nÉlagage MaxScore sur '{nom_corpus}' ({ponderation}, k={k})")
+            for requete in requetes:
+                termes_ids, poids = moteur.termes_requete(requete)
+
+                def meilleurs(scorer):
+                    doc_ids, scores = scorer()
+                    return doc_ids[Utils.selection_top_k(doc_ids, scores, k)], len(doc_ids)
+
+                exhaustif = lambda: meilleurs(lambda: moteur.index.scorer(termes_ids, poids))
+                elagage = lambda: meilleurs(lambda: moteur.index.scorer_top_k(termes_ids, poids, k))
+                (docs_exhaustif, n_exhaustif), (docs_elagage, n_elagage) = exhaustif(), elagage()
+                if list(docs_exhaustif) != list(docs_elagage):
+                    raise AssertionError(f"Élagage différent du calcul exhaustif pour '{requete}'")
+                temps_exhaustif = Benchmark.chronometrer(exhaustif, repetitions)
+                temps_elagage = Benchmark.chronometrer(elagage, repetitions)
+                mesures[(ponderation, requete)] = (temps_exhaustif, temps_elagage)
+                print(f"  {requete!r:28} documents scorés={n_elagage:5d}/{n_exhaustif:5d}  "
+                      f"exhaustif={temps_exhaustif:6.3f} ms  élagage={temps_elagage:6.3f} ms  "
+                      f"gain=x{temps_exhaustif / temps_elagage:4.1f}")
+        return mesures
+
+    @staticmethod
+    def comparer_segments(noms_corpus=("RedditArxivhealth", "csvdiscours"), requetes=REQUETES_BENCHMARK, repetitions=20):
+        """
+        @brief Compare l'index inversé en mémoire et le segment de postings compressé : taille sur disque,
+        chargement (pickle de la matrice TF-IDF, ou ouverture du segment et décodage de tous ses postings)
+        et temps de calcul des scores des requêtes.
+        @param noms_corpus Corpus mesurés.
+        @param requetes Requêtes mesurées.
+        @param repetitions Nombre d'exécutions par mesure.
+        @return Dictionnaire {corpus: (octets_pickle, octets_segment, temps_pickle_ms, temps_segment_ms,
+        {requete: (temps_index_ms, temps_compresse_ms)})}.
+        """
+        mesures = {}
+        print("\nSegment de postings compressé (.seg) et matrice TF-IDF en pickle")
+        with tempfile.TemporaryDirectory() as dossier:
+            for nom_corpus in noms_corpus:
+                moteur = SearchEngine(nom_corpus)
+                compresse = SearchEngine(nom_corpus, calcul_scores="compresse")
+                chemin_pickle = moteur.chemins["ch_TFIDF"]
+                chemin_segment = os.path.join(dossier, f"postings_{nom_corpus}{SegmentPostings.EXTENSION}")
+                SegmentPostings.depuis_matrice(moteur.mat_TF).ecrire(chemin_segment)
+                octets_pickle, octets_segment = os.path.getsize(chemin_pickle), os.path.getsize(chemin_segment)
+
+                def ouvrir_et_decoder():
+                    segment = SegmentPostings.ouvrir(chemin_segment)
+                    return segment.decoder(np.arange(segment.n_termes))
+
+                temps_pickle = Benchmark.chronometrer(lambda: MatriceCSR.charger(chemin_pickle), repetitions)
+                temps_segment = Benchmark.chronometrer(ouvrir_et_decoder, repetitions)
+                print(f"  {nom_corpus:20} pickle={octets_pickle / 1e6:6.2f} Mo {temps_pickle:7.2f} ms  "
+                      f"segment={octets_segment / 1e6:6.2f} Mo {temps_segment:7.2f} ms (ouverture et décodage complet)")
+                temps_requetes = {}
+                for requete in requetes:
+                    temps_index = Benchmark.chronometrer(lambda: moteur.calculer_scores(requete), repetitions)
+                    temps_compresse = Benchmark.chronometrer(lambda: compresse.calculer_scores(requete), repetitions)
+                    temps_requetes[requete] = (temps_index, temps_compresse)
+                    print(f"    {requete!r:18} index={temps_index:7.3f} ms  compressé={temps_compresse:7.3f} ms")
+                mesures[nom_corpus] = (octets_pickle, octets_segment, temps_pickle, temps_segment, temps_requetes)
+        return mesures
+
+    @staticmethod
+    def mesurer_scores_paralleles(nom_corpus="csvdiscours", n_documents=1_000_000, fils=(1, 2, 4, 8),
+                                  requetes=("health care", "the", "we are going"), k=20, repetitions=5):
+        """
+        @brief Mesure le passage à l'échelle du calcul des scores par blocs de documents (ScoresParBlocs)
+        selon le nombre de fils, sur un corpus d'au moins n_documents phrases.
+        @details La matrice des poids du corpus est répétée jusqu'à atteindre n_documents lignes ; chaque bloc
+        calcule ses scores, applique un filtre de documents puis garde ses k meilleurs, comme SearchEngine en mode "csr".
+        @param nom_corpus Corpus dont la matrice est répétée.
+        @param n_documents Nombre minimal de documents de la matrice mesurée.
+        @param fils Nombres de fils mesurés.
+        @param requetes Requêtes mesurées.
+        @param k Nombre de meilleurs documents.
+        @param repetitions Nombre d'exécutions par mesure.
+        @return Dictionnaire {(requete, n_fils): temps_ms}.
+        """
+        moteur = SearchEngine(nom_corpus)
+        copies = -(-n_documents // moteur.mat_poids.shape[0])
+        matrice = vstack([moteur.mat_poids] * copies, format="csr")
+        masque = np.tile(moteur.metadonnees.masque(date_debut="2015-01-01"), copies)
+        print(f"\nScores par blocs de documents : {matrice.shape[0]} documents, {matrice.nnz} postings, "
+              f"{os.cpu_count()} cœur(s), k={k}")
+
+        def traiter(doc_ids, scores):
+            retenus = masque[doc_ids]
+            doc_ids, scores = doc_ids[retenus], scores[retenus]
+            meilleurs = np.sort(Utils.selection_top_k(doc_ids, scores, k))
+            return doc_ids[meilleurs], scores[meilleurs]
+
+        mesures = {}
+        try:
+            for requete in requetes:
+                vecteur = moteur.vecteur_aligne_matrice(requete)
+                reference = None
+                for n_fils in fils:
+                    blocs = ScoresParBlocs(matrice, n_fils)
+                    calcul = lambda: blocs.scorer(vecteur, traiter, n_fils)
+                    doc_ids, scores = calcul()
+                    meilleurs = doc_ids[Utils.selection_top_k(doc_ids, scores, k)].tolist()
+                    reference = reference or meilleurs
+                    if meilleurs != reference:
+                        raise AssertionError(f"Résultats différents avec {n_fils} fils pour '{requete}'")
+                    mesures[(requete, n_fils)] = Benchmark.chronometrer(calcul, repetitions)
+                    print(f"  {requete!r:16} fils={n_fils}  {mesures[(requete, n_fils)]:8.2f} ms  "
+                          f"accélération=x{mesures[(requete, fils[0])] / mesures[(requete, n_fils)]:4.2f}")
+        finally:
+            ScoresParBlocs.arreter()
+        return mesures
+
+    @staticmethod
+    def mesurer_ajout_incremental(nom_corpus="csvdiscours", tailles_paquets=(1, 10, 100), repetitions=5):
+        """
+        @brief Compare le temps d'ajout de quelques documents à un index fragmenté (nouveau segment et fichiers
+        communs, voir IndexFragmente) à celui de la reconstruction des matrices de tout le corpus.
+        @details Chaque ajout part d'une copie de l'index contenant tous les documents sauf les derniers ;
+        la copie n'est pas chronométrée.
+        @param nom_corpus Corpus dont les derniers documents sont ajoutés.
+        @param tailles_paquets Nombres de documents ajoutés d'un coup.
+        @param repetitions Nombre d'ajouts mesurés par taille de paquet.
+        @return Dictionnaire {taille du paquet (ou "reconstruction"): temps_ms}.
+        """
+        corpus = Corpus.load(os.path.join(DATA_DIR_PKL, f"corpus_{nom_corpus}.pkl"))
+        documents = list(corpus.id2doc.values())
+        reserve = max(tailles_paquets)
+        debut = time.perf_counter()
+        MatriceDocuments(corpus)
+        mesures = {"reconstruction": (time.perf_counter() - debut) * 1000}
+
+        with tempfile.TemporaryDirectory() as dossier:
+            depart = os.path.join(dossier, "depart")
+            os.makedirs(depart)
+            index = IndexFragmente("benchmark", depart)
+            index.ajouter(documents[:-reserve], nom_corpus)
+            index.finaliser()
+            manifeste = [(fragment["nom"], fragment["premier_document"]) for fragment in index.fragments]
+
+            print(f"\nAjout de documents à '{nom_corpus}' ({len(documents) - reserve} documents indexés) : "
+                  f"reconstruction complète {mesures['reconstruction']:8.1f} ms")
+            for taille in tailles_paquets:
+                temps = 0.0
+                for repetition in range(repetitions):
+                    copie = os.path.join(dossier, f"ajout_{taille}_{repetition}")
+                    shutil.copytree(depart, copie)
+                    debut = time.perf_counter()
+                    ajout = IndexFragmente.ouvrir("benchmark", manifeste, copie)
+                    ajout.ajouter(documents[-reserve:][:taille], nom_corpus)
+                    ajout.finaliser()
+                    temps += time.perf_counter() - debut
+                    shutil.rmtree(copie)
+                mesures[taille] = temps * 1000 / repetitions
+                print(f"  paquet de {taille:4} documents : {mesures[taille]:8.1f} ms")
+        return mesures
+
+if __name__ == "__main__":
+    Benchmark.comparer_calcul_scores()
+    Benchmark.comparer_ponderations()
+    Benchmark.comparer_selection_top_k()
+    Benchmark.comparer_filtres()
+    Benchmark.comparer_expression_exacte()
+    Benchmark.debit_search_batch()
+    Benchmark.comparer_recherche_federee()
+    Benchmark.comparer_index_unifie()
+    Benchmark.mesurer_cache()
+    Benchmark.comparer_extraits()
+    Benchmark.debit_tokeniseur()
+    Benchmark.comparer_magasin_documents()
+    Benchmark.comparer_format_matrices()
+    Benchmark.comparer_chargement_index()
+    Benchmark.comparer_vocabulaire()
+    Benchmark.comparer_expansion_jokers()
+    Benchmark.comparer_corrections()
+    Benchmark.comparer_requetes_booleennes()
+    Benchmark.comparer_pagination()
+    Benchmark.comparer_elagage()
+    Benchmark.comparer_segments()
+    Benchmark.mesurer_scores_paralleles()
+    Benchmark.mesurer_ajout_incremental()
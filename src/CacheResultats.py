@@ -0,0 +1,91 @@
+import time
+import threading
+from collections import OrderedDict
+from src.constantes import *
+
+"""
+@file CacheResultats.py
+@brief Cache des résultats de recherche, avec éviction LRU et durée de vie.
+
+@details
+Les mêmes requêtes reviennent très souvent : leur résultat (DataFrame avec extraits) est gardé en mémoire
+et réutilisé tant qu'il n'a pas expiré. Le nombre d'entrées est borné ; au-delà, la moins récemment utilisée est retirée.
+Les clés sont construites par le moteur de recherche (requête normalisée, filtres et génération du corpus).
+"""
+
+class CacheResultats:
+    """
+    @brief Cache LRU avec durée de vie des entrées et compteurs de succès/échecs.
+    """
+
+    def __init__(self, taille_max=TAILLE_CACHE_RESULTATS, duree_vie=DUREE_CACHE_RESULTATS):
+        """
+        @brief Initialise un cache vide.
+        @param taille_max Nombre maximal d'entrées (0 désactive le cache).
+        @param duree_vie Durée de vie d'une entrée en secondes (None : pas d'expiration).
+        """
+        self.taille_max = taille_max
+        self.duree_vie = duree_vie
+        self._entrees = OrderedDict()  # {cle: (date d'expiration, valeur)}, de la moins à la plus récemment utilisée
+        self._verrou = threading.Lock()
+        self.succes = 0
+        self.echecs = 0
+
+    def __len__(self):
+        """
+        @brief Retourne le nombre d'entrées du cache.
+        """
+        return len(self._entrees)
+
+    def obtenir(self, cle):
+        """
+        @brief Retourne la valeur associée à une clé si elle est présente et non expirée.
+        @param cle Clé (hachable).
+        @return La valeur, ou None en cas d'échec.
+        """
+        with self._verrou:
+            entree = self._entrees.get(cle)
+            if entree is not None and entree[0] < time.monotonic():
+                del self._entrees[cle]
+                entree = None
+            if entree is None:
+                self.echecs += 1
+                return None
+            self._entrees.move_to_end(cle)
+            self.succes += 1
+            return entree[1]
+
+    def stocker(self, cle, valeur):
+        """
+        @brief Ajoute ou remplace une entrée, puis retire les entrées les moins récemment utilisées au-delà de la taille maximale.
+        @param cle Clé (hachable).
+        @param valeur Valeur à garder.
+        """
+        if self.taille_max <= 0:
+            return
+        expiration = time.monotonic() + self.duree_vie if self.duree_vie is not None else float("inf")
+        with self._verrou:
+            self._entrees[cle] = (expiration, valeur)
+            self._entrees.move_to_end(cle)
+            while len(self._entrees) > self.taille_max:
+                self._entrees.popitem(last=False)
+
+    def vider(self):
+        """
+        @brief Supprime toutes les entrées (les compteurs sont conservés).
+        """
+        with self._verrou:
+            self._entrees.clear()
+
+    def statistiques(self):
+        """
+        @brief Retourne l'état du cache.
+        @return Dictionnaire {'entrees', 'succes', 'echecs', 'taux_succes'}.
+        """
+        total = self.succes + self.echecs
+        return {
+            "entrees": len(self),
+            "succes": self.succes,
+            "echecs": self.echecs,
+            "taux_succes": self.succes / total if total else 0.0,
+        }
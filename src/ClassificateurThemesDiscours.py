@@ -5,6 +5,7 @@ import numpy as np
 from scipy.sparse import coo_matrix, csr_matrix
 from src.Corpus import Corpus
 from src.Document import Document
+from src.MatriceCSR import MatriceCSR
 from src.constantes import *
 
 
@@ -56,23 +57,33 @@ class ClassificateurThemesDiscours:
         with open(chemin, 'rb') as f:
             return pickle.load(f)
 
-    def classifier_document_par_themes(self, doc_index, vocab, tfidf):
+    def ids_mots_cles(self, vocab):
+        """
+        @brief Cherche une seule fois les identifiants des mots-clés de chaque thème.
+        @param vocab Vocabulaire (Vocabulaire ou dictionnaire {mot: {'id', ...}}).
+        @return Dictionnaire {thème: liste des identifiants des mots-clés présents dans le vocabulaire}.
+        """
+        return {theme: [vocab[mot]['id'] for mot in mots if mot in vocab]
+                for theme, mots in self.keywords_par_theme.items()}
+
+    def classifier_document_par_themes(self, doc_index, vocab, tfidf, ids_par_theme=None):
         """
         @brief Classe un document donné par thèmes en fonction des scores calculés.
         @param doc_index Index du document dans le corpus.
         @param vocab Vocabulaire contenant les mots-clés et leurs indices.
         @param tfidf Matrice TF-IDF des documents.
+        @param ids_par_theme Résultat de ids_mots_cles() (optionnel, recalculé sinon).
         @return Dictionnaire contenant les thèmes et leurs scores associés pour le document.
         """
         if isinstance(tfidf, coo_matrix):
             tfidf = tfidf.tocsr()
+        if ids_par_theme is None:
+            ids_par_theme = self.ids_mots_cles(vocab)
         scores_par_theme = {}
-        for theme, mots in self.keywords_par_theme.items():
+        for theme, ids in ids_par_theme.items():
             score = 0
-            for mot in mots:
-                if mot in vocab:
-                    mot_index = vocab[mot]['id']
-                    score += tfidf[doc_index, mot_index]
+            for mot_index in ids:
+                score += tfidf[doc_index, mot_index]
             if score > 0:
                 scores_par_theme[theme] = score
         return scores_par_theme
@@ -86,13 +97,19 @@ class ClassificateurThemesDiscours:
         @return Dictionnaire contenant les thèmes et leurs documents associés.
         """
         corpus_themes_dynamiques = {}
+        if isinstance(tfidf, coo_matrix):
+            tfidf = tfidf.tocsr()
+
+        # Score de chaque thème pour tous les documents : somme des colonnes de ses mots-clés
+        scores_par_theme = {theme: np.asarray(tfidf[:, ids].sum(axis=1)).ravel()
+                            for theme, ids in self.ids_mots_cles(vocab).items() if ids}
 
         for doc_id, doc in enumerate(corpus.id2doc.values()):
-            scores = self.classifier_document_par_themes(doc_id, vocab, tfidf)
-            for theme, score in scores.items():
-                if theme not in corpus_themes_dynamiques:
-                    corpus_themes_dynamiques[theme] = []
-                corpus_themes_dynamiques[theme].append((doc, score))
+            for theme, scores in scores_par_theme.items():
+                if scores[doc_id] > 0:
+                    if theme not in corpus_themes_dynamiques:
+                        corpus_themes_dynamiques[theme] = []
+                    corpus_themes_dynamiques[theme].append((doc, scores[doc_id]))
 
         # Trier les documents par score décroissant pour chaque thème
         for theme in corpus_themes_dynamiques:
@@ -145,7 +162,7 @@ class ClassificateurThemesDiscours:
 
         # Charger les données nécessaires
         corpus = self.charger_fichier_pickle(chemin_corpus)
-        tfidf = self.charger_fichier_pickle(chemin_tfidf)
+        tfidf = MatriceCSR.charger(chemin_tfidf)
         vocab = self.charger_fichier_pickle(chemin_vocab)
 
         # Créer les sous-corpus classifiés
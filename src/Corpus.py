@@ -1,10 +1,13 @@
 import pandas as pd
+import numpy as np
 import pickle
 from datetime import datetime
 import re
 from src.Author import Author
 from src.Frequence import Frequence 
 from src.Utils import Utils
+from src.Tokeniseur import Tokeniseur
+from src.MetadonneesDocuments import MetadonneesDocuments
 import uuid  # Pour générer des identifiants uniques
 
 
@@ -29,17 +32,20 @@ class Corpus:
         self.naut = 0
         self.texte_concatene = None  
         self.theme = theme
+        self._metadonnees = None  # colonnes auteur/date construites à la demande
+        self.origines = {}  # {"id": "nom du corpus d'origine"} pour les documents venant d'un autre corpus (index unifié)
         
-    def ajouter_document(self, doc):
+    def ajouter_document(self, doc, origine=None):
         """
         @brief Ajoute un document au corpus.
         @param doc Instance du document à ajouter.
+        @param origine Nom du corpus d'origine du document (optionnel, par défaut le corpus lui-même).
         @return True si le document est ajouté, False sinon.
         """        
         
         identifiant_unique = str(uuid.uuid4())  # Génération d'un identifiant unique (UUID)
         
-        doc.texte = Utils.nettoyer_texte(doc.texte)  # Nettoyage du texte avant ajout
+        doc.texte = Tokeniseur.normaliser(doc.texte)  # Nettoyage du texte avant ajout
         
          # Vérification de l'unicité
         if identifiant_unique in self.id2doc:
@@ -49,6 +55,9 @@ class Corpus:
         # Ajouter le document avec l'ID généré
         self.id2doc[identifiant_unique] = doc
         self.ndoc += 1
+        self._metadonnees = None
+        if origine is not None:
+            self.origines[identifiant_unique] = origine
 
         # Gérer l'auteur
         auteur_nom = doc.auteur.lower()
@@ -157,13 +166,48 @@ class Corpus:
         freq_df = pd.DataFrame(compteur.most_common(n), columns=['Mot', 'Fréquence'])
         return freq_df
     
+    def metadonnees(self):
+        """
+        @brief Retourne les métadonnées du corpus en colonnes (construites une seule fois).
+        @return Instance de MetadonneesDocuments alignée sur id2doc.
+        """
+        if getattr(self, "_metadonnees", None) is None or len(self._metadonnees) != len(self.id2doc):
+            self._metadonnees = MetadonneesDocuments(self.id2doc.values(), self.origines_documents())
+        return self._metadonnees
+
+    def origines_documents(self):
+        """
+        @brief Retourne le nom du corpus d'origine de chaque document.
+        @return Liste alignée sur id2doc (le nom du corpus lui-même pour les documents sans origine).
+        """
+        origines = getattr(self, "origines", {})  # corpus sauvegardés avant l'ajout de l'attribut
+        return [origines.get(doc_id, self.nom_corpus or "") for doc_id in self.id2doc]
+
     def trier_par_date(self, n=10):
         """
         @brief Trie les documents par date de publication.
+        @details Seuls les n documents les plus récents sont sélectionnés puis triés (à date égale, ordre d'ajout).
         @param n Nombre de documents à retourner (par défaut 10).
         @return Liste des n documents les plus récents.
         """
-        return sorted(self.id2doc.values(), key=lambda d: d.date, reverse=True)[:n]
+        dates = self.metadonnees().dates
+        positions = Utils.selection_top_k(np.arange(len(dates)), dates, n)
+        documents = list(self.id2doc.values())
+        return [documents[i] for i in positions]
+
+    def filtrer(self, auteur=None, date_debut=None, date_fin=None):
+        """
+        @brief Retourne les documents d'un auteur et/ou d'une plage de dates.
+        @param auteur Nom exact de l'auteur (optionnel).
+        @param date_debut Date de début incluse (optionnelle).
+        @param date_fin Date de fin incluse (optionnelle).
+        @return Liste des documents retenus, dans l'ordre du corpus.
+        """
+        documents = list(self.id2doc.values())
+        masque = self.metadonnees().masque(auteur, date_debut, date_fin)
+        if masque is None:
+            return documents
+        return [documents[i] for i in np.flatnonzero(masque)]
 
     def trier_par_titre(self, n=10):
         """
@@ -2,9 +2,16 @@
 import os
 import pickle
 import sqlite3
+import threading
 import pandas as pd
+from src.Corpus import Corpus
 from src.CorpusSingleton import CorpusSingleton
 from src.MatriceDocuments import MatriceDocuments
+from src.MagasinDocuments import MagasinDocuments
+from src.MatriceCSR import MatriceCSR
+from src.SegmentPostings import SegmentPostings
+from src.IndexInverse import IndexInverse
+from src.IndexFragmente import IndexFragmente
 from src.RecuperationDocs import RedditScrap, ArxivScrap
 from src.GestionErreurs import GestionErreurs
 from dotenv import load_dotenv
@@ -42,6 +49,10 @@ class CorpusMatriceManager:
     def creer_table(self):
         """
         @brief Crée la table `corpus` si elle n'existe pas déjà.
+        @details La colonne `generation` est incrémentée à chaque reconstruction des matrices d'un corpus :
+        les résultats gardés en cache par les moteurs de recherche sont alors invalidés.
+        Les colonnes `fragment_de` et `premier_document` forment le manifeste des index fragmentés :
+        chaque fragment est une ligne, rattachée au corpus dont il contient une tranche de documents.
         """
         self.cursor.execute('''
         CREATE TABLE IF NOT EXISTS corpus (
@@ -53,9 +64,18 @@ class CorpusMatriceManager:
             chemin_TF TEXT,
             chemin_TFIDF TEXT,
             chemin_vocab TEXT,
-            chemin_frequence TEXT
+            chemin_frequence TEXT,
+            generation INTEGER DEFAULT 0,
+            fragment_de TEXT,
+            premier_document INTEGER
         )
         ''')
+        # Bases créées avant l'ajout de la génération des matrices et des index fragmentés
+        colonnes = [colonne[1] for colonne in self.cursor.execute("PRAGMA table_info(corpus)")]
+        for colonne, type_colonne in [("generation", "INTEGER DEFAULT 0"), ("fragment_de", "TEXT"),
+                                      ("premier_document", "INTEGER")]:
+            if colonne not in colonnes:
+                self.cursor.execute(f"ALTER TABLE corpus ADD COLUMN {colonne} {type_colonne}")
         self.conn.commit()
 
 
@@ -126,6 +146,183 @@ class CorpusMatriceManager:
             print(f"corpus {nom_corpus} sauvegardé et matrices construites.")
      
 
+    # CREATION CORPUS UNIFIE (TOUS LES CORPUS)
+    def creer_corpus_unifie(self, noms_corpus=None):
+        """
+        @brief Regroupe les documents de plusieurs corpus dans un corpus unifié et construit ses matrices.
+        @details
+        Le corpus unifié a un seul vocabulaire et un seul IDF : les mots communs ne sont stockés qu'une fois
+        et les scores sont comparables d'un corpus à l'autre. Le corpus d'origine de chaque document est conservé
+        (facettes corpus, source et thème des métadonnées) pour filtrer la recherche.
+        @param noms_corpus Liste des corpus à regrouper (par défaut tous les corpus Reddit/Arxiv et csvdiscours).
+        """
+        if noms_corpus is None:
+            noms_corpus = [valeurs[0] for valeurs in THEMESCORPUS.values()] + [f"csv{theme_csv}"]
+        corpus_unifie = Corpus(NOM_CORPUS_UNIFIE, NOM_CORPUS_UNIFIE)
+
+        for nom_corpus in noms_corpus:
+            chemin_corpus = os.path.join(DATA_DIR_PKL, f"corpus_{nom_corpus}.pkl")
+            if not os.path.exists(chemin_corpus):
+                print(f"Corpus introuvable : {chemin_corpus}")
+                continue
+            # Le pickle est une instance de CorpusSingleton : ses documents sont lus avant le corpus suivant
+            for doc in list(Corpus.load(chemin_corpus).id2doc.values()):
+                corpus_unifie.ajouter_document(doc, origine=nom_corpus)
+
+        self._sauvegarder_pkl(corpus_unifie, f"corpus_{NOM_CORPUS_UNIFIE}")
+        self._construire_matrices(NOM_CORPUS_UNIFIE)
+        if not self.cursor.execute("SELECT 1 FROM corpus WHERE nom_corpus = ?", (NOM_CORPUS_UNIFIE,)).fetchone():
+            self._enregistrer_corpus(NOM_CORPUS_UNIFIE, NOM_CORPUS_UNIFIE)
+            self.conn.commit()
+        print(f"Corpus {NOM_CORPUS_UNIFIE} ({corpus_unifie.ndoc} documents) sauvegardé et matrices construites.")
+
+    # CREATION D'UN INDEX FRAGMENTE (CORPUS PLUS GRAND QUE LA MEMOIRE)
+    def creer_corpus_fragmente(self, nom_corpus, noms_corpus=None, theme=None, taille_fragment=TAILLE_FRAGMENT):
+        """
+        @brief Construit un index fragmenté regroupant les documents de plusieurs corpus, et enregistre son manifeste.
+        @details
+        Les corpus sources sont chargés l'un après l'autre et leurs documents écrits par fragments de taille_fragment :
+        seuls un corpus source, le fragment en cours et le vocabulaire sont en mémoire (voir IndexFragmente).
+        La recherche se fait ensuite avec MoteurFragmente (RegistreMoteurs le choisit d'après la base).
+        @param nom_corpus Nom de l'index fragmenté.
+        @param noms_corpus Corpus sources, dans l'ordre (par défaut tous les corpus Reddit/Arxiv et csvdiscours).
+        @param theme Thème enregistré pour les fragments (par défaut le nom de l'index).
+        @param taille_fragment Nombre de documents par fragment.
+        @return Liste du manifeste (voir IndexFragmente.finaliser()).
+        """
+        if noms_corpus is None:
+            noms_corpus = [valeurs[0] for valeurs in THEMESCORPUS.values()] + [f"csv{theme_csv}"]
+        index = IndexFragmente(nom_corpus, DATA_DIR_PKL, taille_fragment)
+
+        for nom_source in noms_corpus:
+            chemin_corpus = os.path.join(DATA_DIR_PKL, f"corpus_{nom_source}.pkl")
+            if not os.path.exists(chemin_corpus):
+                print(f"Corpus introuvable : {chemin_corpus}")
+                continue
+            # Le pickle est une instance de CorpusSingleton : ses documents sont lus avant le corpus suivant
+            index.ajouter(list(Corpus.load(chemin_corpus).id2doc.values()), origine=nom_source)
+
+        fragments = index.finaliser()
+        self._enregistrer_fragments(index, theme or nom_corpus)
+        self.conn.commit()
+        return fragments
+
+    def _enregistrer_fragments(self, index, theme):
+        """
+        @brief Remplace dans la table `corpus` le manifeste d'un index fragmenté : une ligne par fragment.
+        @details La génération des fragments est incrémentée : les moteurs ouverts sur l'ancien manifeste sont rechargés.
+        @param index Instance de IndexFragmente finalisée.
+        @param theme Thème enregistré pour les fragments.
+        """
+        nom_corpus = index.nom_corpus
+        generation = self.cursor.execute(
+            "SELECT COALESCE(MAX(generation), 0) + 1 FROM corpus WHERE fragment_de = ?", (nom_corpus,)).fetchone()[0]
+        self.cursor.execute("DELETE FROM corpus WHERE fragment_de = ?", (nom_corpus,))
+        for fragment in index.fragments:
+            nom = fragment["nom"]
+            self.cursor.execute('''
+            INSERT INTO corpus (
+                nom_corpus, theme, date_creation, chemin_corpus, chemin_TF, chemin_TFIDF, chemin_vocab,
+                chemin_frequence, generation, fragment_de, premier_document)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (nom, theme, datetime.now(), index.chemin("documents", nom, ".bin"),
+                  index.chemin("matriceTF", nom, MatriceCSR.EXTENSION), None,  # poids calculés au chargement
+                  index.chemin("vocab", nom_corpus), index.chemin("frequenceMots", nom_corpus),
+                  generation, nom_corpus, fragment["premier_document"]))
+
+    # AJOUT DE DOCUMENTS A UN INDEX FRAGMENTE
+    def ajouter_documents(self, nom_corpus, documents, origine="", en_arriere_plan=True, taille_fragment=TAILLE_FRAGMENT):
+        """
+        @brief Ajoute des documents à un index fragmenté dans un nouveau segment, sans reconstruire les autres.
+        @details
+        Les documents sont indexés avec le vocabulaire commun (les mots nouveaux reçoivent les identifiants suivants),
+        puis seuls les fichiers communs sont réécrits (vocabulaire, fréquences documentaires, IDF, corrections) :
+        le temps d'un ajout dépend du nombre de documents ajoutés et de la taille du vocabulaire,
+        pas du nombre de documents du corpus. Les segments sont ensuite fusionnés par niveaux de taille
+        (voir fusionner_segments()), par défaut dans un fil à part.
+        @param nom_corpus Nom de l'index fragmenté (voir creer_corpus_fragmente()).
+        @param documents Itérable de documents à ajouter.
+        @param origine Corpus d'origine des documents.
+        @param en_arriere_plan True pour fusionner les segments dans un fil, False pour les fusionner avant de rendre la main.
+        @param taille_fragment Nombre maximal de documents par segment.
+        @return Le fil de fusion (threading.Thread) s'il a été lancé, sinon None.
+        @throws ValueError Si le corpus n'est pas un index fragmenté.
+        """
+        with IndexFragmente.verrou(nom_corpus):
+            index, theme = self._ouvrir_index_fragmente(nom_corpus, taille_fragment)
+            n_docs = index.n_docs
+            index.ajouter(documents, origine)
+            index.finaliser()
+            self._enregistrer_fragments(index, theme)
+            self.conn.commit()
+        print(f"➕ {index.n_docs - n_docs} documents ajoutés à l'index '{nom_corpus}'.")
+
+        if index.segments_a_fusionner() is None:
+            return None
+        if not en_arriere_plan:
+            self.fusionner_segments(nom_corpus, taille_fragment=taille_fragment)
+            return None
+        fil = threading.Thread(target=CorpusMatriceManager._fusionner_en_arriere_plan, args=(nom_corpus, taille_fragment),
+                               name=f"fusion-{nom_corpus}", daemon=True)
+        fil.start()
+        return fil
+
+    def fusionner_segments(self, nom_corpus, segments_par_niveau=SEGMENTS_PAR_NIVEAU, taille_fragment=TAILLE_FRAGMENT):
+        """
+        @brief Fusionne les segments d'un index fragmenté tant que la politique par niveaux de taille en trouve.
+        @details
+        Chaque fusion enregistre le nouveau manifeste (nouvelle génération) avant de supprimer les fichiers
+        des segments remplacés : RegistreMoteurs recharge les moteurs ouverts sur l'ancien manifeste.
+        Les ajouts de documents au même index attendent la fin des fusions.
+        @param nom_corpus Nom de l'index fragmenté.
+        @param segments_par_niveau Voir IndexFragmente.segments_a_fusionner().
+        @param taille_fragment Taille à partir de laquelle un segment n'est plus fusionné.
+        @return Nombre de fusions effectuées.
+        """
+        fusions = 0
+        with IndexFragmente.verrou(nom_corpus):
+            index, theme = self._ouvrir_index_fragmente(nom_corpus, taille_fragment)
+            while True:
+                plage = index.segments_a_fusionner(segments_par_niveau)
+                if plage is None:
+                    return fusions
+                remplaces = index.fusionner(*plage)
+                self._enregistrer_fragments(index, theme)
+                self.conn.commit()
+                index.supprimer_fichiers(remplaces)
+                fusions += 1
+
+    @staticmethod
+    def _fusionner_en_arriere_plan(nom_corpus, taille_fragment):
+        """
+        @brief Fusionne les segments d'un index dans le fil appelant, avec sa propre connexion à la base.
+        @param nom_corpus Nom de l'index fragmenté.
+        @param taille_fragment Voir fusionner_segments().
+        """
+        gestionnaire = CorpusMatriceManager()
+        try:
+            gestionnaire.fusionner_segments(nom_corpus, taille_fragment=taille_fragment)
+        except Exception as e:
+            GestionErreurs(log_file="app_errors.log").afficher_erreurs(e, f"Fusion des segments de {nom_corpus}")
+        finally:
+            gestionnaire.fermer_connexion()
+
+    def _ouvrir_index_fragmente(self, nom_corpus, taille_fragment=TAILLE_FRAGMENT):
+        """
+        @brief Reprend un index fragmenté d'après son manifeste enregistré.
+        @param nom_corpus Nom de l'index fragmenté.
+        @param taille_fragment Voir IndexFragmente.
+        @return Tuple (IndexFragmente, thème de l'index).
+        @throws ValueError Si la base ne contient aucun segment pour ce corpus.
+        """
+        lignes = self.cursor.execute(
+            "SELECT nom_corpus, premier_document, theme FROM corpus WHERE fragment_de = ? ORDER BY premier_document",
+            (nom_corpus,)).fetchall()
+        if not lignes:
+            raise ValueError(f"❌ '{nom_corpus}' n'est pas un index fragmenté (voir creer_corpus_fragmente()).")
+        fragments = [(nom, premier_document) for nom, premier_document, _ in lignes]
+        return IndexFragmente.ouvrir(nom_corpus, fragments, DATA_DIR_PKL, taille_fragment), lignes[0][2]
+
     # CONSTRUCTION DES MATRICES TF / TFxIDF
     def _construire_matrices(self, nom_corpus):
         """
@@ -133,10 +330,19 @@ class CorpusMatriceManager:
         @param nom_corpus Nom du corpus pour lequel les matrices seront construites.
         """
         chemin_corpus = os.path.join(DATA_DIR_PKL, f"corpus_{nom_corpus}.pkl")
-        chemin_TF = os.path.join(DATA_DIR_PKL, f"matriceTF_{nom_corpus}.pkl")
-        chemin_TFxIDF = os.path.join(DATA_DIR_PKL, f"matriceTFIDF_{nom_corpus}.pkl")
+        chemin_TF = os.path.join(DATA_DIR_PKL, f"matriceTF_{nom_corpus}{MatriceCSR.EXTENSION}")
+        chemin_TFxIDF = os.path.join(DATA_DIR_PKL, f"matriceTFIDF_{nom_corpus}{MatriceCSR.EXTENSION}")
         chemin_vocab = os.path.join(DATA_DIR_PKL, f"vocab_{nom_corpus}.pkl")
         chemin_frequence = os.path.join(DATA_DIR_PKL, f"frequenceMots_{nom_corpus}.pkl")
+        chemin_metadonnees = os.path.join(DATA_DIR_PKL, f"metadonnees_{nom_corpus}.pkl")
+        chemin_positions = os.path.join(DATA_DIR_PKL, f"positions_{nom_corpus}.pkl")
+        chemin_longueurs = os.path.join(DATA_DIR_PKL, f"longueurs_{nom_corpus}.pkl")
+        chemin_idf = os.path.join(DATA_DIR_PKL, f"idf_{nom_corpus}.pkl")
+        chemin_corrections = os.path.join(DATA_DIR_PKL, f"corrections_{nom_corpus}.pkl")
+        chemin_documents = os.path.join(DATA_DIR_PKL, f"documents_{nom_corpus}.bin")
+        chemin_postings = os.path.join(DATA_DIR_PKL, f"postings_{nom_corpus}{SegmentPostings.EXTENSION}")
+        chemin_index = os.path.join(DATA_DIR_PKL, f"index_{nom_corpus}{MatriceCSR.EXTENSION}")
+        chemin_index_bm25 = os.path.join(DATA_DIR_PKL, f"indexbm25_{nom_corpus}{MatriceCSR.EXTENSION}")
         
         if os.path.exists(chemin_corpus):
             print(f"Chargement du corpus existant : {nom_corpus}")
@@ -147,12 +353,28 @@ class CorpusMatriceManager:
 
         matrice = MatriceDocuments(corpus)
         
-        pickle.dump(matrice.mat_TF, open(chemin_TF, 'wb'))
-        pickle.dump(matrice.mat_TFxIDF, open(chemin_TFxIDF, 'wb'))
+        MatriceCSR.ecrire(chemin_TF, matrice.mat_TF)
+        MatriceCSR.ecrire(chemin_TFxIDF, matrice.mat_TFxIDF)
         pickle.dump(matrice.vocab, open(chemin_vocab, 'wb'))
         pickle.dump(matrice.frequence_mot, open(chemin_frequence, 'wb'))
+        pickle.dump(matrice.metadonnees, open(chemin_metadonnees, 'wb'))
+        pickle.dump(matrice.index_positionnel, open(chemin_positions, 'wb'))
+        pickle.dump(matrice.longueurs, open(chemin_longueurs, 'wb'))
+        pickle.dump(matrice.idf, open(chemin_idf, 'wb'))
+        pickle.dump(matrice.corrections, open(chemin_corrections, 'wb'))
+        MagasinDocuments.ecrire(chemin_documents, corpus.id2doc.values(), corpus.origines_documents())
+        SegmentPostings.depuis_matrice(matrice.mat_TF).ecrire(chemin_postings)
+        # Index inversés projetés au chargement du moteur (BM25 : paramètres par défaut)
+        IndexInverse.ecrire(chemin_index, matrice.mat_TFxIDF)
+        IndexInverse.ecrire(chemin_index_bm25, MatriceDocuments.ponderer_bm25(matrice.mat_TF, matrice.longueurs),
+                            k1=BM25_K1, b=BM25_B)
                 
-        print(f"Matrices TF, TFxIDF , vocab et frequenceMots sauvegardées pour : {nom_corpus}")
+        self.cursor.execute(
+            "UPDATE corpus SET generation = COALESCE(generation, 0) + 1, chemin_TF = ?, chemin_TFIDF = ? "
+            "WHERE nom_corpus = ?", (chemin_TF, chemin_TFxIDF, nom_corpus))
+        self.conn.commit()
+                
+        print(f"Matrices TF, TFxIDF , vocab, frequenceMots, metadonnees, positions, longueurs, idf, corrections, magasin de documents, segment de postings et index inversés sauvegardés pour : {nom_corpus}")
     
     # SAUVEGARDE PKL
     def _sauvegarder_pkl(self, fichier, nom_fichier):
@@ -187,36 +409,48 @@ class CorpusMatriceManager:
                 else:
                     theme = "inconnu"
                 
-                chemin_corpus = os.path.join(DATA_DIR_PKL, f"corpus_{nom_corpus}.pkl")
-                chemin_TF = os.path.join(DATA_DIR_PKL, f"matriceTF_{nom_corpus}.pkl")
-                chemin_TFxIDF = os.path.join(DATA_DIR_PKL, f"matriceTFIDF_{nom_corpus}.pkl")
-                chemin_vocab = os.path.join(DATA_DIR_PKL, f"vocab_{nom_corpus}.pkl")
-                chemin_frequence = os.path.join(DATA_DIR_PKL, f"frequenceMots_{nom_corpus}.pkl")
                 theme = "discours" if "csv" in nom_corpus else nom_corpus.replace("RedditArxiv", "")
-                
-                # Lire le fichier PKL
-                """ with open(chemin_fichier, 'rb') as f:
-                    contenu_pkl = f.read() """
-
-                # Insérer le corpus dans la base
-                self.cursor.execute('''
-                INSERT OR REPLACE INTO corpus (
-                    nom_corpus, 
-                    theme, 
-                    date_creation, 
-                    chemin_corpus, 
-                    chemin_TF, 
-                    chemin_TFIDF, 
-                    chemin_vocab, 
-                    chemin_frequence)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (nom_corpus, theme, datetime.now(), chemin_corpus, chemin_TF, chemin_TFxIDF, chemin_vocab, chemin_frequence))
+                self._enregistrer_corpus(nom_corpus, theme)
 
                 print(f"Corpus inséré : {nom_corpus}")
 
  
         self.conn.commit()
 
+    def _enregistrer_corpus(self, nom_corpus, theme):
+        """
+        @brief Insère dans la table `corpus` les chemins des fichiers pickle d'un corpus.
+        @details
+        La génération des matrices déjà enregistrée pour ce corpus est reprise.
+        Les matrices au format natif ".csr" sont préférées aux pickles quand elles existent.
+        @param nom_corpus Nom du corpus.
+        @param theme Thème du corpus.
+        """
+        chemin_corpus = os.path.join(DATA_DIR_PKL, f"corpus_{nom_corpus}.pkl")
+        chemin_TF = os.path.join(DATA_DIR_PKL, f"matriceTF_{nom_corpus}.pkl")
+        chemin_TFxIDF = os.path.join(DATA_DIR_PKL, f"matriceTFIDF_{nom_corpus}.pkl")
+        chemin_vocab = os.path.join(DATA_DIR_PKL, f"vocab_{nom_corpus}.pkl")
+        chemin_frequence = os.path.join(DATA_DIR_PKL, f"frequenceMots_{nom_corpus}.pkl")
+        if os.path.exists(MatriceCSR.chemin_natif(chemin_TF)):
+            chemin_TF = MatriceCSR.chemin_natif(chemin_TF)
+        if os.path.exists(MatriceCSR.chemin_natif(chemin_TFxIDF)):
+            chemin_TFxIDF = MatriceCSR.chemin_natif(chemin_TFxIDF)
+
+        self.cursor.execute('''
+        INSERT OR REPLACE INTO corpus (
+            nom_corpus, 
+            theme, 
+            date_creation, 
+            chemin_corpus, 
+            chemin_TF, 
+            chemin_TFIDF, 
+            chemin_vocab, 
+            chemin_frequence,
+            generation)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, (SELECT COALESCE(MAX(generation), 0) FROM corpus WHERE nom_corpus = ?))
+        ''', (nom_corpus, theme, datetime.now(), chemin_corpus, chemin_TF, chemin_TFxIDF, chemin_vocab, chemin_frequence,
+              nom_corpus))
+
     def fermer_connexion(self):
         """
         @brief Ferme la connexion à la base de données.
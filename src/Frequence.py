@@ -1,5 +1,5 @@
-import re
 from collections import Counter
+from src.Tokeniseur import Tokeniseur
 
 """
 @file Frequence.py
@@ -28,11 +28,7 @@ class Frequence:
         @param texte Chaîne à nettoyer.
         @return Texte nettoyé en minuscules, sans ponctuation ni chiffres.
         """
-        texte = texte.lower()  # Mise en minuscules
-        texte = re.sub(r'[^\w\s]', ' ', texte)  # Suppression de la ponctuation
-        texte = re.sub(r'\d+', '', texte)  # Suppression des chiffres
-        texte = re.sub(r'\s+', ' ', texte).strip()  # Suppression des espaces multiples
-        return texte
+        return Tokeniseur.normaliser_frequence(texte)
 
     @staticmethod
     def construire_vocabulaire(documents):
@@ -0,0 +1,153 @@
+import re
+from src.Tokeniseur import Tokeniseur
+
+"""
+@file GenerateurExtraits.py
+@brief Génération des extraits de résultats de recherche, avec les positions des mots à surligner.
+
+@details
+Les mots de la requête sont cherchés en un seul passage d'une expression régulière compilée une fois par requête
+(alternative de chaînes littérales : pas de retour arrière). Parmi les premières occurrences trouvées, l'extrait retient
+le groupe le plus riche en mots distincts de la requête, puis l'étend de quelques mots de chaque côté.
+Seul le voisinage de ce groupe est découpé en mots : le coût par document ne dépend pas de la longueur du texte
+au-delà de la recherche des occurrences elle-même.
+"""
+
+class GenerateurExtraits:
+    """
+    @brief Extraits de documents centrés sur les mots d'une requête.
+    """
+
+    EXTRAIT_INDISPONIBLE = "Extrait non disponible"
+
+    def __init__(self, mots_cles, taille_contexte=15, occurrences_max=64, longueur_mot_max=40):
+        """
+        @brief Prépare la recherche des mots d'une requête.
+        @param mots_cles Mots-clés de la requête.
+        @param taille_contexte Nombre de mots gardés de chaque côté d'une occurrence isolée ;
+        l'extrait compte au plus 2 x taille_contexte mots en plus de l'occurrence, répartis autour du groupe retenu.
+        @param occurrences_max Nombre maximal d'occurrences examinées par document.
+        @param longueur_mot_max Longueur moyenne de mot supposée pour borner la zone découpée autour du groupe.
+        """
+        mots = Tokeniseur.tokens(mots_cles)  # même découpage que l'index
+        expression = " ".join(mots)
+        mots = sorted(set(mots), key=lambda mot: (-len(mot), mot))
+        # L'expression entière l'emporte sur toute combinaison de mots seuls (rangés du plus long au plus court)
+        self.termes = [expression] if len(mots) <= 1 else [expression] + mots
+        self.poids = [len(mots) + 1] + [1] * (len(self.termes) - 1)
+        self.taille_contexte = taille_contexte
+        self.occurrences_max = occurrences_max
+        self.marge = taille_contexte * longueur_mot_max
+
+        motif = "|".join(f"(?P<t{i}>{re.escape(terme)})" for i, terme in enumerate(self.termes) if terme)
+        self.motif = re.compile(motif) if motif else None
+
+    def occurrences(self, texte):
+        """
+        @brief Trouve les premières occurrences des mots de la requête.
+        @param texte Texte du document.
+        @return Liste de tuples (debut, fin, indice du terme), dans l'ordre du texte.
+        """
+        if self.motif is None:
+            return []
+        occurrences = []
+        for correspondance in self.motif.finditer(texte):
+            indice = int(correspondance.lastgroup[1:])
+            occurrences.append((correspondance.start(), correspondance.end(), indice))
+            if len(occurrences) == self.occurrences_max:
+                break
+        return occurrences
+
+    def meilleur_groupe(self, texte, occurrences):
+        """
+        @brief Choisit le groupe d'occurrences consécutives le plus riche tenant dans la fenêtre de l'extrait.
+        @details Score d'un groupe : poids des termes distincts, puis nombre d'occurrences ; à égalité, le premier groupe.
+        @param texte Texte du document.
+        @param occurrences Occurrences retournées par occurrences().
+        @return Tuple (premier, dernier) : indices des occurrences extrêmes du groupe.
+        """
+        # Nombre de mots séparant chaque occurrence de la suivante
+        ecarts = [texte.count(" ", occurrences[i][0], occurrences[i + 1][0]) for i in range(len(occurrences) - 1)]
+        fenetre = 2 * self.taille_contexte
+        meilleur, meilleur_score = (0, 0), None
+        dernier, distance = 0, 0
+        for premier in range(len(occurrences)):
+            if premier > 0:
+                distance -= ecarts[premier - 1]
+            if dernier < premier:
+                dernier, distance = premier, 0
+            while dernier + 1 < len(occurrences) and distance + ecarts[dernier] <= fenetre:
+                distance += ecarts[dernier]
+                dernier += 1
+            termes = {indice for _, _, indice in occurrences[premier:dernier + 1]}
+            score = (sum(self.poids[indice] for indice in termes), dernier - premier + 1)
+            if meilleur_score is None or score > meilleur_score:
+                meilleur, meilleur_score = (premier, dernier), score
+        return meilleur
+
+    def extraire(self, texte):
+        """
+        @brief Construit l'extrait d'un document et les positions des occurrences à surligner.
+        @param texte Texte du document (minuscules, mots séparés par une espace).
+        @return Tuple (extrait, surlignages) : texte de l'extrait et liste de (debut, fin) relatifs à l'extrait.
+        """
+        occurrences = self.occurrences(texte)
+        if not occurrences:
+            return self.EXTRAIT_INDISPONIBLE, []
+        premier, dernier = self.meilleur_groupe(texte, occurrences)
+        debut_groupe, fin_groupe = occurrences[premier][0], max(fin for _, fin, _ in occurrences[premier:dernier + 1])
+        # Mots restant à répartir de part et d'autre du groupe
+        reste = max(0, 2 * self.taille_contexte - texte.count(" ", debut_groupe, fin_groupe))
+        n_avant, n_apres = reste // 2, reste - reste // 2
+
+        # Zone bornée autour du groupe : seuls ces caractères sont découpés en mots
+        debut_zone = max(0, debut_groupe - self.marge)
+        fin_zone = min(len(texte), fin_groupe + self.marge)
+        avant = texte[debut_zone:debut_groupe].split(" ")
+        apres = texte[fin_groupe:fin_zone].split(" ")
+        # avant[-1] et apres[0] sont les morceaux du mot contenant le début et la fin du groupe
+        if debut_zone > 0:
+            avant = avant[1:]  # premier mot coupé par la zone
+        if fin_zone < len(texte):
+            apres = apres[:-1]
+        avant = avant[max(0, len(avant) - 1 - n_avant):]
+        apres = apres[:n_apres + 1]
+
+        debut_extrait = debut_groupe - len(" ".join(avant))
+        fin_extrait = fin_groupe + len(" ".join(apres))
+        extrait = texte[debut_extrait:fin_extrait]
+        surlignages = [(debut - debut_extrait, fin - debut_extrait)
+                       for debut, fin, _ in occurrences if debut >= debut_extrait and fin <= fin_extrait]
+        return extrait, self.fusionner_surlignages(surlignages)
+
+    @staticmethod
+    def fusionner_surlignages(surlignages):
+        """
+        @brief Fusionne les plages de surlignage qui se chevauchent ou se touchent.
+        @param surlignages Liste de (debut, fin).
+        @return Liste triée de (debut, fin) disjoints.
+        """
+        fusion = []
+        for debut, fin in sorted(surlignages):
+            if fusion and debut <= fusion[-1][1]:
+                fusion[-1] = (fusion[-1][0], max(fusion[-1][1], fin))
+            else:
+                fusion.append((debut, fin))
+        return fusion
+
+    @staticmethod
+    def surligner(extrait, surlignages, avant="**", apres="**"):
+        """
+        @brief Insère des marqueurs autour des plages surlignées d'un extrait (par défaut du gras Markdown).
+        @param extrait Texte de l'extrait.
+        @param surlignages Liste triée de (debut, fin) disjoints.
+        @param avant Marqueur ouvrant.
+        @param apres Marqueur fermant.
+        @return Extrait avec les marqueurs.
+        """
+        morceaux, position = [], 0
+        for debut, fin in surlignages:
+            morceaux += [extrait[position:debut], avant, extrait[debut:fin], apres]
+            position = fin
+        morceaux.append(extrait[position:])
+        return "".join(morceaux)
@@ -0,0 +1,179 @@
+import numpy as np
+from scipy.sparse import csr_matrix
+from src.IndexInverse import IndexInverse
+from src.constantes import *
+
+"""
+@file IndexCompresse.py
+@brief Index inversé lu dans un segment compressé (SegmentPostings) : les postings sont décodés à chaque requête.
+
+@details
+Le segment ne garde que les documents et les nombres d'occurrences ; les poids sont recalculés au décodage,
+avec exactement les opérations de construction des matrices :
+- TF-IDF : tf x idf, avec idf = log((N + 1) / (df + 1)) + 1 (MatriceDocuments.construire_matrice_TFxIDF) ;
+- BM25 : voir MatriceDocuments.ponderer_bm25.
+Les scores sont donc identiques au bit près à ceux de l'index inversé construit sur la matrice des poids.
+Le segment occupe un à deux octets par posting sur les corpus du dépôt, plus quelques octets par mot et par bloc,
+contre douze octets par posting (document int32 et poids float64) pour l'index inversé.
+
+Les bornes de l'élagage MaxScore se lisent dans le segment (plus grande fréquence et plus petite longueur de
+document de chaque mot), sans décoder de postings : en TF-IDF, c'est le poids maximal exact ; en BM25, un majorant
+(la fréquence maximale et la longueur minimale peuvent venir de documents différents), ce qui suffit à
+l'élagage : les k meilleurs documents restent ceux de scorer().
+"""
+
+class IndexCompresse(IndexInverse):
+    """
+    @brief Index inversé mot -> (documents, poids) dont les postings restent compressés en mémoire.
+    """
+
+    def __init__(self, segment, ponderation="tfidf", longueurs=None, k1=BM25_K1, b=BM25_B, frequence_docs=None,
+                 n_docs=None):
+        """
+        @brief Prépare le calcul des poids sur un segment de postings.
+        @param segment Segment des postings (SegmentPostings).
+        @param ponderation "tfidf" ou "bm25".
+        @param longueurs Dictionnaire retourné par MatriceDocuments.longueurs_documents() (nécessaire en BM25).
+        @param k1 Paramètre k1 de BM25.
+        @param b Paramètre b de BM25.
+        @param frequence_docs Nombre de documents contenant chaque mot (optionnel ; lu dans le segment par défaut).
+        @param n_docs Nombre de documents du corpus pour l'IDF (optionnel ; celui du segment par défaut).
+        """
+        self.segment = segment
+        self.ponderation = ponderation
+        self.n_docs, self.n_termes = segment.n_docs, segment.n_termes
+        self.pointeurs = segment.pointeurs
+        self._maximums = None
+
+        if frequence_docs is None:
+            frequence_docs = np.diff(segment.pointeurs.astype(np.int64))
+        self.idf = self.idf_termes(ponderation, frequence_docs, self.n_docs if n_docs is None else n_docs)
+        if ponderation == "bm25":
+            self.k1, self.b = k1, b
+            self.longueur_moyenne = longueurs["longueur_moyenne"] or 1.0
+            self.normes = k1 * (1 - b + b * longueurs["longueurs"] / self.longueur_moyenne)
+
+    @staticmethod
+    def idf_termes(ponderation, frequence_docs, n_docs):
+        """
+        @brief IDF des mots dans la pondération donnée (mêmes formules que MatriceDocuments).
+        @param ponderation "tfidf" ou "bm25".
+        @param frequence_docs Nombre de documents contenant chaque mot.
+        @param n_docs Nombre de documents du corpus.
+        @return Tableau float64 des IDF.
+        """
+        if ponderation == "bm25":
+            return np.log(1 + (n_docs - frequence_docs + 0.5) / (frequence_docs + 0.5))
+        return np.log((n_docs + 1) / (frequence_docs + 1)) + 1
+
+    @staticmethod
+    def bornes_poids(tf_max, longueurs_min, idf, ponderation="tfidf", k1=BM25_K1, b=BM25_B, longueur_moyenne=1.0):
+        """
+        @brief Borne du poids de chaque mot, déduite de sa plus grande fréquence et de la plus petite longueur
+        des documents qui le contiennent (voir le module).
+        @param tf_max Plus grande fréquence de chaque mot (0 sans posting).
+        @param longueurs_min Plus petite longueur des documents contenant chaque mot.
+        @param idf IDF de chaque mot (voir idf_termes()).
+        @param ponderation "tfidf" ou "bm25".
+        @param k1 Paramètre k1 de BM25.
+        @param b Paramètre b de BM25.
+        @param longueur_moyenne Longueur moyenne des documents (BM25).
+        @return Tableau float64 des bornes (0 pour un mot sans posting).
+        """
+        tf_max = np.asarray(tf_max, dtype=np.float64)
+        if ponderation != "bm25":
+            return tf_max * idf
+        # Mêmes opérations que _poids() : la borne majore chaque poids au bit près
+        normes = k1 * (1 - b + b * np.asarray(longueurs_min) / longueur_moyenne)
+        return np.divide(idf * tf_max * (k1 + 1), tf_max + normes, out=np.zeros(len(tf_max)), where=tf_max > 0)
+
+    def _poids(self, termes, docs, tf):
+        """
+        @brief Calcule les poids de postings décodés.
+        @param termes Identifiant du mot de chaque posting.
+        @param docs Document de chaque posting.
+        @param tf Nombre d'occurrences de chaque posting.
+        @return Tableau float64 des poids.
+        """
+        tf = tf.astype(np.float64)
+        if self.ponderation == "bm25":
+            return self.idf[termes] * tf * (self.k1 + 1) / (tf + self.normes[docs])
+        return tf * self.idf[termes]
+
+    def decoder(self, termes_ids):
+        """
+        @brief Décode ensemble les postings de plusieurs mots et calcule leurs poids.
+        @param termes_ids Identifiants des mots.
+        @return Tuple (docs, poids, longueurs) : postings mis bout à bout dans l'ordre de termes_ids
+        et nombre de postings de chaque mot.
+        """
+        termes_ids = np.asarray(termes_ids, dtype=np.int64)
+        longueurs = self.segment.longueurs(termes_ids)
+        docs, tf = self.segment.decoder(termes_ids)
+        return docs, self._poids(np.repeat(termes_ids, longueurs), docs, tf), longueurs
+
+    def postings(self, terme_id):
+        """
+        @brief Décode la liste de postings d'un mot.
+        @param terme_id Identifiant du mot dans le vocabulaire.
+        @return Tuple (docs, poids) de tableaux NumPy.
+        """
+        docs, poids, _ = self.decoder([terme_id])
+        return docs, poids
+
+    @property
+    def maximums(self):
+        """
+        @brief Borne du poids de chaque mot (élagage MaxScore), calculée au premier usage.
+        @details Déduite des fréquences maximales et des longueurs minimales du segment (voir le module) ;
+        un segment écrit sans elles est décodé entièrement.
+        """
+        if self._maximums is None and self.segment.tf_max is not None:
+            if self.ponderation == "bm25":
+                self._maximums = self.bornes_poids(self.segment.tf_max, self.segment.longueurs_min, self.idf, "bm25",
+                                                   self.k1, self.b, self.longueur_moyenne)
+            else:
+                self._maximums = self.bornes_poids(self.segment.tf_max, self.segment.longueurs_min, self.idf)
+        if self._maximums is None:
+            docs, poids, longueurs = self.decoder(np.arange(self.n_termes))
+            maximums = np.zeros(self.n_termes)
+            non_vides = np.flatnonzero(longueurs > 0)
+            if len(non_vides):
+                maximums[non_vides] = np.maximum.reduceat(poids, (np.cumsum(longueurs) - longueurs)[non_vides])
+            self._maximums = maximums
+        return self._maximums
+
+    def documents(self, termes_ids):
+        """
+        @brief Retourne les documents contenant au moins un des mots ; les fréquences ne sont pas décodées.
+        @param termes_ids Identifiants des mots.
+        @return Tableau trié et sans doublon (int32) des documents.
+        """
+        docs, _ = self.segment.decoder(termes_ids, frequences=False)
+        if len(termes_ids) == 1:
+            return docs
+        return np.unique(docs).astype(np.int32)
+
+    def matrice_transposee(self):
+        """
+        @brief Retourne la matrice Mots x Documents des poids, décodée entièrement.
+        @return Matrice creuse (n_termes x n_docs).
+        """
+        docs, poids, _ = self.decoder(np.arange(self.n_termes))
+        return csr_matrix((poids, docs, self.pointeurs.astype(np.int64)), shape=(self.n_termes, self.n_docs))
+
+    def scorer(self, termes_ids, poids_requete):
+        """
+        @brief Calcule les scores des documents contenant au moins un mot de la requête.
+        @details Les postings de tous les mots sont décodés en un seul passage, puis accumulés comme dans IndexInverse.
+        @param termes_ids Identifiants des mots de la requête (triés, sans doublon).
+        @param poids_requete Poids de chaque mot dans la requête.
+        @return Tuple (doc_ids, scores) : documents candidats triés par identifiant et leurs scores.
+        """
+        if len(termes_ids) < 2:
+            return super().scorer(termes_ids, poids_requete)
+        docs, poids, longueurs = self.decoder(termes_ids)
+        contributions = poids * np.repeat(np.asarray(poids_requete, dtype=np.float64), longueurs)
+        doc_ids, positions = np.unique(docs, return_inverse=True)
+        scores = np.bincount(positions, weights=contributions, minlength=len(doc_ids))
+        return doc_ids.astype(np.int32), scores
@@ -0,0 +1,151 @@
+import zlib
+import numpy as np
+
+"""
+@file IndexCorrections.py
+@brief Index des suppressions (à la SymSpell) : mots du vocabulaire proches d'un mot inconnu, à une ou deux fautes près.
+
+@details
+À la construction, chaque mot du vocabulaire (limité à ses longueur_prefixe premiers caractères) est décliné
+en toutes ses variantes obtenues en supprimant jusqu'à distance_max caractères. Deux mots à distance d'édition d
+ont toujours une variante commune à d suppressions au plus : chercher les variantes d'un mot inconnu parmi celles
+du vocabulaire donne tous les candidats, dont la distance exacte est ensuite vérifiée.
+
+Les variantes sont stockées par leur empreinte CRC32 dans deux tableaux NumPy triés (empreinte, identifiant du mot) :
+une recherche est une poignée de searchsorted. Une collision d'empreintes n'ajoute qu'un candidat, écarté
+par la vérification de la distance.
+"""
+
+class IndexCorrections:
+    """
+    @brief Recherche des mots du vocabulaire les plus proches d'un mot inconnu (distance d'édition).
+    """
+
+    def __init__(self, vocab, distance_max=2, longueur_prefixe=7):
+        """
+        @brief Construit l'index des suppressions du vocabulaire.
+        @param vocab Vocabulaire du corpus (Vocabulaire).
+        @param distance_max Distance d'édition maximale des corrections.
+        @param longueur_prefixe Nombre de caractères de chaque mot déclinés en variantes.
+        """
+        self.distance_max = distance_max
+        self.longueur_prefixe = longueur_prefixe
+        self.cles, self.termes = self._cles_variantes(vocab.mots_par_id(), 0)
+
+    def _cles_variantes(self, mots, premier_id):
+        """
+        @brief Calcule les empreintes des variantes d'une suite de mots, triées par empreinte.
+        @param mots Mots, dans l'ordre de leurs identifiants.
+        @param premier_id Identifiant du premier mot.
+        @return Tuple (empreintes uint32, identifiants int32) ; à empreinte égale, les identifiants restent croissants.
+        """
+        cles, termes = [], []
+        for terme_id, mot in enumerate(mots, premier_id):
+            variantes = self.variantes(mot[:self.longueur_prefixe], self.distance_max)
+            cles.extend(zlib.crc32(variante.encode("utf-8")) for variante in variantes)
+            termes.extend([terme_id] * len(variantes))
+        cles = np.array(cles, dtype=np.uint32)
+        ordre = np.argsort(cles, kind="stable")
+        return cles[ordre], np.array(termes, dtype=np.int32)[ordre]
+
+    def ajouter(self, mots, premier_id):
+        """
+        @brief Ajoute à l'index des mots nouveaux du vocabulaire, sans décliner à nouveau les mots déjà indexés.
+        @details Les nouveaux identifiants étant plus grands que les anciens, les variantes sont insérées après
+        celles de même empreinte : l'index est celui qu'aurait construit __init__ sur le vocabulaire complet.
+        @param mots Nouveaux mots, dans l'ordre de leurs identifiants.
+        @param premier_id Identifiant du premier nouveau mot (taille du vocabulaire déjà indexé).
+        """
+        cles, termes = self._cles_variantes(mots, premier_id)
+        positions = np.searchsorted(self.cles, cles, side="right")
+        self.cles = np.insert(self.cles, positions, cles)
+        self.termes = np.insert(self.termes, positions, termes)
+
+    @staticmethod
+    def variantes(mot, distance):
+        """
+        @brief Variantes d'un mot obtenues en supprimant jusqu'à distance caractères (le mot compris).
+        @param mot Mot à décliner.
+        @param distance Nombre maximal de suppressions.
+        @return Ensemble de chaînes.
+        """
+        variantes, niveau = {mot}, {mot}
+        for _ in range(distance):
+            niveau = {variante[:i] + variante[i + 1:] for variante in niveau for i in range(len(variante))}
+            variantes |= niveau
+        return variantes
+
+    @staticmethod
+    def distance_edition(a, b, maximum):
+        """
+        @brief Distance d'édition avec transpositions de lettres voisines (Damerau-Levenshtein restreinte).
+        @details
+        Algorithme à vecteurs de bits de Hyyrö : une colonne de la matrice de programmation dynamique est codée
+        par deux entiers (différences verticales +1 et -1) et mise à jour en quelques opérations par lettre de b.
+        @param a Premier mot.
+        @param b Second mot.
+        @param maximum Distance au-delà de laquelle la valeur exacte est inutile.
+        @return Distance, ou maximum + 1 si elle dépasse maximum.
+        """
+        if abs(len(a) - len(b)) > maximum:
+            return maximum + 1
+        if not a:
+            return len(b)
+        masques = {}
+        for i, lettre in enumerate(a):
+            masques[lettre] = masques.get(lettre, 0) | (1 << i)
+        plein, dernier = (1 << len(a)) - 1, 1 << (len(a) - 1)
+        vp, vn, d0, masque_precedent, distance = plein, 0, 0, 0, len(a)
+        for lettre in b:
+            masque = masques.get(lettre, 0)
+            transposition = ((~d0 & masque) << 1) & masque_precedent
+            d0 = ((((masque & vp) + vp) ^ vp) | masque | vn | transposition) & plein
+            hp = (vn | ~(d0 | vp)) & plein
+            hn = d0 & vp
+            if hp & dernier:
+                distance += 1
+            elif hn & dernier:
+                distance -= 1
+            hp = ((hp << 1) | 1) & plein
+            hn = (hn << 1) & plein
+            vp = (hn | ~(d0 | hp)) & plein
+            vn = d0 & hp
+            masque_precedent = masque
+        return min(distance, maximum + 1)
+
+    def distance_autorisee(self, mot):
+        """
+        @brief Distance maximale tolérée pour un mot : aucune faute sous trois lettres, une seule jusqu'à quatre.
+        @param mot Mot inconnu.
+        @return Distance d'édition maximale.
+        """
+        if len(mot) < 3:
+            return 0
+        return 1 if len(mot) <= 4 else self.distance_max
+
+    def corriger(self, mot, vocab, limite=None):
+        """
+        @brief Mots du vocabulaire les plus proches d'un mot inconnu.
+        @param mot Mot normalisé absent du vocabulaire.
+        @param vocab Vocabulaire sur lequel l'index a été construit.
+        @param limite Nombre maximal de corrections, les plus fréquentes en documents d'abord (optionnel).
+        @return Tuple (identifiants, distance) : mots à la plus petite distance trouvée (tableau vide et 0 sinon).
+        """
+        maximum = self.distance_autorisee(mot)
+        if maximum == 0 or len(self.cles) == 0:
+            return np.empty(0, dtype=np.int64), 0
+        cles = np.array([zlib.crc32(variante.encode("utf-8"))
+                         for variante in self.variantes(mot[:self.longueur_prefixe], maximum)], dtype=np.uint32)
+        debuts = np.searchsorted(self.cles, cles, side="left")
+        fins = np.searchsorted(self.cles, cles, side="right")
+        candidats = np.unique(np.concatenate([self.termes[d:f] for d, f in zip(debuts, fins)] + [np.empty(0, np.int32)]))
+        candidats = candidats[np.abs(vocab.longueurs[candidats].astype(np.int64) - len(mot)) <= maximum]
+
+        distances = np.array([self.distance_edition(mot, vocab.mot(terme_id), maximum) for terme_id in candidats],
+                             dtype=np.int64)
+        if not len(distances) or distances.min() > maximum:
+            return np.empty(0, dtype=np.int64), 0
+        distance = int(distances.min())
+        proches = candidats[distances == distance].astype(np.int64)
+        ordre = np.argsort(-vocab.frequences_documents[proches].astype(np.int64), kind="stable")
+        return proches[ordre[:limite]], distance
@@ -0,0 +1,326 @@
+import os
+import pickle
+import threading
+from collections import Counter
+from itertools import islice
+import numpy as np
+from scipy.sparse import csr_matrix, vstack
+from src.Tokeniseur import Tokeniseur
+from src.MatriceDocuments import MatriceDocuments
+from src.MetadonneesDocuments import MetadonneesDocuments
+from src.IndexPositionnel import IndexPositionnel
+from src.Vocabulaire import Vocabulaire
+from src.IndexCorrections import IndexCorrections
+from src.MagasinDocuments import MagasinDocuments
+from src.MatriceCSR import MatriceCSR
+from src.SegmentPostings import SegmentPostings
+from src.constantes import *
+
+"""
+@file IndexFragmente.py
+@brief Construction en flux d'un index découpé en segments (fragments) de documents consécutifs,
+pour les corpus plus grands que la mémoire et l'ajout de documents sans reconstruction.
+
+@details
+Les documents sont lus une seule fois, par paquets de taille_fragment. Chaque segment reçoit ses propres fichiers,
+nommés comme ceux d'un corpus "<nom>_<numéro>" : matrice TF, magasin de documents, métadonnées, longueurs,
+index positionnel et segment de postings. Un segment écrit n'est plus modifié.
+Seuls le vocabulaire et les compteurs par mot (occurrences, documents) sont gardés d'un segment à l'autre ;
+les identifiants des mots sont attribués dans l'ordre de première apparition, comme dans MatriceDocuments.
+Les colonnes de la matrice TF d'un segment sont donc les identifiants globaux des mots connus à son écriture.
+
+finaliser() écrit les fichiers communs à tous les segments : vocabulaire, IDF, fréquences documentaires,
+nombre de mots du corpus et index des corrections. SearchEngine élargit chaque segment au vocabulaire commun
+et calcule ses poids (TF-IDF, BM25) avec ces statistiques : les scores sont ceux de l'index qu'aurait construit
+MatriceDocuments sur tout le corpus, au bit près.
+
+Un index existant est repris par ouvrir() : les documents ajoutés forment de nouveaux segments, et seuls
+les fichiers communs sont réécrits. Les petits segments sont ensuite fusionnés par niveaux de taille
+(segments_a_fusionner(), fusionner()).
+"""
+
+class IndexFragmente:
+    """
+    @brief Construit et fait évoluer les fichiers d'un index découpé en segments de documents consécutifs.
+    """
+
+    # Fichiers propres à chaque segment : (préfixe, extension)
+    FICHIERS_SEGMENT = (("matriceTF", MatriceCSR.EXTENSION), ("documents", ".bin"), ("metadonnees", ".pkl"),
+                        ("longueurs", ".pkl"), ("positions", ".pkl"), ("postings", SegmentPostings.EXTENSION))
+
+    _verrous = {}  # un verrou par index : ajouts et fusions d'un même index se font l'un après l'autre
+    _verrou = threading.Lock()
+
+    def __init__(self, nom_corpus, dossier=DATA_DIR_PKL, taille_fragment=TAILLE_FRAGMENT):
+        """
+        @brief Prépare la construction d'un nouvel index.
+        @param nom_corpus Nom du corpus fragmenté.
+        @param dossier Dossier des fichiers produits.
+        @param taille_fragment Nombre maximal de documents par segment écrit en flux.
+        """
+        self.nom_corpus = nom_corpus
+        self.dossier = dossier
+        self.taille_fragment = taille_fragment
+        self.ids = {}                    # mot -> identifiant global
+        self.frequences = []             # occurrences de chaque mot dans la collection
+        self.frequences_documents = []   # nombre de documents contenant chaque mot
+        self.n_docs = 0
+        self.n_mots = 0                  # nombre total de mots (longueur moyenne des documents)
+        self.fragments = []              # manifeste : {'nom', 'premier_document', 'n_documents'}
+        self.numero = 0                  # numéro du prochain segment écrit
+        self._corrections = None         # index des corrections repris d'ouvrir(), et nombre de mots qu'il couvre
+        self._mots_corriges = 0
+        self._documents, self._origines = [], []  # segment en cours de remplissage
+
+    @classmethod
+    def ouvrir(cls, nom_corpus, fragments, dossier=DATA_DIR_PKL, taille_fragment=TAILLE_FRAGMENT):
+        """
+        @brief Reprend un index existant, pour y ajouter des documents ou fusionner ses segments.
+        @details Seuls les fichiers communs (vocabulaire, statistiques, corrections) sont lus.
+        @param nom_corpus Nom du corpus fragmenté.
+        @param fragments Manifeste enregistré : liste de tuples (nom du segment, rang de son premier document),
+        par rang croissant.
+        @param dossier Dossier des fichiers de l'index.
+        @param taille_fragment Voir __init__().
+        @return Instance de IndexFragmente.
+        """
+        index = cls(nom_corpus, dossier, taille_fragment)
+        with open(index.chemin("vocab", nom_corpus), 'rb') as f:
+            vocab = pickle.load(f)
+        with open(index.chemin("idf", nom_corpus), 'rb') as f:
+            statistiques = pickle.load(f)
+        with open(index.chemin("corrections", nom_corpus), 'rb') as f:
+            index._corrections = pickle.load(f)
+
+        mots = vocab.mots_par_id()
+        index.ids = {mot: terme_id for terme_id, mot in enumerate(mots)}
+        index.frequences = vocab.frequences.tolist()
+        index.frequences_documents = vocab.frequences_documents.tolist()
+        index._mots_corriges = len(mots)
+        index.n_docs = statistiques["n_docs"]
+        debuts = [premier for _, premier in fragments] + [index.n_docs]
+        index.fragments = [{"nom": nom, "premier_document": premier, "n_documents": debuts[rang + 1] - premier}
+                           for rang, (nom, premier) in enumerate(fragments)]
+        index.numero = 1 + max((int(nom.rsplit("_", 1)[1]) for nom, _ in fragments), default=-1)
+        index.n_mots = statistiques.get("n_mots")
+        if index.n_mots is None:
+            # Index construit avant les ajouts de documents : nombre de mots relu dans les longueurs des segments
+            index.n_mots = 0
+            for fragment in index.fragments:
+                with open(index.chemin("longueurs", fragment["nom"]), 'rb') as f:
+                    index.n_mots += int(pickle.load(f)["longueurs"].sum())
+        return index
+
+    @classmethod
+    def verrou(cls, nom_corpus):
+        """
+        @brief Retourne le verrou d'un index, à tenir pendant un ajout de documents ou une fusion de segments.
+        @param nom_corpus Nom du corpus fragmenté.
+        @return threading.Lock partagé par tout le processus.
+        """
+        with cls._verrou:
+            return cls._verrous.setdefault(nom_corpus, threading.Lock())
+
+    def nom_fragment(self, numero):
+        """
+        @brief Nom du segment de numéro donné, utilisé comme nom de corpus de ses fichiers.
+        @param numero Numéro du segment (unique dans l'index, croissant avec les écritures).
+        @return Nom "<nom_corpus>_<numéro sur quatre chiffres>".
+        """
+        return f"{self.nom_corpus}_{numero:04d}"
+
+    def chemin(self, prefixe, nom, extension=".pkl"):
+        """
+        @brief Chemin d'un fichier de l'index.
+        @param prefixe Préfixe du fichier (par exemple "matriceTF").
+        @param nom Nom du corpus ou du segment.
+        @param extension Extension du fichier.
+        @return Chemin "<dossier>/<prefixe>_<nom><extension>".
+        """
+        return os.path.join(self.dossier, f"{prefixe}_{nom}{extension}")
+
+    def vocabulaire(self):
+        """
+        @brief Construit le vocabulaire des mots connus, avec leurs fréquences.
+        @return Instance de Vocabulaire.
+        """
+        return Vocabulaire(list(self.ids), self.frequences, self.frequences_documents)
+
+    def ajouter(self, documents, origine=""):
+        """
+        @brief Ajoute des documents à l'index ; chaque segment complet est écrit aussitôt.
+        @details Les documents de plusieurs sources peuvent être ajoutés l'un après l'autre (une source par appel).
+        @param documents Itérable de documents (lu une seule fois).
+        @param origine Corpus d'origine des documents, gardé comme facette des métadonnées.
+        """
+        documents = iter(documents)
+        while True:
+            paquet = list(islice(documents, self.taille_fragment - len(self._documents)))
+            if not paquet:
+                return
+            self._documents.extend(paquet)
+            self._origines.extend([origine] * len(paquet))
+            if len(self._documents) == self.taille_fragment:
+                self._ecrire_fragment()
+
+    def _ecrire_fragment(self):
+        """
+        @brief Indexe les documents en attente dans un nouveau segment, ajouté à la fin du manifeste.
+        """
+        lignes, colonnes, valeurs = [], [], []
+        for doc_id, mots in enumerate(Tokeniseur.flux_tokens(doc.texte for doc in self._documents)):
+            compteur = Counter()
+            for mot in mots:
+                if mot not in self.ids:
+                    self.ids[mot] = len(self.ids)
+                    self.frequences.append(0)
+                    self.frequences_documents.append(0)
+                compteur[mot] += 1
+            for mot, nombre in compteur.items():
+                terme_id = self.ids[mot]
+                lignes.append(doc_id)
+                colonnes.append(terme_id)
+                valeurs.append(nombre)
+                self.frequences[terme_id] += nombre
+                self.frequences_documents[terme_id] += 1
+            self.n_mots += len(mots)
+
+        nom = self.nom_fragment(self.numero)
+        mat_TF = csr_matrix((valeurs, (lignes, colonnes)), shape=(len(self._documents), len(self.ids)))
+        self._ecrire_segment(nom, mat_TF, self._documents, self._origines)
+        self.fragments.append({"nom": nom, "premier_document": self.n_docs, "n_documents": len(self._documents)})
+        self.numero += 1
+        self.n_docs += len(self._documents)
+        self._documents, self._origines = [], []
+        print(f"📦 Segment {nom} écrit ({self.fragments[-1]['n_documents']} documents).")
+
+    def _ecrire_segment(self, nom, mat_TF, documents, origines):
+        """
+        @brief Écrit les fichiers d'un segment ; ils ne dépendent que de ses documents et des mots connus.
+        @param nom Nom du segment.
+        @param mat_TF Matrice TF du segment (colonnes : identifiants globaux des mots).
+        @param documents Documents du segment, dans l'ordre des lignes.
+        @param origines Corpus d'origine de chaque document.
+        """
+        MatriceCSR.ecrire(self.chemin("matriceTF", nom, MatriceCSR.EXTENSION), mat_TF)
+        MagasinDocuments.ecrire(self.chemin("documents", nom, ".bin"), documents, origines)
+        SegmentPostings.depuis_matrice(mat_TF).ecrire(self.chemin("postings", nom, SegmentPostings.EXTENSION))
+        annexes = {
+            "metadonnees": MetadonneesDocuments(documents, origines),
+            "longueurs": MatriceDocuments.longueurs_documents(mat_TF),
+            "positions": IndexPositionnel.depuis_identifiants(documents, self.ids, len(self.ids)),
+        }
+        for prefixe, objet in annexes.items():
+            with open(self.chemin(prefixe, nom), 'wb') as f:
+                pickle.dump(objet, f)
+
+    def finaliser(self):
+        """
+        @brief Écrit le dernier segment puis les fichiers communs à tous les segments.
+        @details Pour un index repris par ouvrir(), seuls les mots nouveaux sont ajoutés à l'index des corrections.
+        @return Liste du manifeste : un dictionnaire {'nom', 'premier_document', 'n_documents'} par segment.
+        """
+        if self._documents:
+            self._ecrire_fragment()
+
+        vocab = self.vocabulaire()
+        frequences_documents = np.array(self.frequences_documents, dtype=np.int64)
+        idf = np.log((self.n_docs + 1) / (frequences_documents + 1)) + 1  # voir MatriceDocuments.construire_matrice_TFxIDF
+        if self._corrections is None:
+            corrections = IndexCorrections(vocab)
+        else:
+            corrections = self._corrections
+            corrections.ajouter(list(self.ids)[self._mots_corriges:], self._mots_corriges)
+        self._corrections, self._mots_corriges = corrections, len(vocab)
+
+        communs = {
+            "vocab": vocab,
+            "frequenceMots": dict(zip(self.ids, self.frequences_documents)),
+            # Statistiques de tout le corpus : un segment ne peut pas les calculer sur sa seule matrice
+            "idf": {"idf": idf.astype(np.float32), "n_docs": self.n_docs, "frequences_documents": frequences_documents,
+                    "n_mots": self.n_mots},
+            "corrections": corrections,
+        }
+        for prefixe, objet in communs.items():
+            with open(self.chemin(prefixe, self.nom_corpus), 'wb') as f:
+                pickle.dump(objet, f)
+
+        print(f"✅ Index fragmenté '{self.nom_corpus}' : {self.n_docs} documents, {len(self.fragments)} segments, "
+              f"{len(vocab)} mots.")
+        return self.fragments
+
+    @staticmethod
+    def niveau(n_documents, base):
+        """
+        @brief Niveau de taille d'un segment : floor(log(n_documents) / log(base)).
+        @param n_documents Nombre de documents du segment.
+        @param base Nombre de segments fusionnés ensemble.
+        @return Niveau (0 pour moins de base documents).
+        """
+        niveau = 0
+        while n_documents >= base:
+            n_documents //= base
+            niveau += 1
+        return niveau
+
+    def segments_a_fusionner(self, segments_par_niveau=SEGMENTS_PAR_NIVEAU):
+        """
+        @brief Politique de fusion par niveaux de taille : cherche segments_par_niveau segments consécutifs de même niveau.
+        @details
+        Une fusion fait passer ses documents au niveau supérieur : chaque document est réécrit une fois par niveau,
+        soit un nombre de réécritures logarithmique dans la taille du corpus, et le nombre de segments reste borné
+        par (segments_par_niveau - 1) par niveau. Seuls des segments consécutifs sont fusionnés (l'ordre
+        des documents du corpus est gardé) ; les segments de taille_fragment documents ou plus ne le sont plus.
+        @param segments_par_niveau Nombre de segments fusionnés ensemble (moins de 2 : aucune fusion).
+        @return Tuple (debut, fin) des rangs des segments à fusionner (fin exclue), ou None.
+        """
+        if segments_par_niveau < 2:
+            return None
+        niveaux = [self.niveau(fragment["n_documents"], segments_par_niveau)
+                   if fragment["n_documents"] < self.taille_fragment else None for fragment in self.fragments]
+        for debut in range(len(niveaux) - segments_par_niveau + 1):
+            plage = niveaux[debut:debut + segments_par_niveau]
+            if plage[0] is not None and plage.count(plage[0]) == segments_par_niveau:
+                return debut, debut + segments_par_niveau
+        return None
+
+    def fusionner(self, debut, fin):
+        """
+        @brief Fusionne des segments consécutifs en un nouveau segment, qui les remplace dans le manifeste.
+        @details Les fichiers des segments remplacés sont gardés : ils sont supprimés (supprimer_fichiers())
+        une fois le nouveau manifeste enregistré.
+        @param debut Rang du premier segment fusionné.
+        @param fin Rang suivant le dernier segment fusionné.
+        @return Liste des noms des segments remplacés.
+        """
+        remplaces = self.fragments[debut:fin]
+        matrices = [MatriceCSR.charger(self.chemin("matriceTF", fragment["nom"], MatriceCSR.EXTENSION))
+                    for fragment in remplaces]
+        n_termes = max(matrice.shape[1] for matrice in matrices)
+        mat_TF = vstack([csr_matrix((matrice.data, matrice.indices, matrice.indptr), shape=(matrice.shape[0], n_termes))
+                         for matrice in matrices], format="csr")
+        documents, origines = [], []
+        for fragment in remplaces:
+            magasin = MagasinDocuments(self.chemin("documents", fragment["nom"], ".bin"))
+            documents.extend(magasin)
+            origines.extend(magasin.origines())
+
+        nom = self.nom_fragment(self.numero)
+        self._ecrire_segment(nom, mat_TF, documents, origines)
+        self.numero += 1
+        self.fragments[debut:fin] = [{"nom": nom, "premier_document": remplaces[0]["premier_document"],
+                                      "n_documents": len(documents)}]
+        print(f"🔗 Segments {remplaces[0]['nom']} à {remplaces[-1]['nom']} fusionnés dans {nom} "
+              f"({len(documents)} documents).")
+        return [fragment["nom"] for fragment in remplaces]
+
+    def supprimer_fichiers(self, noms):
+        """
+        @brief Supprime les fichiers de segments qui ne sont plus dans le manifeste.
+        @param noms Noms des segments.
+        """
+        for nom in noms:
+            for prefixe, extension in self.FICHIERS_SEGMENT:
+                chemin = self.chemin(prefixe, nom, extension)
+                if os.path.exists(chemin):
+                    os.remove(chemin)
@@ -0,0 +1,250 @@
+import os
+import pickle
+import numpy as np
+from scipy.sparse import csc_matrix, csr_matrix
+from src.MatriceCSR import MatriceCSR
+
+"""
+@file IndexInverse.py
+@brief Index inversé (listes de postings) construit à partir d'une matrice Document x Mots.
+
+@details
+Pour chaque mot, l'index stocke la liste triée des documents qui le contiennent et le poids associé
+(tableaux contigus au format CSC : pointeurs, docs, poids).
+Le calcul des scores d'une requête ne parcourt que les postings des mots de la requête :
+son coût dépend de la longueur de ces listes et non du nombre de documents du corpus.
+
+Le poids maximal de chaque mot est gardé à la construction : il borne la contribution du mot au score
+de n'importe quel document, ce qui permet d'écarter sans les lire les documents qui ne peuvent pas entrer
+dans les k meilleurs (élagage MaxScore, voir scorer_top_k()).
+
+L'index peut être enregistré à la construction des matrices (ecrire()) : ses trois tableaux forment la matrice
+Mots x Documents au format ".csr" (voir MatriceCSR), et les poids maximaux un petit pickle à côté.
+ouvrir() projette ces tableaux en mémoire sans les copier : le chargement ne dépend pas de la taille du corpus
+et les pages sont partagées entre processus.
+"""
+
+class IndexInverse:
+    """
+    @brief Index inversé mot -> (documents, poids).
+    """
+
+    RATIO_ELAGAGE = 8  # l'élagage n'est tenté que s'il épargne au moins les sept huitièmes des postings
+    POSTINGS_PAR_MOT_ELAGAGE = 1000  # en deçà, les dichotomies par mot coûtent plus que le calcul exhaustif
+
+    def __init__(self, matrice):
+        """
+        @brief Construit l'index à partir d'une matrice creuse Document x Mots.
+        @param matrice Matrice creuse des poids (par exemple TF x IDF), une ligne par document.
+        """
+        csc = csc_matrix(matrice)
+        csc.sum_duplicates()
+        csc.sort_indices()
+
+        self.n_docs, self.n_termes = csc.shape
+        self.pointeurs = csc.indptr.astype(np.int64)  # postings du mot t : [pointeurs[t], pointeurs[t+1])
+        self.docs = csc.indices.astype(np.int32)      # identifiants de documents, triés pour chaque mot
+        self.poids = csc.data.astype(np.float64)      # poids du mot dans chaque document
+        self.maximums = self.poids_maximums(self.pointeurs, self.poids)
+        self.parametres = {}  # paramètres de la pondération des poids enregistrés (voir ecrire())
+
+    @staticmethod
+    def poids_maximums(pointeurs, poids):
+        """
+        @brief Calcule le poids maximal de chaque mot (0 pour un mot sans posting).
+        @param pointeurs Pointeurs des postings de chaque mot.
+        @param poids Poids des postings.
+        @return Tableau float64 des maximums.
+        """
+        maximums = np.zeros(len(pointeurs) - 1)
+        non_vides = np.flatnonzero(np.diff(pointeurs) > 0)
+        if len(non_vides):
+            maximums[non_vides] = np.maximum.reduceat(poids, pointeurs[non_vides])
+        return maximums
+
+    @staticmethod
+    def chemin_maximums(chemin):
+        """
+        @brief Chemin du fichier des poids maximaux d'un index enregistré ("index_x.csr" -> "index_x.pkl").
+        @param chemin Chemin de l'index ".csr".
+        @return Chemin du pickle des maximums.
+        """
+        return os.path.splitext(chemin)[0] + ".pkl"
+
+    @staticmethod
+    def ecrire(chemin, matrice, **parametres):
+        """
+        @brief Enregistre l'index d'une matrice des poids : la transposée au format ".csr" et les poids maximaux.
+        @details Les maximums sont écrits en premier : un index ".csr" présent a toujours les siens.
+        @param chemin Chemin de l'index ".csr".
+        @param matrice Matrice creuse des poids, une ligne par document.
+        @param parametres Paramètres de la pondération (par exemple k1 et b pour BM25), relus par ouvrir().
+        """
+        transposee = csr_matrix(csc_matrix(matrice).T)
+        transposee.sum_duplicates()
+        transposee.sort_indices()
+        maximums = IndexInverse.poids_maximums(transposee.indptr, transposee.data.astype(np.float64))
+        with open(IndexInverse.chemin_maximums(chemin), 'wb') as f:
+            pickle.dump({"maximums": maximums, "parametres": parametres}, f)
+        MatriceCSR.ecrire(chemin, transposee)
+
+    @classmethod
+    def ouvrir(cls, chemin):
+        """
+        @brief Ouvre un index enregistré par ecrire(), sans copier ses postings.
+        @param chemin Chemin de l'index ".csr".
+        @return Instance de IndexInverse dont les tableaux sont projetés en mémoire (lecture seule).
+        @throws ValueError Si le fichier n'est pas au format CSR projeté.
+        """
+        transposee = MatriceCSR.ouvrir(chemin)
+        with open(cls.chemin_maximums(chemin), 'rb') as f:
+            annexe = pickle.load(f)
+        index = cls.__new__(cls)
+        index.n_termes, index.n_docs = transposee.shape
+        # Vues ndarray des projections : les tableaux dérivés (tranches, sélections) ne sont pas des memmap
+        index.pointeurs = np.asarray(transposee.indptr)
+        index.docs = np.asarray(transposee.indices)
+        index.poids = np.asarray(transposee.data, dtype=np.float64)
+        index.maximums = annexe["maximums"]
+        index.parametres = annexe["parametres"]
+        return index
+
+    def postings(self, terme_id):
+        """
+        @brief Retourne la liste de postings d'un mot.
+        @param terme_id Identifiant du mot dans le vocabulaire.
+        @return Tuple (docs, poids) de tableaux NumPy (vues, sans copie).
+        """
+        debut, fin = self.pointeurs[terme_id], self.pointeurs[terme_id + 1]
+        return self.docs[debut:fin], self.poids[debut:fin]
+
+    def longueur_postings(self, terme_id):
+        """
+        @brief Retourne le nombre de documents contenant un mot.
+        @param terme_id Identifiant du mot dans le vocabulaire.
+        @return Longueur de la liste de postings.
+        """
+        return int(self.pointeurs[terme_id + 1] - self.pointeurs[terme_id])
+
+    def documents(self, termes_ids):
+        """
+        @brief Retourne les documents contenant au moins un des mots (union de leurs postings).
+        @param termes_ids Identifiants des mots.
+        @return Tableau trié et sans doublon (int32) des documents.
+        """
+        if len(termes_ids) == 1:
+            return self.postings(termes_ids[0])[0]
+        return np.unique(np.concatenate([self.postings(terme_id)[0] for terme_id in termes_ids]
+                                        + [np.empty(0, dtype=np.int32)])).astype(np.int32)
+
+    def matrice_transposee(self):
+        """
+        @brief Retourne la matrice Mots x Documents au format CSR, construite sur les tableaux de l'index (sans copie).
+        @return Matrice creuse (n_termes x n_docs).
+        """
+        return csr_matrix((self.poids, self.docs, self.pointeurs), shape=(self.n_termes, self.n_docs), copy=False)
+
+    def scorer(self, termes_ids, poids_requete):
+        """
+        @brief Calcule les scores des documents contenant au moins un mot de la requête.
+        @details
+        Les contributions sont accumulées dans l'ordre croissant des identifiants de mots,
+        ce qui reproduit exactement les sommes du produit matrice CSR x vecteur.
+        @param termes_ids Identifiants des mots de la requête (triés, sans doublon).
+        @param poids_requete Poids de chaque mot dans la requête.
+        @return Tuple (doc_ids, scores) : documents candidats triés par identifiant et leurs scores.
+        """
+        morceaux_docs, morceaux_scores = [], []
+        for terme_id, poids in zip(termes_ids, poids_requete):
+            docs, poids_docs = self.postings(terme_id)
+            morceaux_docs.append(docs)
+            morceaux_scores.append(poids_docs * poids)
+
+        if not morceaux_docs:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float64)
+        if len(morceaux_docs) == 1:
+            return morceaux_docs[0], morceaux_scores[0]
+
+        doc_ids, positions = np.unique(np.concatenate(morceaux_docs), return_inverse=True)
+        scores = np.bincount(positions, weights=np.concatenate(morceaux_scores), minlength=len(doc_ids))
+        return doc_ids.astype(np.int32), scores
+
+    def scores_documents(self, docs, termes_ids, poids_requete):
+        """
+        @brief Calcule le score exact de documents donnés, en cherchant chacun dans les postings des mots de la requête.
+        @details
+        Les contributions sont ajoutées dans le même ordre que dans scorer() (identifiants de mots croissants) :
+        les scores sont identiques au bit près. Coût : O(len(docs) x nombre de mots x log(longueur des postings)).
+        @param docs Documents, triés par identifiant.
+        @param termes_ids Identifiants des mots de la requête (triés, sans doublon).
+        @param poids_requete Poids de chaque mot dans la requête.
+        @return Tableau des scores, aligné sur docs.
+        """
+        scores = np.zeros(len(docs))
+        for terme_id, poids in zip(termes_ids, poids_requete):
+            liste, poids_docs = self.postings(terme_id)
+            if len(liste) == 0 or len(docs) == 0:
+                continue
+            positions = np.minimum(np.searchsorted(liste, docs), len(liste) - 1)
+            presents = liste[positions] == docs
+            scores[presents] += poids_docs[positions[presents]] * poids
+        return scores
+
+    def scorer_top_k(self, termes_ids, poids_requete, k, masque=None):
+        """
+        @brief Calcule les scores d'une requête en écartant les documents qui ne peuvent pas entrer dans les k meilleurs.
+        @details
+        Élagage MaxScore :
+        - amorce : les k documents où le mot de plus forte borne (poids dans la requête x poids maximal du mot)
+          pèse le plus sont scorés exactement (scores_documents()) ; leur k-ième meilleur score est un seuil
+          que les k meilleurs documents atteignent forcément ;
+        - les mots de plus faible borne dont la somme des bornes reste sous le seuil sont non essentiels :
+          un document qui ne contient qu'eux ne peut pas entrer dans les k meilleurs. Seules les listes des autres
+          mots sont parcourues ; celles des mots non essentiels (en général les mots fréquents, de faible IDF)
+          ne sont consultées que par dichotomie, pour compléter le score des documents retenus.
+        Chaque document scoré coûte une dichotomie par mot de la requête : quand les listes sont courtes pour
+        le nombre de mots, ou quand les listes à parcourir dépassent 1 / RATIO_ELAGAGE des postings,
+        le calcul exhaustif (scorer()) est plus rapide et utilisé. Dans tous les cas, les k meilleurs documents
+        et leurs scores sont ceux de scorer().
+        @param termes_ids Identifiants des mots de la requête (triés, sans doublon).
+        @param poids_requete Poids de chaque mot dans la requête (positifs).
+        @param k Nombre de meilleurs documents à garantir.
+        @param masque Masque booléen des documents acceptés par les filtres (optionnel).
+        @return Tuple (doc_ids, scores) : documents scorés, dont les k meilleurs acceptés par le masque,
+        triés par identifiant.
+        """
+        termes_ids = np.asarray(termes_ids, dtype=np.int64)
+        poids_requete = np.asarray(poids_requete, dtype=np.float64)
+        longueurs = self.pointeurs[termes_ids + 1] - self.pointeurs[termes_ids]
+        total = longueurs.sum()
+        if len(termes_ids) < 2 or k <= 0 or total < self.POSTINGS_PAR_MOT_ELAGAGE * len(termes_ids):
+            return self.scorer(termes_ids, poids_requete)
+
+        # La liste du mot de plus forte borne est toujours parcourue : si elle est trop longue, rien à gagner
+        bornes = self.maximums[termes_ids] * poids_requete
+        plus_forte = np.argmax(bornes)
+        if self.RATIO_ELAGAGE * longueurs[plus_forte] > total:
+            return self.scorer(termes_ids, poids_requete)
+
+        # Amorce : les k postings les plus lourds du mot de plus forte borne
+        docs, poids_docs = self.postings(termes_ids[plus_forte])
+        if masque is not None:
+            retenus = masque[docs]
+            docs, poids_docs = docs[retenus], poids_docs[retenus]
+        if len(docs) < k:
+            return self.scorer(termes_ids, poids_requete)
+        amorce = np.sort(docs[np.argpartition(poids_docs, len(docs) - k)[len(docs) - k:]])
+        scores_amorce = self.scores_documents(amorce, termes_ids, poids_requete)
+        seuil = np.partition(scores_amorce, 0)[0]
+
+        # Mots non essentiels : plus faibles bornes dont la somme (avec une marge pour les arrondis) reste sous le seuil
+        ordre = np.argsort(bornes, kind="stable")
+        essentiels = np.ones(len(termes_ids), dtype=bool)
+        essentiels[ordre[np.cumsum(bornes[ordre]) * (1 + 1e-9) < seuil]] = False
+        if self.RATIO_ELAGAGE * longueurs[essentiels].sum() > total:
+            return self.scorer(termes_ids, poids_requete)
+
+        doc_ids = self.documents(termes_ids[essentiels])
+        if masque is not None:
+            doc_ids = doc_ids[masque[doc_ids]]
+        return doc_ids, self.scores_documents(doc_ids, termes_ids, poids_requete)
@@ -0,0 +1,242 @@
+import numpy as np
+from src.Tokeniseur import Tokeniseur
+from src.Vocabulaire import Vocabulaire
+
+"""
+@file IndexPositionnel.py
+@brief Index positionnel : mot -> documents -> positions du mot dans le document.
+
+@details
+Les postings sont stockés dans des tableaux NumPy contigus :
+- termes : identifiants triés des mots présents dans les documents indexés ;
+- pointeurs_termes : postings du mot termes[i] dans [pointeurs_termes[i], pointeurs_termes[i+1]) ;
+- docs : identifiant du document de chaque posting ;
+- pointeurs_positions : positions du posting p dans [pointeurs_positions[p], pointeurs_positions[p+1]) ;
+- ecarts : positions codées par différence (première position, puis écarts successifs), en uint16 si possible.
+
+La recherche d'une expression croise les positions des mots au lieu de relire le texte des documents.
+Seuls les mots présents ont des pointeurs : le segment d'un index fragmenté ne coûte que ses propres postings,
+quelle que soit la taille du vocabulaire commun. Le rang d'un mot dans termes est trouvé par dichotomie.
+Les mots eux-mêmes ne sont pas gardés : les préfixes et suffixes d'une expression sont cherchés dans le vocabulaire
+du moteur (Vocabulaire.termes_prefixe() et Vocabulaire.retournes()).
+"""
+
+class IndexPositionnel:
+    """
+    @brief Index positionnel compact pour la recherche d'expressions exactes.
+    """
+
+    def __init__(self, documents, vocab):
+        """
+        @brief Construit l'index à partir des documents et du vocabulaire de la matrice.
+        @param documents Liste des documents, dans l'ordre des lignes de la matrice.
+        @param vocab Vocabulaire de la matrice (Vocabulaire, ou ancien dictionnaire {mot: {'id', ...}}).
+        """
+        if isinstance(vocab, dict):
+            vocab = Vocabulaire.depuis_dict(vocab)
+        # Table temporaire, le temps de la construction
+        self._indexer(documents, {mot: terme_id for terme_id, mot in enumerate(vocab.mots_par_id())}, len(vocab))
+
+    @classmethod
+    def depuis_identifiants(cls, documents, ids, n_termes):
+        """
+        @brief Construit l'index avec une table mot -> identifiant existante, sans construire de vocabulaire.
+        @details Utilisé pour les segments d'un index fragmenté (voir IndexFragmente) : le coût ne dépend
+        que des documents du segment.
+        @param documents Liste des documents, dans l'ordre des lignes de la matrice.
+        @param ids Dictionnaire {mot: identifiant} contenant au moins les mots des documents.
+        @param n_termes Nombre de mots du vocabulaire.
+        @return Instance de IndexPositionnel.
+        """
+        index = cls.__new__(cls)
+        index._indexer(documents, ids, n_termes)
+        return index
+
+    def _indexer(self, documents, ids, n_termes):
+        """
+        @brief Construit les tableaux de l'index.
+        @param documents Liste des documents, dans l'ordre des lignes de la matrice.
+        @param ids Dictionnaire {mot: identifiant}.
+        @param n_termes Nombre de mots du vocabulaire.
+        """
+        termes, docs, positions = [], [], []
+        longueur_max = 0
+        for doc_id, mots in enumerate(Tokeniseur.flux_tokens(doc.texte for doc in documents)):
+            longueur_max = max(longueur_max, len(mots))
+            for position, mot in enumerate(mots):
+                terme_id = ids.get(mot)
+                if terme_id is not None:
+                    termes.append(terme_id)
+                    docs.append(doc_id)
+                    positions.append(position)
+
+        termes = np.array(termes, dtype=np.int64)
+        docs = np.array(docs, dtype=np.int64)
+        positions = np.array(positions, dtype=np.int64)
+        ordre = np.lexsort((positions, docs, termes))
+        termes, docs, positions = termes[ordre], docs[ordre], positions[ordre]
+
+        # Un posting par couple (mot, document)
+        debut_posting = np.ones(len(termes), dtype=bool)
+        debut_posting[1:] = (termes[1:] != termes[:-1]) | (docs[1:] != docs[:-1])
+        starts = np.flatnonzero(debut_posting)
+
+        self.n_termes = n_termes
+        self.longueur_max = longueur_max
+        self.docs = docs[starts].astype(np.int32)
+        self.pointeurs_positions = np.append(starts, len(positions)).astype(np.int64)
+        termes_postings = termes[starts]
+        debut_terme = np.ones(len(termes_postings), dtype=bool)
+        debut_terme[1:] = termes_postings[1:] != termes_postings[:-1]
+        self.termes = termes_postings[debut_terme].astype(np.int32)
+        self.pointeurs_termes = np.append(np.flatnonzero(debut_terme), len(termes_postings)).astype(np.int64)
+
+        ecarts = positions.copy()
+        ecarts[1:] -= positions[:-1]
+        ecarts[starts] = positions[starts]
+        dtype = np.uint16 if longueur_max < np.iinfo(np.uint16).max else np.uint32
+        self.ecarts = ecarts.astype(dtype)
+
+    def __setstate__(self, etat):
+        """
+        @brief Restaure un index enregistré.
+        @details Un index enregistré avant la table termes a un pointeur par mot du vocabulaire : tous ses mots
+        sont pris comme présents (les mots sans occurrence ont une plage vide). Les listes de mots qu'il gardait
+        ne sont plus utilisées et ne sont pas restaurées.
+        @param etat État enregistré par pickle.
+        """
+        for attribut in ("_mots_tries", "_ids_tries", "_mots_inverses", "_ids_inverses"):
+            etat.pop(attribut, None)
+        self.__dict__.update(etat)
+        if "termes" not in etat:
+            self.termes = np.arange(len(self.pointeurs_termes) - 1, dtype=np.int32)
+
+    def etendre(self, n_termes):
+        """
+        @brief Élargit l'index à n_termes mots ; les mots ajoutés n'ont aucune occurrence.
+        @details Voir SegmentPostings.etendre() : le vocabulaire commun d'un index fragmenté grandit après l'écriture d'un segment.
+        Seuls les mots présents ayant des pointeurs, aucun tableau n'est modifié.
+        @param n_termes Nombre de mots.
+        """
+        self.n_termes = max(self.n_termes, n_termes)
+
+    def plages_termes(self, termes_ids):
+        """
+        @brief Plages des postings de plusieurs mots (vides pour les mots sans occurrence).
+        @param termes_ids Tableau d'identifiants de mots.
+        @return Tuple (debuts, fins) : postings du mot i dans [debuts[i], fins[i]).
+        """
+        termes_ids = np.asarray(termes_ids, dtype=np.int64)
+        rangs = np.searchsorted(self.termes, termes_ids)
+        trouves = np.minimum(rangs, len(self.termes) - 1)
+        presents = (rangs < len(self.termes)) & (self.termes[trouves] == termes_ids) if len(self.termes) else rangs < 0
+        debuts = self.pointeurs_termes[rangs]
+        return debuts, np.where(presents, self.pointeurs_termes[np.minimum(rangs + 1, len(self.termes))], debuts)
+
+    @staticmethod
+    def termes_prefixe(vocab, prefixe):
+        """
+        @brief Identifiants des mots commençant par un préfixe.
+        @param vocab Vocabulaire du moteur (Vocabulaire).
+        @param prefixe Préfixe recherché.
+        @return Tableau des identifiants.
+        """
+        return vocab.termes_prefixe(prefixe)
+
+    @staticmethod
+    def termes_suffixe(vocab, suffixe):
+        """
+        @brief Identifiants des mots se terminant par un suffixe : préfixe retourné dans le vocabulaire des mots retournés.
+        @param vocab Vocabulaire du moteur (Vocabulaire).
+        @param suffixe Suffixe recherché.
+        @return Tableau des identifiants.
+        """
+        return vocab.retournes().termes_prefixe(suffixe[::-1])
+
+    @staticmethod
+    def _concatener_plages(debuts, fins):
+        """
+        @brief Concatène des plages d'indices [debut, fin) sans boucle Python.
+        @param debuts Débuts des plages.
+        @param fins Fins des plages (exclues).
+        @return Tableau des indices de toutes les plages, mises bout à bout.
+        """
+        longueurs = fins - debuts
+        decalages = np.cumsum(longueurs) - longueurs
+        return np.repeat(debuts - decalages, longueurs) + np.arange(longueurs.sum())
+
+    def positions(self, termes_ids):
+        """
+        @brief Décode toutes les occurrences d'un ou plusieurs mots.
+        @param termes_ids Identifiant d'un mot ou tableau d'identifiants.
+        @return Tuple (docs, positions) : document et position de chaque occurrence.
+        """
+        termes_ids = np.atleast_1d(np.asarray(termes_ids, dtype=np.int64))
+        postings = self._concatener_plages(*self.plages_termes(termes_ids))
+        debuts, fins = self.pointeurs_positions[postings], self.pointeurs_positions[postings + 1]
+        longueurs = fins - debuts
+        ecarts = self.ecarts[self._concatener_plages(debuts, fins)].astype(np.int64)
+
+        # Somme cumulée remise à zéro au début de chaque posting
+        cumul = np.cumsum(ecarts)
+        starts = np.cumsum(longueurs) - longueurs
+        base = cumul[starts] - ecarts[starts]
+        return np.repeat(self.docs[postings], longueurs), cumul - np.repeat(base, longueurs)
+
+    def nombre_occurrences(self, termes_ids):
+        """
+        @brief Nombre total d'occurrences d'un ensemble de mots.
+        @param termes_ids Tableau d'identifiants de mots.
+        @return Nombre d'occurrences.
+        """
+        debuts, fins = self.plages_termes(termes_ids)
+        return int(np.sum(self.pointeurs_positions[fins] - self.pointeurs_positions[debuts]))
+
+    def _cles(self, termes_ids, decalage):
+        """
+        @brief Encode les occurrences d'un ensemble de mots en clés (document, position de début d'expression).
+        @param termes_ids Identifiants des mots acceptés à cette place de l'expression.
+        @param decalage Place du mot dans l'expression (0 pour le premier mot).
+        @return Tableau trié et sans doublon de clés document * (longueur_max + 1) + position.
+        """
+        docs, positions = self.positions(termes_ids)
+        debuts = positions - decalage
+        valides = debuts >= 0
+        # Une position ne porte qu'un mot : les clés de mots différents ne se recouvrent pas
+        return np.sort(docs[valides].astype(np.int64) * (self.longueur_max + 1) + debuts[valides])
+
+    def documents_sequence(self, ensembles):
+        """
+        @brief Trouve les documents contenant une suite de mots consécutifs.
+        @param ensembles Liste, pour chaque place de l'expression, des identifiants de mots acceptés.
+        @return Tableau trié des documents contenant la suite.
+        """
+        # Les ensembles les plus rares d'abord : les intersections restent petites
+        ordre = sorted(range(len(ensembles)), key=lambda i: self.nombre_occurrences(ensembles[i]))
+        cles = None
+        for i in ordre:
+            cles_i = self._cles(ensembles[i], i)
+            cles = cles_i if cles is None else np.intersect1d(cles, cles_i, assume_unique=True)
+            if len(cles) == 0:
+                break
+        return np.unique(cles // (self.longueur_max + 1)).astype(np.int32)
+
+    def documents_expression(self, ids_mots, vocab):
+        """
+        @brief Documents dont le texte contient l'expression comme sous-chaîne (équivalent de `expression in texte`).
+        @details
+        Le texte d'un document est la suite de ses mots séparés par une espace. L'expression "m1 m2 ... mk"
+        y figure comme sous-chaîne si et seulement si un mot se termine par m1, les suivants valent m2 ... m(k-1)
+        et le dernier commence par mk. Un mot de requête développé (joker ou préfixe) accepte exactement
+        les mots de son développement, à toute place de l'expression.
+        @param ids_mots Liste de tuples (mot, identifiant) des mots de l'expression (au moins deux), dans l'ordre ;
+        l'identifiant est un tableau d'identifiants pour un mot développé.
+        @param vocab Vocabulaire du moteur (Vocabulaire), où sont cherchés le suffixe et le préfixe de l'expression.
+        @return Tableau trié des documents contenant l'expression.
+        """
+        ensembles = [np.atleast_1d(ids) for _, ids in ids_mots]
+        if np.ndim(ids_mots[0][1]) == 0:
+            ensembles[0] = self.termes_suffixe(vocab, ids_mots[0][0])
+        if np.ndim(ids_mots[-1][1]) == 0:
+            ensembles[-1] = self.termes_prefixe(vocab, ids_mots[-1][0])
+        return self.documents_sequence(ensembles)
@@ -0,0 +1,125 @@
+import mmap
+import os
+import pickle
+import struct
+import numpy as np
+
+"""
+@file MagasinDocuments.py
+@brief Magasin de documents à accès direct : seuls les documents affichés sont lus et désérialisés.
+
+@details
+Format du fichier (entiers little-endian) :
+- en-tête : signature MAGIC (8 octets), nombre de documents n, position du bloc des origines ;
+- table des positions : n + 1 entiers uint64, le document i occupe [positions[i], positions[i+1]) ;
+- un pickle par document, dans l'ordre des lignes de la matrice ;
+- bloc des origines : pickle de la liste des corpus d'origine des documents.
+
+Le fichier est projeté en mémoire (mmap) : ouvrir le magasin ne lit que la table des positions,
+et afficher k résultats ne désérialise que k documents, quel que soit le nombre de documents du corpus.
+Sans fichier (corpus construit avant le magasin), les documents sont gardés dans une liste en mémoire.
+"""
+
+class MagasinDocuments:
+    """
+    @brief Séquence de documents indexée par ligne de matrice, lue à la demande dans un fichier.
+    """
+
+    MAGIC = b"MAGDOC01"
+    EN_TETE = struct.Struct("<8sQQ")
+
+    def __init__(self, chemin):
+        """
+        @brief Ouvre un magasin écrit par ecrire() ; seule la table des positions est lue.
+        @param chemin Chemin du fichier du magasin.
+        @throws ValueError Si le fichier n'est pas un magasin de documents.
+        """
+        self.chemin = chemin
+        self._documents = None
+        with open(chemin, 'rb') as f:
+            self._projection = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, n_docs, self._position_origines = self.EN_TETE.unpack_from(self._projection, 0)
+        if magic != self.MAGIC:
+            raise ValueError(f"❌ '{chemin}' n'est pas un magasin de documents.")
+        debut, fin = self.EN_TETE.size, self.EN_TETE.size + 8 * (n_docs + 1)
+        self.positions = np.frombuffer(self._projection[debut:fin], dtype="<u8")
+        self._origines = None
+
+    @classmethod
+    def en_memoire(cls, documents, origines=None):
+        """
+        @brief Crée un magasin gardant les documents dans une liste (repli sans fichier).
+        @param documents Itérable de documents, dans l'ordre des lignes de la matrice.
+        @param origines Corpus d'origine de chaque document (optionnel).
+        @return Instance de MagasinDocuments.
+        """
+        magasin = cls.__new__(cls)
+        magasin.chemin = None
+        magasin._documents = list(documents)
+        magasin._origines = list(origines) if origines is not None else [""] * len(magasin._documents)
+        return magasin
+
+    @staticmethod
+    def ecrire(chemin, documents, origines=None):
+        """
+        @brief Écrit un magasin de documents.
+        @details
+        Le fichier est écrit à côté puis renommé : un moteur qui projette encore l'ancien fichier
+        continue de lire l'ancienne version au lieu d'un fichier tronqué.
+        @param chemin Chemin du fichier à écrire.
+        @param documents Itérable de documents, dans l'ordre des lignes de la matrice.
+        @param origines Corpus d'origine de chaque document (optionnel).
+        """
+        enregistrements = [pickle.dumps(doc, protocol=pickle.HIGHEST_PROTOCOL) for doc in documents]
+        origines = list(origines) if origines is not None else [""] * len(enregistrements)
+        debut = MagasinDocuments.EN_TETE.size + 8 * (len(enregistrements) + 1)
+        positions = np.zeros(len(enregistrements) + 1, dtype="<u8")
+        positions[1:] = np.cumsum([len(e) for e in enregistrements], dtype=np.uint64)
+        positions += np.uint64(debut)
+
+        temporaire = f"{chemin}.tmp"
+        with open(temporaire, 'wb') as f:
+            f.write(MagasinDocuments.EN_TETE.pack(MagasinDocuments.MAGIC, len(enregistrements), int(positions[-1])))
+            f.write(positions.tobytes())
+            for enregistrement in enregistrements:
+                f.write(enregistrement)
+            f.write(pickle.dumps(origines, protocol=pickle.HIGHEST_PROTOCOL))
+        os.replace(temporaire, chemin)
+
+    def __len__(self):
+        """
+        @brief Retourne le nombre de documents du magasin.
+        """
+        if self._documents is not None:
+            return len(self._documents)
+        return len(self.positions) - 1
+
+    def __getitem__(self, doc_id):
+        """
+        @brief Lit un document.
+        @param doc_id Ligne du document dans la matrice.
+        @return Document.
+        """
+        if self._documents is not None:
+            return self._documents[doc_id]
+        doc_id = int(doc_id)
+        if doc_id < 0:
+            doc_id += len(self)
+        if not 0 <= doc_id < len(self):
+            raise IndexError(f"Document {doc_id} absent du magasin.")
+        return pickle.loads(self._projection[int(self.positions[doc_id]):int(self.positions[doc_id + 1])])
+
+    def __iter__(self):
+        """
+        @brief Parcourt tous les documents (reconstruction des annexes de l'index uniquement).
+        """
+        return (self[doc_id] for doc_id in range(len(self)))
+
+    def origines(self):
+        """
+        @brief Retourne le corpus d'origine de chaque document.
+        @return Liste de noms de corpus, dans l'ordre des documents.
+        """
+        if self._origines is None:
+            self._origines = pickle.loads(self._projection[self._position_origines:])
+        return self._origines
@@ -0,0 +1,116 @@
+import os
+import pickle
+import struct
+import numpy as np
+from scipy.sparse import csr_matrix
+
+"""
+@file MatriceCSR.py
+@brief Format natif des matrices creuses (TF, TF-IDF) : tableaux CSR bruts projetés en mémoire.
+
+@details
+Format du fichier ".csr" (entiers little-endian) :
+- en-tête : signature MAGIC, nombre de lignes, de colonnes et de valeurs non nulles,
+  types NumPy de indptr, indices et data, position de chacun des trois tableaux ;
+- les trois tableaux bruts, chacun aligné sur ALIGNEMENT octets.
+
+ouvrir() projette les tableaux avec numpy.memmap et les enveloppe dans une csr_matrix sans copie :
+le chargement ne lit que l'en-tête, et les pages sont partagées entre processus par le cache du système.
+Les matrices sont écrites au format canonique (indices triés, sans doublon) et avec des indices int32
+quand ils suffisent, pour que scipy n'ait ni à réordonner ni à convertir les tableaux projetés.
+"""
+
+class MatriceCSR:
+    """
+    @brief Lecture et écriture des matrices creuses au format CSR projeté en mémoire.
+    """
+
+    MAGIC = b"CSRMAP01"
+    EN_TETE = struct.Struct("<8sQQQ8s8s8sQQQ")
+    ALIGNEMENT = 64
+    EXTENSION = ".csr"
+
+    @staticmethod
+    def _aligner(position):
+        """
+        @brief Arrondit une position au multiple de ALIGNEMENT supérieur.
+        @param position Position en octets.
+        @return Position alignée.
+        """
+        return -(-position // MatriceCSR.ALIGNEMENT) * MatriceCSR.ALIGNEMENT
+
+    @staticmethod
+    def ecrire(chemin, matrice):
+        """
+        @brief Écrit une matrice creuse au format CSR projetable.
+        @details Le fichier est écrit à côté puis renommé : une projection de l'ancien fichier reste valide.
+        @param chemin Chemin du fichier ".csr".
+        @param matrice Matrice creuse (tout format scipy).
+        """
+        csr = csr_matrix(matrice, copy=True)
+        csr.sum_duplicates()
+        csr.sort_indices()
+        type_index = np.int32 if max(csr.nnz, *csr.shape) < np.iinfo(np.int32).max else np.int64
+        tableaux = [csr.indptr.astype(type_index), csr.indices.astype(type_index), csr.data]
+        tableaux = [np.ascontiguousarray(t, dtype=t.dtype.newbyteorder("<")) for t in tableaux]
+
+        positions, position = [], MatriceCSR.EN_TETE.size
+        for tableau in tableaux:
+            position = MatriceCSR._aligner(position)
+            positions.append(position)
+            position += tableau.nbytes
+
+        temporaire = f"{chemin}.tmp"
+        with open(temporaire, 'wb') as f:
+            f.write(MatriceCSR.EN_TETE.pack(MatriceCSR.MAGIC, csr.shape[0], csr.shape[1], csr.nnz,
+                                            *(t.dtype.str.encode() for t in tableaux), *positions))
+            for tableau, position in zip(tableaux, positions):
+                f.write(b"\0" * (position - f.tell()))
+                f.write(tableau.tobytes())
+        os.replace(temporaire, chemin)
+
+    @staticmethod
+    def ouvrir(chemin):
+        """
+        @brief Ouvre une matrice ".csr" sans copier ses tableaux.
+        @param chemin Chemin du fichier.
+        @return csr_matrix en lecture seule dont les tableaux sont des numpy.memmap.
+        @throws ValueError Si le fichier n'est pas au format CSR projeté.
+        """
+        with open(chemin, 'rb') as f:
+            en_tete = f.read(MatriceCSR.EN_TETE.size)
+        if len(en_tete) < MatriceCSR.EN_TETE.size or en_tete[:8] != MatriceCSR.MAGIC:
+            raise ValueError(f"❌ '{chemin}' n'est pas une matrice au format CSR projeté.")
+        _, n_lignes, n_colonnes, nnz, *types_et_positions = MatriceCSR.EN_TETE.unpack(en_tete)
+        types, positions = types_et_positions[:3], types_et_positions[3:]
+
+        tableaux = []
+        for type_tableau, position, taille in zip(types, positions, (n_lignes + 1, nnz, nnz)):
+            dtype = np.dtype(type_tableau.rstrip(b"\0").decode())
+            if taille == 0:
+                tableaux.append(np.empty(0, dtype=dtype))  # une projection ne peut pas être vide
+            else:
+                tableaux.append(np.memmap(chemin, dtype=dtype, mode='r', offset=position, shape=(taille,)))
+        indptr, indices, data = tableaux
+        return csr_matrix((data, indices, indptr), shape=(n_lignes, n_colonnes), copy=False)
+
+    @staticmethod
+    def charger(chemin):
+        """
+        @brief Charge une matrice enregistrée au format ".csr" (projection) ou en pickle (ancien format).
+        @param chemin Chemin du fichier.
+        @return Matrice creuse.
+        """
+        if chemin.endswith(MatriceCSR.EXTENSION):
+            return MatriceCSR.ouvrir(chemin)
+        with open(chemin, 'rb') as f:
+            return pickle.load(f)
+
+    @staticmethod
+    def chemin_natif(chemin):
+        """
+        @brief Chemin ".csr" correspondant à un chemin de matrice (par exemple "matriceTF_x.pkl" -> "matriceTF_x.csr").
+        @param chemin Chemin de la matrice.
+        @return Chemin du fichier au format natif.
+        """
+        return os.path.splitext(chemin)[0] + MatriceCSR.EXTENSION
@@ -2,7 +2,11 @@
 import numpy as np
 from scipy.sparse import csr_matrix
 from collections import defaultdict
-from src.Utils import Utils
+from src.Tokeniseur import Tokeniseur
+from src.MetadonneesDocuments import MetadonneesDocuments
+from src.IndexPositionnel import IndexPositionnel
+from src.Vocabulaire import Vocabulaire
+from src.IndexCorrections import IndexCorrections
 import pickle
 import os
 from src.constantes import *
@@ -21,10 +25,16 @@ class MatriceDocuments:
         self.corpus = corpus
         self.mat_TF = None
         self.mat_TFxIDF = None
-        self.vocab =  {} # Vocabulaire {mot : {id, freq, len}}
+        self.vocab =  {} # Vocabulaire {mot : {id, freq, len}}, converti en Vocabulaire une fois les matrices construites
         self.frequence_mot= defaultdict(int)   # Fréquence des mots dans les documents     
+        self.metadonnees = MetadonneesDocuments(corpus.id2doc.values(), corpus.origines_documents())  # Auteurs, dates, types et thèmes en colonnes
         self.construire_vocab_et_matrice_TF()
         self.construire_matrice_TFxIDF()
+        self.longueurs = self.longueurs_documents(self.mat_TF)  # Longueurs des documents pour BM25
+        self.idf = self.idf_documents(self.mat_TF)  # IDF des mots, lu tel quel par les requêtes
+        self.vocab = Vocabulaire.depuis_dict(self.vocab, self.frequence_mot)  # Forme compacte, enregistrée avec les matrices
+        self.index_positionnel = IndexPositionnel(list(corpus.id2doc.values()), self.vocab)  # Positions des mots pour les expressions exactes
+        self.corrections = IndexCorrections(self.vocab)  # Variantes des mots pour corriger les fautes de frappe des requêtes
    
     def construire_vocab_et_matrice_TF(self):
         """
@@ -36,9 +46,7 @@ class MatriceDocuments:
         index = 0  # Identifiant unique des mots
 
         # Parcourir chaque document du corpus
-        for doc_id, doc in enumerate(self.corpus.id2doc.values()):
-            texte = Utils.nettoyer_texte(doc.texte)
-            mots = texte.lower().split()
+        for doc_id, mots in enumerate(Tokeniseur.flux_tokens(doc.texte for doc in self.corpus.id2doc.values())):
             compteur = defaultdict(int)
 
             # Construire le vocabulaire et remplir la matrice TF
@@ -99,6 +107,80 @@ class MatriceDocuments:
         print(f"Matrice TFxIDF construite (taille : {self.mat_TFxIDF.shape}).")
         
  
+    @staticmethod
+    def idf_documents(mat_TF):
+        """
+        @brief Calcule l'IDF de chaque mot du vocabulaire (même formule que la matrice TFxIDF).
+        @details Le vecteur d'une requête se réduit ensuite à une lecture de ce tableau aux identifiants de ses mots.
+        @param mat_TF Matrice TF (Document x Mots).
+        @return Dictionnaire {'idf': tableau float32 indexé par identifiant de mot, 'n_docs': nombre de documents}.
+        """
+        tf = csr_matrix(mat_TF)
+        tf.sum_duplicates()
+        n_docs = tf.shape[0]
+        frequence_docs = np.bincount(tf.indices, minlength=tf.shape[1])
+        idf = np.log((n_docs + 1) / (frequence_docs + 1)) + 1
+        return {"idf": idf.astype(np.float32), "n_docs": n_docs}
+
+    @staticmethod
+    def ponderer_tfidf(mat_TF, frequence_docs, n_docs):
+        """
+        @brief Construit la matrice TF-IDF avec des statistiques données (même formule que construire_matrice_TFxIDF()).
+        @details Un segment d'index fragmenté ne garde pas de matrice TF-IDF : ses poids dépendent des fréquences
+        documentaires de tout le corpus, qui changent à chaque ajout de documents.
+        @param mat_TF Matrice TF (Document x Mots).
+        @param frequence_docs Nombre de documents du corpus contenant chaque mot.
+        @param n_docs Nombre de documents du corpus.
+        @return Matrice creuse CSR des poids TF-IDF.
+        """
+        idf = np.log((n_docs + 1) / (np.asarray(frequence_docs) + 1)) + 1
+        return csr_matrix(mat_TF.multiply(idf))
+
+    # PONDERATION BM25
+
+    @staticmethod
+    def longueurs_documents(mat_TF):
+        """
+        @brief Calcule la longueur (nombre de mots) de chaque document et la longueur moyenne.
+        @param mat_TF Matrice TF (Document x Mots).
+        @return Dictionnaire {'longueurs': tableau int32, 'longueur_moyenne': float}.
+        """
+        longueurs = np.asarray(mat_TF.sum(axis=1)).ravel().astype(np.int32)
+        return {"longueurs": longueurs, "longueur_moyenne": float(longueurs.mean()) if len(longueurs) else 0.0}
+
+    @staticmethod
+    def ponderer_bm25(mat_TF, longueurs, k1=BM25_K1, b=BM25_B, frequence_docs=None, n_docs=None):
+        r"""
+        @brief Construit la matrice des poids BM25 à partir de la matrice TF.
+        @details
+        Poids du mot t dans le document d : \f$ idf(t) \cdot \frac{tf \cdot (k_1 + 1)}{tf + k_1 (1 - b + b \cdot |d| / moy)} \f$,
+        avec \f$ idf(t) = \log\left(1 + \frac{N - df + 0.5}{df + 0.5}\right) \f$.
+        Les poids saturés sont calculés une fois pour toutes les valeurs non nulles de la matrice :
+        le score d'une requête reste une somme de poids lus dans les postings.
+        @param mat_TF Matrice TF (Document x Mots).
+        @param longueurs Dictionnaire retourné par longueurs_documents().
+        @param k1 Saturation de la fréquence des mots.
+        @param b Normalisation par la longueur des documents.
+        @param frequence_docs Nombre de documents contenant chaque mot (optionnel ; calculé sur mat_TF par défaut).
+        Un fragment d'index fragmenté passe celui de tout le corpus.
+        @param n_docs Nombre de documents du corpus (optionnel ; nombre de lignes de mat_TF par défaut).
+        @return Matrice creuse CSR des poids BM25 (indices triés).
+        """
+        tf = csr_matrix(mat_TF, dtype=np.float64)
+        tf.sum_duplicates()
+        tf.sort_indices()
+        if n_docs is None:
+            n_docs = tf.shape[0]
+        if frequence_docs is None:
+            frequence_docs = np.bincount(tf.indices, minlength=tf.shape[1])
+        idf = np.log(1 + (n_docs - frequence_docs + 0.5) / (frequence_docs + 0.5))
+        longueur_moyenne = longueurs["longueur_moyenne"] or 1.0
+        normes = k1 * (1 - b + b * longueurs["longueurs"] / longueur_moyenne)
+        normes = np.repeat(normes, np.diff(tf.indptr))
+
+        poids = idf[tf.indices] * tf.data * (k1 + 1) / (tf.data + normes)
+        return csr_matrix((poids, tf.indices, tf.indptr), shape=tf.shape)
+
     # AFFICHER MATRICE (DEBUG)
  
     def afficher_matrice(self):
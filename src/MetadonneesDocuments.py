@@ -0,0 +1,130 @@
+import numpy as np
+from datetime import date, datetime
+
+"""
+@file MetadonneesDocuments.py
+@brief Métadonnées des documents stockées en colonnes (tableaux NumPy alignés sur les lignes de la matrice).
+
+@details
+Les filtres par auteur et par date deviennent des masques booléens NumPy calculés sur tout le corpus d'un coup,
+au lieu d'un test Python par document :
+- auteurs, types et thèmes : codes int32 et table de correspondance code -> valeur ;
+- dates : numéro de jour (date.toordinal()) en int32.
+
+Les colonnes corpus et source (csv, RedditArxiv) servent de facettes : dans l'index unifié, qui regroupe
+tous les corpus dans une seule matrice, la sélection de corpus de l'application devient un filtre.
+"""
+
+class MetadonneesDocuments:
+    """
+    @brief Tableaux de métadonnées alignés sur les lignes de la matrice Document x Mots.
+    """
+
+    SOURCES = ("csv", "RedditArxiv")
+
+    def __init__(self, documents, noms_corpus=None):
+        """
+        @brief Construit les colonnes à partir des documents, dans l'ordre des lignes de la matrice.
+        @param documents Itérable de documents (par exemple corpus.id2doc.values()).
+        @param noms_corpus Nom du corpus d'origine de chaque document (optionnel, voir Corpus.origines_documents()).
+        """
+        documents = list(documents)
+        noms_corpus = list(noms_corpus) if noms_corpus is not None else [""] * len(documents)
+        self.auteurs, self.codes_auteurs = self._encoder(doc.auteur for doc in documents)
+        self.types, self.codes_types = self._encoder(doc.getType() for doc in documents)
+        self.themes, self.codes_themes = self._encoder(doc.theme or "" for doc in documents)
+        self.corpus, self.codes_corpus = self._encoder(noms_corpus)
+        self.sources, self.codes_sources = self._encoder(self.source_corpus(nom) for nom in noms_corpus)
+        self.dates = np.array([doc.date.toordinal() for doc in documents], dtype=np.int32)
+        self._index_auteurs = {auteur: code for code, auteur in enumerate(self.auteurs)}
+
+    @staticmethod
+    def _encoder(valeurs):
+        """
+        @brief Encode une colonne de valeurs en codes entiers.
+        @param valeurs Itérable de valeurs (chaînes).
+        @return Tuple (table, codes) : liste des valeurs distinctes et tableau int32 des codes.
+        """
+        table, index, codes = [], {}, []
+        for valeur in valeurs:
+            if valeur not in index:
+                index[valeur] = len(table)
+                table.append(valeur)
+            codes.append(index[valeur])
+        return table, np.array(codes, dtype=np.int32)
+
+    @staticmethod
+    def source_corpus(nom_corpus):
+        """
+        @brief Déduit la source d'un corpus de son nom ("csvdiscours" -> "csv", "RedditArxivhealth" -> "RedditArxiv").
+        @param nom_corpus Nom du corpus.
+        @return Nom de la source, ou le nom du corpus s'il ne commence par aucune source connue.
+        """
+        for source in MetadonneesDocuments.SOURCES:
+            if nom_corpus.startswith(source):
+                return source
+        return nom_corpus
+
+    @staticmethod
+    def _masque_valeurs(table, codes, valeurs):
+        """
+        @brief Masque des documents dont la valeur d'une colonne codée fait partie d'une liste.
+        @param table Table des valeurs distinctes de la colonne.
+        @param codes Codes de la colonne.
+        @param valeurs Valeurs acceptées.
+        @return Tableau booléen aligné sur les documents.
+        """
+        valeurs = set(valeurs)
+        acceptes = [code for code, valeur in enumerate(table) if valeur in valeurs]
+        return np.isin(codes, acceptes)
+
+    @staticmethod
+    def ordinal(valeur):
+        """
+        @brief Convertit une date (date, datetime ou chaîne ISO 'AAAA-MM-JJ') en numéro de jour.
+        @param valeur Date à convertir.
+        @return Numéro de jour (date.toordinal()).
+        """
+        if isinstance(valeur, datetime):
+            valeur = valeur.date()
+        elif isinstance(valeur, str):
+            valeur = date.fromisoformat(valeur[:10])
+        return valeur.toordinal()
+
+    def __len__(self):
+        """
+        @brief Retourne le nombre de documents décrits.
+        """
+        return len(self.dates)
+
+    def masque(self, auteur=None, date_debut=None, date_fin=None, noms_corpus=None, themes=None, sources=None):
+        """
+        @brief Calcule le masque des documents qui respectent les filtres.
+        @param auteur Nom exact de l'auteur (optionnel).
+        @param date_debut Date de début incluse (optionnelle).
+        @param date_fin Date de fin incluse (optionnelle).
+        @param noms_corpus Liste des corpus d'origine acceptés (optionnelle).
+        @param themes Liste des thèmes acceptés (optionnelle).
+        @param sources Liste des sources acceptées, par exemple ["csv"] (optionnelle).
+        @return Tableau booléen aligné sur les documents, ou None si aucun filtre n'est actif.
+        """
+        facettes = [(self.corpus, self.codes_corpus, noms_corpus),
+                    (self.themes, self.codes_themes, themes),
+                    (self.sources, self.codes_sources, sources)]
+        facettes = [(table, codes, valeurs) for table, codes, valeurs in facettes if valeurs is not None]
+        if not auteur and not date_debut and not date_fin and not facettes:
+            return None
+
+        masque = np.ones(len(self), dtype=bool)
+        if auteur:
+            code = self._index_auteurs.get(auteur)
+            if code is None:
+                return np.zeros(len(self), dtype=bool)
+            masque &= self.codes_auteurs == code
+        if date_debut:
+            masque &= self.dates >= self.ordinal(date_debut)
+        if date_fin:
+            masque &= self.dates <= self.ordinal(date_fin)
+        for table, codes, valeurs in facettes:
+            masque &= self._masque_valeurs(table, codes, valeurs)
+        return masque
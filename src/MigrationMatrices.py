@@ -0,0 +1,70 @@
+import argparse
+import os
+import pickle
+import sqlite3
+from src.MatriceCSR import MatriceCSR
+from src.constantes import *
+
+"""
+@file MigrationMatrices.py
+@brief Convertit les matrices TF et TF-IDF enregistrées en pickle vers le format natif ".csr".
+
+@details
+Pour chaque corpus de la base : la matrice pickle est relue, écrite au format ".csr" à côté,
+relue par projection et comparée à l'originale ; le chemin enregistré en base n'est remplacé qu'ensuite.
+Exécution : python -m src.MigrationMatrices [--supprimer-pickles] [corpus ...]
+"""
+
+def migrer_matrices(db_path=DB_PATH, noms_corpus=None, supprimer_pickles=False):
+    """
+    @brief Convertit au format ".csr" les matrices des corpus encore enregistrées en pickle.
+    @param db_path Chemin de la base SQLite des corpus.
+    @param noms_corpus Corpus à migrer (tous par défaut).
+    @param supprimer_pickles Supprime les pickles une fois la conversion vérifiée.
+    @return Liste de tuples (nom_corpus, ancien chemin, nouveau chemin) des matrices converties.
+    """
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    # La table peut contenir plusieurs lignes identiques par corpus : chaque matrice n'est convertie qu'une fois
+    lignes = cursor.execute("SELECT DISTINCT nom_corpus, chemin_TF, chemin_TFIDF FROM corpus").fetchall()
+    migrees = []
+    for nom_corpus, *chemins in lignes:
+        if noms_corpus is not None and nom_corpus not in noms_corpus:
+            continue
+        for colonne, chemin in zip(("chemin_TF", "chemin_TFIDF"), chemins):
+            if not chemin or chemin.endswith(MatriceCSR.EXTENSION):
+                continue
+            if not os.path.exists(chemin):
+                print(f"⚠️ Matrice introuvable pour '{nom_corpus}' : {chemin}")
+                continue
+            with open(chemin, 'rb') as f:
+                matrice = pickle.load(f)
+            chemin_natif = MatriceCSR.chemin_natif(chemin)
+            MatriceCSR.ecrire(chemin_natif, matrice)
+            if (MatriceCSR.ouvrir(chemin_natif) != matrice).nnz:
+                raise ValueError(f"❌ La matrice convertie diffère de l'originale : {chemin_natif}")
+
+            cursor.execute(f"UPDATE corpus SET {colonne} = ? WHERE nom_corpus = ?", (chemin_natif, nom_corpus))
+            conn.commit()
+            if supprimer_pickles:
+                os.remove(chemin)
+            migrees.append((nom_corpus, chemin, chemin_natif))
+            print(f"✅ {nom_corpus} : {os.path.basename(chemin)} -> {os.path.basename(chemin_natif)}")
+    conn.close()
+    return migrees
+
+
+def main():
+    """
+    @brief Point d'entrée de la migration en ligne de commande.
+    """
+    parser = argparse.ArgumentParser(description="Convertit les matrices pickle au format natif .csr")
+    parser.add_argument("corpus", nargs="*", help="corpus à migrer (tous par défaut)")
+    parser.add_argument("--supprimer-pickles", action="store_true", help="supprime les pickles convertis")
+    arguments = parser.parse_args()
+    migrees = migrer_matrices(noms_corpus=arguments.corpus or None, supprimer_pickles=arguments.supprimer_pickles)
+    print(f"📂 {len(migrees)} matrice(s) convertie(s).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+import os
+import heapq
+import sqlite3
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from src.SearchEngine import SearchEngine
+from src.SegmentPostings import SegmentPostings
+from src.IndexCompresse import IndexCompresse
+from src.CacheResultats import CacheResultats
+from src.constantes import *
+
+"""
+@file MoteurFragmente.py
+@brief Recherche dans un index fragmenté (voir IndexFragmente) : un moteur par fragment, ouvert à la demande.
+
+@details
+Le manifeste de l'index est lu dans la table `corpus` : une ligne par fragment, dont la colonne fragment_de
+porte le nom du corpus et premier_document le rang de son premier document dans le corpus.
+Chaque fragment est un corpus ordinaire pour SearchEngine ; seuls les FRAGMENTS_OUVERTS fragments
+les plus récemment utilisés restent en mémoire.
+
+Une recherche calcule les k meilleurs documents de chaque fragment, puis les fusionne par score décroissant
+et rang croissant dans le corpus. Avant d'ouvrir un fragment, le score maximal qu'un de ses documents peut atteindre
+est majoré à l'aide de son segment de postings, projeté sans ouvrir le moteur (plus grande fréquence et plus petite
+longueur de document de chaque mot, voir IndexCompresse) : les fragments sont parcourus par borne décroissante,
+et ceux dont la borne reste sous le k-ième score déjà trouvé (ou qui ne contiennent aucun mot de la requête)
+ne sont pas ouverts. Une requête dont les mots sont répartis dans tout le corpus (ou une requête booléenne,
+qui n'est pas bornée) ouvre encore tous les fragments, l'un après l'autre : au-delà de fragments_ouverts,
+chaque recherche referme et rouvre des fragments. Les fragments partageant le vocabulaire et les statistiques (IDF, longueur moyenne)
+du corpus entier, les résultats sont ceux d'un index construit d'un seul tenant. Les extraits ne sont générés
+que pour les k documents retenus. search_batch() fusionne de même les k meilleurs documents de chaque fragment,
+et suggestion() est celle de n'importe quel fragment (vocabulaire et index des corrections communs).
+La recherche paginée (search_page()) n'est pas disponible : ses curseurs désignent un document d'un seul moteur.
+"""
+
+class MoteurFragmente:
+    """
+    @brief Moteur de recherche d'un corpus découpé en fragments, avec la même interface de recherche que SearchEngine.
+    """
+
+    def __init__(self, nom_corpus, calcul_scores="index", ponderation=PONDERATION_SCORES,
+                 fragments_ouverts=FRAGMENTS_OUVERTS):
+        """
+        @brief Lit le manifeste du corpus ; aucun fragment n'est ouvert.
+        @param nom_corpus Nom du corpus fragmenté.
+        @param calcul_scores Voir SearchEngine.
+        @param ponderation Voir SearchEngine.
+        @param fragments_ouverts Nombre maximal de fragments gardés en mémoire.
+        @throws ValueError Si la base ne contient aucun fragment pour ce corpus.
+        """
+        self.nom_corpus = nom_corpus
+        self.calcul_scores = calcul_scores
+        self.ponderation = ponderation
+        self.fragments_ouverts = max(1, fragments_ouverts)
+        self.manifeste = self.lire_manifeste(nom_corpus)
+        if not self.manifeste:
+            raise ValueError(f"❌ Aucun fragment trouvé pour le corpus '{nom_corpus}' dans la base de données.")
+        self.cache = CacheResultats()
+        self._ouverts = OrderedDict()  # {rang du fragment: moteur}, du moins au plus récemment utilisé
+        self._segments = {}  # {rang du fragment: tableaux projetés de son segment de postings, ou None}
+        self._verrou = threading.Lock()
+        print(f"✅ Index fragmenté '{nom_corpus}' : {len(self.manifeste)} fragments.")
+
+    @staticmethod
+    def lire_manifeste(nom_corpus):
+        """
+        @brief Lit dans la base les fragments d'un corpus.
+        @param nom_corpus Nom du corpus.
+        @return Liste de tuples (nom du fragment, rang de son premier document, génération), par rang croissant ;
+        vide si le corpus n'est pas fragmenté (ou si la base ne gère pas encore les fragments).
+        """
+        conn = sqlite3.connect(DB_PATH)
+        try:
+            return conn.execute(
+                "SELECT nom_corpus, premier_document, generation FROM corpus WHERE fragment_de = ? "
+                "ORDER BY premier_document", (nom_corpus,)).fetchall()
+        except sqlite3.OperationalError:
+            return []
+        finally:
+            conn.close()
+
+    @staticmethod
+    def est_fragmente(nom_corpus):
+        """
+        @brief Indique si un corpus est enregistré comme index fragmenté.
+        @param nom_corpus Nom du corpus.
+        @return True si la base contient ses fragments.
+        """
+        return bool(MoteurFragmente.lire_manifeste(nom_corpus))
+
+    def __len__(self):
+        """
+        @brief Retourne le nombre de fragments.
+        """
+        return len(self.manifeste)
+
+    def fragment(self, rang):
+        """
+        @brief Retourne le moteur d'un fragment, en l'ouvrant si besoin (le moins récemment utilisé est refermé).
+        @param rang Rang du fragment dans le manifeste.
+        @return Instance de SearchEngine.
+        """
+        with self._verrou:
+            moteur = self._ouverts.get(rang)
+            if moteur is None:
+                moteur = SearchEngine(self.manifeste[rang][0], self.calcul_scores, self.ponderation)
+                self._ouverts[rang] = moteur
+                while len(self._ouverts) > self.fragments_ouverts:
+                    self._ouverts.popitem(last=False)
+            self._ouverts.move_to_end(rang)
+            return moteur
+
+    def fragments_charges(self):
+        """
+        @brief Liste les fragments en mémoire, du moins au plus récemment utilisé.
+        @return Liste des noms de fragments.
+        """
+        with self._verrou:
+            return [self.manifeste[rang][0] for rang in self._ouverts]
+
+    def moteur_courant(self):
+        """
+        @brief Retourne le moteur du fragment le plus récemment utilisé (le premier fragment si aucun n'est ouvert).
+        @details Pour les opérations qui ne dépendent que du vocabulaire commun : aucun autre fragment n'est ouvert.
+        @return Instance de SearchEngine.
+        """
+        with self._verrou:
+            rang = next(reversed(self._ouverts), 0)
+        return self.fragment(rang)
+
+    def tableaux_segment(self, rang):
+        """
+        @brief Retourne les tableaux projetés du segment de postings d'un fragment, sans ouvrir son moteur.
+        @details Les segments écrits ne sont plus modifiés : la projection est gardée (elle n'occupe pas de mémoire
+        tant que ses pages ne sont pas lues).
+        @param rang Rang du fragment dans le manifeste.
+        @return Dictionnaire {nom: tableau} (voir SegmentPostings.projeter()), ou None si le fragment
+        n'a pas de segment de postings.
+        """
+        with self._verrou:
+            if rang in self._segments:
+                return self._segments[rang]
+        nom = self.manifeste[rang][0]
+        conn = sqlite3.connect(DB_PATH)
+        try:
+            ligne = conn.execute("SELECT chemin_TF FROM corpus WHERE nom_corpus = ?", (nom,)).fetchone()
+        finally:
+            conn.close()
+        tableaux = None
+        if ligne and ligne[0]:
+            chemin = os.path.join(os.path.dirname(ligne[0]), f"postings_{nom}{SegmentPostings.EXTENSION}")
+            if os.path.exists(chemin):
+                tableaux = SegmentPostings.projeter(chemin)[2]
+        with self._verrou:
+            self._segments[rang] = tableaux
+        return tableaux
+
+    def bornes_fragments(self, mots_cles):
+        """
+        @brief Majore, pour chaque fragment, le score qu'un de ses documents peut obtenir pour une requête.
+        @details Les mots de la requête et leurs poids sont ceux du moteur courant (vocabulaire commun) ; la borne
+        d'un fragment est la somme des poids de la requête par les bornes de poids de ses mots
+        (IndexCompresse.bornes_poids(), calculées avec les statistiques du corpus entier).
+        @param mots_cles Mots-clés de la requête.
+        @return Tableau float64 des bornes (0 : aucun mot de la requête dans le fragment ; inf : pas de borne,
+        pour une requête booléenne ou un segment écrit sans les bornes).
+        """
+        bornes = np.full(len(self.manifeste), np.inf)
+        moteur = self.moteur_courant()
+        if moteur.requete_booleenne(mots_cles) is not None:
+            return bornes
+        termes_ids, poids = moteur.termes_requete(mots_cles)
+        idf = IndexCompresse.idf_termes(self.ponderation, moteur.idf["frequences_documents"][termes_ids],
+                                        moteur.idf["n_docs"])
+        for rang in range(len(self.manifeste)):
+            tableaux = self.tableaux_segment(rang)
+            if tableaux is None or "tf_max" not in tableaux:
+                continue
+            # Les mots apparus après l'écriture du segment n'y ont aucun posting
+            connus = termes_ids < len(tableaux["tf_max"])
+            tf_max, longueurs_min = np.zeros(len(termes_ids), dtype=np.int64), np.zeros(len(termes_ids), dtype=np.int64)
+            tf_max[connus] = tableaux["tf_max"][termes_ids[connus]]
+            longueurs_min[connus] = tableaux["longueurs_min"][termes_ids[connus]]
+            bornes[rang] = np.dot(poids, IndexCompresse.bornes_poids(
+                tf_max, longueurs_min, idf, self.ponderation, moteur.k1, moteur.b,
+                moteur.longueurs["longueur_moyenne"] or 1.0))
+        return bornes
+
+    def est_perime(self):
+        """
+        @brief Indique si le manifeste a changé dans la base (corpus reconstruit) depuis le chargement.
+        @return True si le moteur doit être rechargé.
+        """
+        return self.lire_manifeste(self.nom_corpus) != self.manifeste
+
+    def empreinte_memoire(self):
+        """
+        @brief Estime la mémoire occupée par les fragments ouverts.
+        @return Taille estimée en octets.
+        """
+        with self._verrou:
+            return sum(moteur.empreinte_memoire() for moteur in self._ouverts.values())
+
+    def search(self, mots_cles, n_resultats=20, auteur=None, date_debut=None, date_fin=None, noms_corpus=None,
+               expression_exacte=True):
+        """
+        @brief Recherche des documents dans tous les fragments (voir SearchEngine.search()).
+        @return DataFrame contenant les résultats triés par pertinence.
+        """
+        cle = SearchEngine.cle_cache(mots_cles, n_resultats, auteur, date_debut, date_fin, noms_corpus, expression_exacte)
+        resultats = self.cache.obtenir(cle)
+        if resultats is None:
+            resultats = self._search(mots_cles, n_resultats, auteur, date_debut, date_fin, noms_corpus, expression_exacte)
+            self.cache.stocker(cle, resultats)
+        return resultats.copy()
+
+    def suggestion(self, mots_cles):
+        """
+        @brief Requête corrigée à proposer ("Vouliez-vous dire...") (voir SearchEngine.suggestion()).
+        @details Les fragments partagent le vocabulaire et l'index des corrections : tous proposent la même correction.
+        @param mots_cles Mots-clés de la requête.
+        @return Requête corrigée, ou None si aucun mot n'a été corrigé.
+        """
+        return self.moteur_courant().suggestion(mots_cles)
+
+    def search_page(self, mots_cles=None, taille_page=20, curseur=None, auteur=None, date_debut=None, date_fin=None,
+                    noms_corpus=None, expression_exacte=True):
+        """
+        @brief Recherche paginée : non disponible pour un index fragmenté.
+        @details Le curseur de SearchEngine.search_page() désigne un document et un tampon de candidats d'un seul
+        moteur ; les pages d'un index fragmenté se lisent avec search() et un nombre de résultats croissant.
+        @throws ValueError Toujours.
+        """
+        raise ValueError(f"❌ La recherche paginée n'est pas disponible pour l'index fragmenté '{self.nom_corpus}' : "
+                         f"utilisez search() avec n_resultats.")
+
+    def search_batch(self, queries, k=20, filters=None):
+        """
+        @brief Recherche un lot de requêtes dans tous les fragments (voir SearchEngine.search_batch()).
+        @details Chaque fragment est ouvert une seule fois pour tout le lot ; ses k meilleurs documents pour chaque
+        requête sont fusionnés par score décroissant et rang croissant dans le corpus.
+        @param queries Liste de requêtes (chaînes de mots-clés).
+        @param k Nombre maximum de résultats par requête.
+        @param filters Voir SearchEngine.search_batch().
+        @return Liste (une entrée par requête) de tuples (doc_ids, scores) triés par score décroissant,
+        doc_ids étant les rangs des documents dans le corpus.
+        """
+        meilleurs = [[] for _ in queries]  # tuples (-score, rang dans le corpus) de chaque requête
+        for rang, (_, premier_document, _) in enumerate(self.manifeste):
+            for i, (doc_ids, scores) in enumerate(self.fragment(rang).search_batch(queries, k, filters)):
+                meilleurs[i] = heapq.nsmallest(k, meilleurs[i] + [
+                    (-score, premier_document + int(doc_id)) for doc_id, score in zip(doc_ids, scores)])
+        return [(np.array([doc_id for _, doc_id in resultats], dtype=np.int64),
+                 np.array([-score for score, _ in resultats], dtype=np.float64)) for resultats in meilleurs]
+
+    def _search(self, mots_cles, n_resultats, auteur, date_debut, date_fin, noms_corpus, expression_exacte=True):
+        """
+        @brief Exécute une recherche sans passer par le cache : k meilleurs de chaque fragment, puis fusion.
+        @details Les fragments sont parcourus par borne décroissante (voir bornes_fragments()) ; un fragment
+        dont la borne (avec une marge pour les arrondis) reste sous le k-ième score trouvé n'est pas ouvert.
+        @return DataFrame contenant les résultats triés par pertinence.
+        """
+        bornes = self.bornes_fragments(mots_cles)
+        meilleurs, mots_extraits = [], {}  # meilleurs : tuples (-score, rang dans le corpus, fragment, document)
+        for rang in np.argsort(-bornes, kind="stable").tolist():
+            if bornes[rang] == 0 or (len(meilleurs) >= n_resultats and bornes[rang] * (1 + 1e-9) < -meilleurs[-1][0]):
+                continue
+            premier_document = self.manifeste[rang][1]
+            candidats = self.fragment(rang).candidats(mots_cles, auteur, date_debut, date_fin, noms_corpus,
+                                                      expression_exacte, k=n_resultats)
+            if candidats is None:
+                continue
+            doc_ids, scores, accepter, mots_extraits[rang] = candidats
+            retenus = self.fragment(rang).meilleurs_documents(doc_ids, scores, n_resultats, accepter)
+            meilleurs = heapq.nsmallest(n_resultats, meilleurs + [
+                (-score, premier_document + int(doc_id), rang, doc_id) for doc_id, score in retenus])
+
+        if not meilleurs:
+            print("⚠️ Aucun document trouvé contenant l'expression exacte.")
+            return pd.DataFrame(columns=["Titre", "Extrait", "URL", "Score"])
+
+        # Extraits générés par le moteur de chaque fragment retenu ; l'index des tableaux est la place finale
+        tableaux = []
+        for rang in dict.fromkeys(rang for _, _, rang, _ in meilleurs):
+            places = [place for place, (_, _, r, _) in enumerate(meilleurs) if r == rang]
+            tableau = self.fragment(rang).tableau_resultats(
+                [(meilleurs[place][3], -meilleurs[place][0]) for place in places], mots_extraits[rang])
+            tableau.index = places
+            tableaux.append(tableau)
+        return pd.concat(tableaux).sort_index().reset_index(drop=True)
@@ -0,0 +1,170 @@
+import time
+import heapq
+import threading
+import multiprocessing
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait
+import pandas as pd
+from src.RegistreMoteurs import RegistreMoteurs
+from src.constantes import *
+
+"""
+@file RechercheFederee.py
+@brief Recherche simultanée sur plusieurs corpus avec fusion des meilleurs résultats.
+
+@details
+Les corpus sont interrogés en même temps ; le temps total tend vers celui du corpus le plus lent
+et non vers la somme des temps. Les résultats sont fusionnés par un tas en un classement global des k meilleurs documents.
+Le temps de chaque corpus est mesuré, et les corpus qui dépassent le délai sont signalés.
+
+Deux modes d'exécution :
+- "fils" : pool de fils partagé, les moteurs sont ceux du registre du processus (aucune copie en mémoire) ;
+- "processus" : chaque corpus est attribué à un processus dédié qui garde son propre registre de moteurs.
+  Les parties Python de la recherche (extraits, DataFrame) s'exécutent alors réellement en parallèle.
+"""
+
+
+def _rechercher(registre, nom_corpus, mots_cles, parametres):
+    """
+    @brief Recherche dans un corpus en mesurant le temps écoulé (chargement éventuel compris).
+    @param registre Registre des moteurs.
+    @param nom_corpus Nom du corpus.
+    @param mots_cles Mots-clés de la requête.
+    @param parametres Paramètres transmis à SearchEngine.search.
+    @return Tuple (résultats, durée en secondes).
+    """
+    debut = time.perf_counter()
+    resultats = registre.obtenir(nom_corpus).search(mots_cles, **parametres)
+    return resultats, time.perf_counter() - debut
+
+
+def _rechercher_dans_processus(nom_corpus, mots_cles, parametres):
+    """
+    @brief Recherche exécutée dans un processus de travail, avec le registre propre à ce processus.
+    """
+    return _rechercher(RegistreMoteurs(), nom_corpus, mots_cles, parametres)
+
+
+class RechercheFederee:
+    """
+    @brief Recherche parallèle sur plusieurs corpus.
+    """
+    MODES = ("fils", "processus")
+    _executeur_fils = None
+    _executeurs_processus = {}
+    _verrou = threading.Lock()
+
+    def __init__(self, registre=None, mode=MODE_RECHERCHE_FEDEREE, n_workers=8, delai_max=DELAI_RECHERCHE_CORPUS):
+        """
+        @brief Initialise la recherche fédérée.
+        @param registre Registre des moteurs utilisé en mode "fils" (par défaut le registre partagé du processus).
+        @param mode "fils" ou "processus".
+        @param n_workers Nombre maximal de fils ou de processus de travail (pris en compte à leur création).
+        @param delai_max Délai maximal en secondes accordé à l'ensemble des corpus, interrogés en parallèle :
+        il court pour tous à la fois depuis la soumission de la recherche.
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"Mode inconnu '{mode}' (attendu : {', '.join(self.MODES)}).")
+        self.registre = registre or RegistreMoteurs()
+        self.mode = mode
+        self.n_workers = n_workers
+        self.delai_max = delai_max
+
+    def _soumettre(self, nom_corpus, mots_cles, parametres):
+        """
+        @brief Soumet la recherche d'un corpus au pool correspondant au mode.
+        @details
+        En mode "processus", un corpus est toujours traité par le même processus : il n'y est chargé qu'une fois.
+        @return Future de la recherche.
+        """
+        with RechercheFederee._verrou:
+            if self.mode == "fils":
+                if RechercheFederee._executeur_fils is None:
+                    RechercheFederee._executeur_fils = ThreadPoolExecutor(
+                        max_workers=self.n_workers, thread_name_prefix="recherche")
+                return RechercheFederee._executeur_fils.submit(
+                    _rechercher, self.registre, nom_corpus, mots_cles, parametres)
+
+            executeurs = RechercheFederee._executeurs_processus
+            if nom_corpus not in executeurs:
+                pools = list(dict.fromkeys(executeurs.values()))
+                if len(pools) < self.n_workers:
+                    # "spawn" : le processus de travail ne dépend pas de l'état (fils, verrous) du processus courant
+                    executeurs[nom_corpus] = ProcessPoolExecutor(
+                        max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+                else:
+                    executeurs[nom_corpus] = pools[len(executeurs) % len(pools)]
+            return executeurs[nom_corpus].submit(_rechercher_dans_processus, nom_corpus, mots_cles, parametres)
+
+    @classmethod
+    def arreter(cls):
+        """
+        @brief Arrête les pools de fils et de processus partagés.
+        """
+        with cls._verrou:
+            if cls._executeur_fils is not None:
+                cls._executeur_fils.shutdown(wait=False, cancel_futures=True)
+                cls._executeur_fils = None
+            for executeur in set(cls._executeurs_processus.values()):
+                executeur.shutdown(wait=False, cancel_futures=True)
+            cls._executeurs_processus = {}
+
+    def rechercher(self, noms_corpus, mots_cles, n_resultats=20, auteur=None, date_debut=None, date_fin=None):
+        """
+        @brief Interroge plusieurs corpus en parallèle.
+        @param noms_corpus Liste des noms de corpus.
+        @param mots_cles Mots-clés de la requête.
+        @param n_resultats Nombre maximum de résultats par corpus et pour le classement global.
+        @param auteur Filtrer par auteur (optionnel).
+        @param date_debut Date de début de la plage (optionnel).
+        @param date_fin Date de fin de la plage (optionnel).
+        @return Dictionnaire avec les clés :
+        - "resultats_par_corpus" : {nom_corpus: DataFrame} des corpus ayant répondu, dans l'ordre demandé ;
+        - "top_k" : DataFrame des n_resultats meilleurs documents tous corpus confondus (colonne "Corpus" ajoutée) ;
+        - "durees" : {nom_corpus: secondes} ;
+        - "expires" : liste des corpus n'ayant pas répondu dans le délai ;
+        - "erreurs" : {nom_corpus: message} des corpus en erreur.
+        """
+        parametres = dict(n_resultats=n_resultats, auteur=auteur, date_debut=date_debut, date_fin=date_fin)
+        noms_corpus = list(dict.fromkeys(noms_corpus))
+        taches = {self._soumettre(nom_corpus, mots_cles, parametres): nom_corpus for nom_corpus in noms_corpus}
+        terminees, en_retard = wait(taches, timeout=self.delai_max)
+
+        resultats_par_corpus, durees, erreurs = {}, {}, {}
+        for tache in terminees:
+            nom_corpus = taches[tache]
+            try:
+                resultats_par_corpus[nom_corpus], durees[nom_corpus] = tache.result()
+            except Exception as e:
+                erreurs[nom_corpus] = str(e)
+                print(f"❌ Recherche impossible dans le corpus '{nom_corpus}' : {e}")
+        expires = [nom_corpus for nom_corpus in noms_corpus if nom_corpus in {taches[tache] for tache in en_retard}]
+        for nom_corpus in expires:
+            print(f"⏱️ Le corpus '{nom_corpus}' n'a pas répondu en {self.delai_max} s.")
+
+        resultats_par_corpus = {nom: resultats_par_corpus[nom] for nom in noms_corpus if nom in resultats_par_corpus}
+        return {
+            "resultats_par_corpus": resultats_par_corpus,
+            "top_k": self.fusionner(resultats_par_corpus, n_resultats),
+            "durees": durees,
+            "expires": expires,
+            "erreurs": erreurs,
+        }
+
+    @staticmethod
+    def fusionner(resultats_par_corpus, k):
+        """
+        @brief Fusionne des résultats triés par score décroissant en un classement global des k meilleurs.
+        @details Fusion par tas (heapq.merge) : seuls les k premiers éléments sont parcourus.
+        @param resultats_par_corpus Dictionnaire {nom_corpus: DataFrame trié par score décroissant}.
+        @param k Nombre de résultats à conserver.
+        @return DataFrame des k meilleurs résultats, avec une colonne "Corpus".
+        """
+        flux = [
+            [dict(ligne, Corpus=nom_corpus) for ligne in resultats.head(k).to_dict("records")]
+            for nom_corpus, resultats in resultats_par_corpus.items() if not resultats.empty
+        ]
+        meilleurs = list(islice(heapq.merge(*flux, key=lambda ligne: ligne["Score"], reverse=True), k))
+        if not meilleurs:
+            return pd.DataFrame(columns=["Titre", "Extrait", "URL", "Score", "Corpus"])
+        return pd.DataFrame(meilleurs)
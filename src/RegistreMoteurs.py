@@ -0,0 +1,141 @@
+import threading
+from collections import OrderedDict
+from src.SearchEngine import SearchEngine
+from src.MoteurFragmente import MoteurFragmente
+from src.constantes import *
+
+"""
+@file RegistreMoteurs.py
+@brief Registre partagé des moteurs de recherche chargés en mémoire.
+
+@details
+Charger un SearchEngine relit la base SQLite et désérialise plusieurs fichiers pickle.
+Le registre garde les moteurs chargés d'une requête (et d'une session Streamlit) à l'autre :
+- un seul moteur par nom de corpus pour tout le processus ;
+- déchargement des corpus les moins récemment utilisés (LRU) au-delà d'un budget mémoire ;
+- rechargement d'un corpus uniquement si la date ou la taille de ses fichiers DataPkl a changé.
+"""
+
+class RegistreMoteurs:
+    """
+    @brief Singleton gardant les moteurs de recherche chargés, avec éviction LRU.
+    """
+    _instance = None
+    _verrou_instance = threading.Lock()
+
+    def __new__(cls, budget_memoire=BUDGET_MEMOIRE_MOTEURS):
+        """
+        @brief Retourne l'instance unique du registre (créée au premier appel).
+        @param budget_memoire Mémoire maximale en octets pour l'ensemble des moteurs chargés.
+        """
+        if cls._instance is None:
+            with cls._verrou_instance:
+                if cls._instance is None:
+                    instance = super(RegistreMoteurs, cls).__new__(cls)
+                    instance.budget_memoire = budget_memoire
+                    instance._moteurs = OrderedDict()  # {nom_corpus: moteur}, du moins au plus récemment utilisé
+                    instance._verrou = threading.Lock()
+                    instance._verrous_chargement = {}
+                    instance.chargements = 0
+                    instance.evictions = 0
+                    cls._instance = instance
+        return cls._instance
+
+    @classmethod
+    def reset_instance(cls):
+        """
+        @brief Réinitialise l'instance du Singleton (utile pour les tests).
+        """
+        cls._instance = None
+
+    def obtenir(self, nom_corpus):
+        """
+        @brief Retourne le moteur d'un corpus, en le chargeant si besoin.
+        @details Le moteur en mémoire est réutilisé tant que ses fichiers sources n'ont pas changé.
+        Deux demandes simultanées pour le même corpus ne déclenchent qu'un seul chargement.
+        @param nom_corpus Nom du corpus.
+        @return Instance de SearchEngine (ou MoteurFragmente pour un index fragmenté) prête à l'emploi.
+        """
+        moteur = self._moteur_a_jour(nom_corpus)
+        if moteur is not None:
+            return moteur
+
+        with self._verrou:
+            verrou_corpus = self._verrous_chargement.setdefault(nom_corpus, threading.Lock())
+
+        with verrou_corpus:
+            # Un autre fil a pu charger le corpus pendant l'attente du verrou
+            moteur = self._moteur_a_jour(nom_corpus)
+            if moteur is not None:
+                return moteur
+
+            # Un index fragmenté est servi par un moteur qui ouvre ses fragments à la demande
+            moteur = MoteurFragmente(nom_corpus) if MoteurFragmente.est_fragmente(nom_corpus) else SearchEngine(nom_corpus)
+            with self._verrou:
+                self._moteurs[nom_corpus] = moteur
+                self._moteurs.move_to_end(nom_corpus)
+                self.chargements += 1
+                self._evincer()
+            return moteur
+
+    def _moteur_a_jour(self, nom_corpus):
+        """
+        @brief Retourne le moteur en mémoire s'il est encore valide, et le marque comme récemment utilisé.
+        @param nom_corpus Nom du corpus.
+        @return Le moteur, ou None s'il est absent ou périmé.
+        """
+        with self._verrou:
+            moteur = self._moteurs.get(nom_corpus)
+            if moteur is None:
+                return None
+            if moteur.est_perime():
+                print(f"🔄 Fichiers modifiés, rechargement du corpus '{nom_corpus}'.")
+                del self._moteurs[nom_corpus]
+                return None
+            self._moteurs.move_to_end(nom_corpus)
+            return moteur
+
+    def _evincer(self):
+        """
+        @brief Décharge les moteurs les moins récemment utilisés tant que le budget mémoire est dépassé.
+        @details Le moteur le plus récent est toujours conservé, même s'il dépasse seul le budget.
+        """
+        while len(self._moteurs) > 1 and self.memoire_utilisee() > self.budget_memoire:
+            nom_corpus, _ = self._moteurs.popitem(last=False)
+            self.evictions += 1
+            print(f"♻️ Corpus '{nom_corpus}' déchargé (budget mémoire dépassé).")
+
+    def memoire_utilisee(self):
+        """
+        @brief Estime la mémoire occupée par les moteurs chargés.
+        @return Taille estimée en octets.
+        """
+        return sum(moteur.empreinte_memoire() for moteur in self._moteurs.values())
+
+    def definir_budget(self, budget_memoire):
+        """
+        @brief Modifie le budget mémoire et décharge immédiatement les corpus en trop.
+        @param budget_memoire Nouveau budget en octets.
+        """
+        with self._verrou:
+            self.budget_memoire = budget_memoire
+            self._evincer()
+
+    def invalider(self, nom_corpus=None):
+        """
+        @brief Retire un corpus (ou tous) du registre ; il sera rechargé à la prochaine demande.
+        @param nom_corpus Nom du corpus à retirer, ou None pour tout vider.
+        """
+        with self._verrou:
+            if nom_corpus is None:
+                self._moteurs.clear()
+            else:
+                self._moteurs.pop(nom_corpus, None)
+
+    def corpus_charges(self):
+        """
+        @brief Liste les corpus en mémoire, du moins au plus récemment utilisé.
+        @return Liste des noms de corpus.
+        """
+        with self._verrou:
+            return list(self._moteurs.keys())
@@ -0,0 +1,206 @@
+import re
+import numpy as np
+from src.Tokeniseur import Tokeniseur
+
+"""
+@file RequeteBooleenne.py
+@brief Requêtes booléennes (AND, OR, NOT, parenthèses) exécutées sur les listes de postings triées.
+
+@details
+Grammaire (les opérateurs s'écrivent en majuscules ; deux mots juxtaposés sont reliés par AND) :
+    ou    := et ("OR" et)*
+    et    := non ("AND"? non)*
+    non   := "NOT" non | atome
+    atome := "(" ou ")" | mot
+L'arbre est fait de tuples : ("mot", mot normalisé), ("et", enfants), ("ou", enfants), ("non", enfant).
+
+Chaque mot est remplacé par la liste triée des documents qui le contiennent. Un AND intersecte ses listes
+de la plus courte à la plus longue : chaque document de la liste courante est cherché par dichotomie (searchsorted)
+dans la seule tranche de l'autre liste qui recouvre ses valeurs extrêmes, d'où un coût proportionnel à la liste
+la plus courte. Un NOT sous un AND est une différence calculée de la même façon.
+"""
+
+class RequeteBooleenne:
+    """
+    @brief Analyse et exécution d'une requête booléenne.
+    """
+
+    OPERATEURS = ("AND", "OR", "NOT")
+    MOTIF_JETONS = re.compile(r"\(|\)|[^\s()]+")
+    MOTIF_BOOLEEN = re.compile(r"[()]|(?<![^\s(])(?:AND|OR|NOT)(?![^\s)])")
+
+    def __init__(self, texte):
+        """
+        @brief Analyse une requête booléenne.
+        @param texte Requête brute, par exemple "climate AND NOT (politics OR election)".
+        @throws ValueError Si la requête est mal formée (parenthèse non fermée, opérateur sans opérande).
+        """
+        self.texte = texte
+        self._jetons = self.MOTIF_JETONS.findall(texte)
+        self._position = 0
+        self.arbre = self._ou() if self._jetons else None
+        if self.arbre is None or self._position < len(self._jetons):
+            raise ValueError(f"❌ Requête booléenne invalide : '{texte}'.")
+
+    @staticmethod
+    def est_booleenne(texte):
+        """
+        @brief Indique si une requête utilise des opérateurs booléens ou des parenthèses.
+        @param texte Requête brute.
+        @return True si la requête doit être exécutée comme une requête booléenne.
+        """
+        return RequeteBooleenne.MOTIF_BOOLEEN.search(texte) is not None
+
+    def _jeton(self):
+        """
+        @brief Retourne le jeton courant sans le consommer (None en fin de requête).
+        """
+        return self._jetons[self._position] if self._position < len(self._jetons) else None
+
+    def _ou(self):
+        """
+        @brief Analyse une disjonction : et ("OR" et)*.
+        """
+        enfants = [self._et()]
+        while self._jeton() == "OR":
+            self._position += 1
+            enfants.append(self._et())
+        if any(enfant is None for enfant in enfants):
+            return None
+        return enfants[0] if len(enfants) == 1 else ("ou", tuple(enfants))
+
+    def _et(self):
+        """
+        @brief Analyse une conjonction : non ("AND"? non)*, AND étant implicite entre deux termes juxtaposés.
+        """
+        enfants = [self._non()]
+        while self._jeton() not in (None, "OR", ")"):
+            if self._jeton() == "AND":
+                self._position += 1
+            enfants.append(self._non())
+        enfants = [enfant for enfant in enfants if enfant != ("vide",)]
+        if not enfants or any(enfant is None for enfant in enfants):
+            return None
+        return enfants[0] if len(enfants) == 1 else ("et", tuple(enfants))
+
+    def _non(self):
+        """
+        @brief Analyse une négation : "NOT" non | atome.
+        """
+        if self._jeton() == "NOT":
+            self._position += 1
+            enfant = self._non()
+            return None if enfant in (None, ("vide",)) else ("non", enfant)
+        return self._atome()
+
+    def _atome(self):
+        """
+        @brief Analyse une sous-requête entre parenthèses ou un mot.
+        @return Nœud de l'arbre, ("vide",) pour un mot réduit à rien par la normalisation, None si la requête est invalide.
+        """
+        jeton = self._jeton()
+        if jeton is None or jeton in self.OPERATEURS or jeton == ")":
+            return None
+        self._position += 1
+        if jeton == "(":
+            noeud = self._ou()
+            if self._jeton() != ")":
+                return None
+            self._position += 1
+            return noeud
+        mots = Tokeniseur.tokens_requete(jeton)
+        return ("mot", mots[0]) if mots else ("vide",)
+
+    def mots(self, noeud=None, negatif=False):
+        """
+        @brief Mots de la requête, avec leur polarité.
+        @param noeud Nœud de départ (la racine par défaut).
+        @param negatif True si le nœud est sous un NOT.
+        @return Liste de tuples (mot, sous_un_not), dans l'ordre de la requête.
+        """
+        noeud = self.arbre if noeud is None else noeud
+        if noeud[0] == "mot":
+            return [(noeud[1], negatif)]
+        if noeud[0] == "non":
+            return self.mots(noeud[1], True)
+        return [mot for enfant in noeud[1] for mot in self.mots(enfant, negatif)]
+
+    def mots_positifs(self):
+        """
+        @brief Mots hors de toute négation, sans doublon : ce sont eux qui donnent leur score aux documents.
+        @return Liste de mots.
+        """
+        return list(dict.fromkeys(mot for mot, negatif in self.mots() if not negatif))
+
+    @staticmethod
+    def appartient(docs, liste):
+        """
+        @brief Indique pour chaque document s'il figure dans une liste triée.
+        @details
+        Seule la tranche de la liste comprise entre le premier et le dernier document cherché est parcourue
+        (saut vers la zone utile), puis chaque document y est cherché par dichotomie : O(len(docs) x log(len(liste))).
+        @param docs Documents cherchés, triés.
+        @param liste Liste triée de documents.
+        @return Masque booléen aligné sur docs.
+        """
+        if len(docs) == 0 or len(liste) == 0:
+            return np.zeros(len(docs), dtype=bool)
+        debut = np.searchsorted(liste, docs[0], side="left")
+        fin = np.searchsorted(liste, docs[-1], side="right")
+        tranche = liste[debut:fin]
+        positions = np.searchsorted(tranche, docs)
+        trouves = positions < len(tranche)
+        trouves[trouves] = tranche[positions[trouves]] == docs[trouves]
+        return trouves
+
+    @staticmethod
+    def intersecter(listes):
+        """
+        @brief Intersection de listes triées, de la plus courte à la plus longue.
+        @param listes Listes triées de documents.
+        @return Documents présents dans toutes les listes.
+        """
+        listes = sorted(listes, key=len)
+        resultat = listes[0]
+        for liste in listes[1:]:
+            if len(resultat) == 0:
+                break
+            resultat = resultat[RequeteBooleenne.appartient(resultat, liste)]
+        return resultat
+
+    @staticmethod
+    def soustraire(docs, listes):
+        """
+        @brief Retire d'une liste triée les documents présents dans d'autres listes.
+        @param docs Liste triée de documents.
+        @param listes Listes triées des documents à retirer.
+        @return Documents de docs absents de toutes les listes.
+        """
+        for liste in sorted(listes, key=len):
+            if len(docs) == 0:
+                break
+            docs = docs[~RequeteBooleenne.appartient(docs, liste)]
+        return docs
+
+    def executer(self, documents_mot, n_docs, noeud=None):
+        """
+        @brief Calcule l'ensemble des documents satisfaisant la requête.
+        @param documents_mot Fonction mot -> tableau trié des documents contenant le mot.
+        @param n_docs Nombre de documents du corpus (complément des négations isolées).
+        @param noeud Nœud à évaluer (la racine par défaut).
+        @return Tableau trié (int32) des documents.
+        """
+        noeud = self.arbre if noeud is None else noeud
+        if noeud[0] == "mot":
+            return np.asarray(documents_mot(noeud[1]), dtype=np.int32)
+        if noeud[0] == "non":
+            return self.soustraire(np.arange(n_docs, dtype=np.int32), [self.executer(documents_mot, n_docs, noeud[1])])
+        if noeud[0] == "ou":
+            listes = [self.executer(documents_mot, n_docs, enfant) for enfant in noeud[1]]
+            return np.unique(np.concatenate(listes)).astype(np.int32)
+
+        # "et" : intersection des termes positifs, puis différence avec les termes sous NOT
+        positifs = [self.executer(documents_mot, n_docs, enfant) for enfant in noeud[1] if enfant[0] != "non"]
+        negatifs = [self.executer(documents_mot, n_docs, enfant[1]) for enfant in noeud[1] if enfant[0] == "non"]
+        docs = self.intersecter(positifs) if positifs else np.arange(n_docs, dtype=np.int32)
+        return self.soustraire(docs, negatifs)
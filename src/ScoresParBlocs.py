@@ -0,0 +1,101 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from scipy.sparse import csr_matrix
+
+"""
+@file ScoresParBlocs.py
+@brief Calcul des scores d'une grande matrice découpée en blocs de lignes (documents), traités en parallèle.
+
+@details
+La matrice des poids (Document x Mots, CSR) est découpée en blocs de lignes consécutives contenant à peu près
+le même nombre de postings ; chaque bloc est une vue sur les tableaux de la matrice (aucune copie des poids).
+Pour une requête, chaque bloc calcule ses scores (produit matrice x vecteur de scipy, qui libère le GIL),
+puis applique le traitement fourni par le moteur (filtres, sélection de ses k meilleurs documents) dans
+un pool de fils partagé. Les blocs couvrant des documents consécutifs, la concaténation de leurs résultats
+est triée par identifiant ; les k meilleurs documents du corpus sont parmi les k meilleurs de chaque bloc.
+
+Les sommes de chaque ligne sont faites dans le même ordre que le produit de toute la matrice :
+les scores sont identiques au bit près.
+"""
+
+class ScoresParBlocs:
+    """
+    @brief Matrice des poids découpée en blocs de documents, scorés dans un pool de fils.
+    """
+
+    _executeurs = {}  # pools de fils partagés par tous les moteurs, par nombre de fils
+    _verrou = threading.Lock()
+
+    def __init__(self, matrice, n_blocs):
+        """
+        @brief Découpe une matrice en blocs de lignes équilibrés en nombre de postings.
+        @param matrice Matrice creuse des poids, une ligne par document.
+        @param n_blocs Nombre de blocs souhaité (moins si la matrice a moins de lignes).
+        """
+        matrice = csr_matrix(matrice)
+        self.n_docs, self.n_termes = matrice.shape
+        pointeurs = matrice.indptr.astype(np.int64)
+        bornes = np.unique(np.searchsorted(pointeurs, np.linspace(0, pointeurs[-1], max(n_blocs, 1) + 1)))
+        bornes = np.unique(np.concatenate(([0], np.minimum(bornes, self.n_docs), [self.n_docs])))
+
+        self.blocs = []  # tuples (premier document, matrice du bloc)
+        for debut, fin in zip(bornes[:-1], bornes[1:]):
+            p_debut, p_fin = pointeurs[debut], pointeurs[fin]
+            bloc = csr_matrix((matrice.data[p_debut:p_fin], matrice.indices[p_debut:p_fin],
+                               pointeurs[debut:fin + 1] - p_debut), shape=(fin - debut, self.n_termes), copy=False)
+            self.blocs.append((int(debut), bloc))
+
+    def __len__(self):
+        """
+        @brief Retourne le nombre de blocs.
+        """
+        return len(self.blocs)
+
+    @classmethod
+    def executeur(cls, n_workers):
+        """
+        @brief Retourne le pool de fils partagé de la taille demandée (créé au premier usage).
+        @param n_workers Nombre de fils.
+        @return ThreadPoolExecutor.
+        """
+        with cls._verrou:
+            if n_workers not in cls._executeurs:
+                cls._executeurs[n_workers] = ThreadPoolExecutor(max_workers=n_workers, thread_name_prefix="scores")
+            return cls._executeurs[n_workers]
+
+    @classmethod
+    def arreter(cls):
+        """
+        @brief Arrête les pools de fils partagés.
+        """
+        with cls._verrou:
+            for executeur in cls._executeurs.values():
+                executeur.shutdown(wait=False, cancel_futures=True)
+            cls._executeurs = {}
+
+    def scorer(self, vecteur, traiter=None, n_workers=1):
+        """
+        @brief Calcule les scores de tous les documents, bloc par bloc.
+        @param vecteur Vecteur de requête aligné sur les colonnes de la matrice.
+        @param traiter Fonction (doc_ids, scores) -> (doc_ids, scores) appliquée aux documents de score strictement
+        positif de chaque bloc (filtres, k meilleurs), dans le fil du bloc ; les documents gardés restent triés (optionnel).
+        @param n_workers Nombre de fils (1 : blocs traités l'un après l'autre dans le fil appelant).
+        @return Tuple (doc_ids, scores) des documents gardés, triés par identifiant.
+        """
+        def scorer_bloc(bloc):
+            debut, matrice = bloc
+            scores = matrice.dot(vecteur)
+            doc_ids = np.flatnonzero(scores > 0)
+            scores = scores[doc_ids]
+            doc_ids += debut
+            return traiter(doc_ids, scores) if traiter is not None else (doc_ids, scores)
+
+        if n_workers > 1 and len(self.blocs) > 1:
+            resultats = list(self.executeur(n_workers).map(scorer_bloc, self.blocs))
+        else:
+            resultats = [scorer_bloc(bloc) for bloc in self.blocs]
+        if not resultats:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+        return (np.concatenate([doc_ids for doc_ids, _ in resultats]),
+                np.concatenate([scores for _, scores in resultats]))
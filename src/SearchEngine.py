@@ -1,13 +1,31 @@
+import base64
+import json
 import os
 import pickle
 import sqlite3
+import threading
 import pandas as pd
 import numpy as np
 from scipy.sparse import csr_matrix
-from collections import defaultdict
 from src.Corpus import Corpus
+from src.IndexInverse import IndexInverse
+from src.IndexCompresse import IndexCompresse
+from src.SegmentPostings import SegmentPostings
+from src.IndexPositionnel import IndexPositionnel
+from src.MetadonneesDocuments import MetadonneesDocuments
+from src.MatriceDocuments import MatriceDocuments
+from src.CacheResultats import CacheResultats
+from src.MagasinDocuments import MagasinDocuments
+from src.MatriceCSR import MatriceCSR
+from src.ScoresParBlocs import ScoresParBlocs
+from src.Vocabulaire import Vocabulaire
+from src.IndexCorrections import IndexCorrections
+from src.RequeteBooleenne import RequeteBooleenne
+from src.GenerateurExtraits import GenerateurExtraits
+from src.TamponCandidats import TamponCandidats
 from src.Utils import Utils
-from datetime import datetime
+from src.Tokeniseur import Tokeniseur
+from datetime import date, datetime
 from src.constantes import *
 
 """
@@ -17,50 +35,219 @@ from src.constantes import *
 @details
 Ce module permet de rechercher des documents dans un corpus en utilisant des vecteurs de requêtes alignés avec une matrice TF-IDF.
 Il prend également en charge le filtrage par auteur et plage de dates, et affiche les résultats triés par pertinence.
+Les scores sont calculés soit par un index inversé (listes de postings des mots de la requête),
+soit par le produit de toute la matrice TF-IDF avec le vecteur de requête.
+En mode "compresse", l'index inversé est lu dans un segment de postings compressé (voir SegmentPostings)
+et les postings des mots de la requête sont décodés à chaque calcul.
+En mode "csr" avec plusieurs fils (n_workers), la matrice des poids est découpée en blocs de documents
+scorés, filtrés et réduits à leurs k meilleurs en parallèle (voir ScoresParBlocs), puis fusionnés.
+Les poids des documents sont ceux de la matrice TF-IDF ou, en mode "bm25", des poids BM25 (k1 et b)
+calculés à partir de la matrice TF et des longueurs des documents.
+L'index inversé de chaque pondération est enregistré à la construction des matrices et projeté en mémoire
+au chargement (voir IndexInverse.ouvrir()) ; à défaut, il est construit en mémoire à partir de la matrice des poids.
+Une requête avec opérateurs (AND, OR, NOT, parenthèses) sélectionne ses documents sur les listes de postings
+(voir RequeteBooleenne) ; ils sont ensuite classés par le score des mots hors négation.
 """
 class SearchEngine:
     """
     @brief Classe représentant le moteur de recherche.
     """
 
-    def __init__(self, nom_corpus):
+    CALCULS_SCORES = ("index", "csr", "compresse")
+    PONDERATIONS = ("tfidf", "bm25")
+    # Le pickle du corpus est une instance de CorpusSingleton : le charger remplace l'état de l'instance partagée
+    _verrou_corpus = threading.Lock()
+
+    def __init__(self, nom_corpus, calcul_scores="index", ponderation=PONDERATION_SCORES, k1=BM25_K1, b=BM25_B,
+                 n_workers=FILS_SCORES):
         """
         @brief Initialise le moteur de recherche pour un corpus donné.
         @param nom_corpus Nom du corpus à utiliser.
+        @param calcul_scores "index" (index inversé), "compresse" (index inversé compressé) ou "csr" (produit matrice CSR x vecteur).
+        @param ponderation "tfidf" ou "bm25".
+        @param k1 Paramètre k1 de BM25 (saturation de la fréquence des mots).
+        @param b Paramètre b de BM25 (normalisation par la longueur des documents).
+        @param n_workers Nombre de fils calculant les scores en mode "csr" (un bloc de documents par fil).
         """
+        if calcul_scores not in self.CALCULS_SCORES:
+            raise ValueError(f"❌ Calcul des scores inconnu : '{calcul_scores}'.")
+        if ponderation not in self.PONDERATIONS:
+            raise ValueError(f"❌ Pondération inconnue : '{ponderation}'.")
         self.nom_corpus = nom_corpus
+        self.calcul_scores = calcul_scores
+        self.ponderation = ponderation
+        self.k1 = k1
+        self.b = b
+        self.n_workers = max(1, int(n_workers))
         self.corpus = None
         self.mat_TF = None
         self.mat_TFxIDF = None
-        self.vocab = {}
-        self.frequence_mot = defaultdict(int)
+        self.mat_poids = None  # matrice des poids utilisée pour les scores (TF-IDF ou BM25)
+        self.blocs = None  # blocs de documents de la matrice des poids, scorés en parallèle (voir ScoresParBlocs)
+        self.longueurs = None
+        self.idf = None  # {'idf': tableau float32 par identifiant de mot, 'n_docs'[, 'frequences_documents', 'n_mots']}
+        self.vocab = Vocabulaire([])  # mots, identifiants et fréquences (collection et documents)
+        self.index = None
+        self.documents = []  # MagasinDocuments : documents lus à la demande par ligne de matrice
+        self.metadonnees = None
+        self.index_positionnel = None
+        self.corrections = None  # index des suppressions, chargé à la première faute à corriger (voir index_corrections())
+        self.chemins = {}
+        self.signature = ()
+        self.generation = 0
+        self.etat_base = None  # état du fichier de la base à la dernière lecture de la génération
+        self.cache = CacheResultats()  # résultats de search() pour les requêtes déjà posées
+        self.tampons = CacheResultats(taille_max=TAILLE_CACHE_PAGINATION)  # candidats des recherches paginées
+        self.limite_expansion = LIMITE_EXPANSION_JOKER  # mots substitués au plus à un joker ou à un préfixe
+        self.limite_corrections = LIMITE_CORRECTIONS  # mots substitués au plus à un mot mal orthographié
+        self.penalite_correction = PENALITE_CORRECTION  # facteur du poids d'un mot corrigé, par faute
 
         self._charger_corpus_matrices()
 
     def _charger_corpus_matrices(self):
         """
         @brief Charge les matrices TF, TF-IDF, le vocabulaire et la fréquence des mots.
+        @details Les documents sont ouverts dans leur magasin s'il existe ; sinon le pickle du corpus est chargé.
         @throws ValueError Si un fichier nécessaire est manquant.
         """
         chemins = self._charger_chemins_depuis_db()
+        self.chemins = chemins
+        # Signature relevée avant la lecture : une modification pendant le chargement sera détectée ensuite
+        self.signature = self.signature_sources()
+        self.etat_base = self.etat_fichier_base()
+        self.generation = self.generation_courante()
 
         try:
-            with open(chemins["ch_corpus"], 'rb') as f:
-                self.corpus = pickle.load(f)            
-            with open(chemins["ch_TF"], 'rb') as f:
-                self.mat_TF = pickle.load(f)
-            with open(chemins["ch_TFIDF"], 'rb') as f:
-                self.mat_TFxIDF = pickle.load(f)
+            if os.path.exists(chemins["ch_documents"]):
+                # Le corpus n'est pas désérialisé : seuls les documents affichés seront lus
+                self.documents = MagasinDocuments(chemins["ch_documents"])
+            else:
+                with SearchEngine._verrou_corpus:
+                    with open(chemins["ch_corpus"], 'rb') as f:
+                        self.corpus = pickle.load(f)
+                    self.documents = MagasinDocuments.en_memoire(
+                        self.corpus.id2doc.values(), self.corpus.origines_documents())
+            # En mode "compresse", les postings sont lus dans le segment projeté : aucune matrice n'est chargée
+            compresse = self.calcul_scores == "compresse" and os.path.exists(chemins["ch_postings"])
+            if not compresse:
+                self.matrice_TF()
             with open(chemins["ch_vocab"], 'rb') as f:
                 self.vocab = pickle.load(f)
-            with open(chemins["ch_frequence"], 'rb') as f:
-                self.frequence_mot = pickle.load(f)
+            if isinstance(self.vocab, dict):
+                # Ancien vocabulaire {mot: {'id', 'freq', 'len'}} : converti avec les fréquences documentaires
+                with open(chemins["ch_frequence"], 'rb') as f:
+                    self.vocab = Vocabulaire.depuis_dict(self.vocab, pickle.load(f))
+
+            self.longueurs = self._charger_annexe(
+                chemins["ch_longueurs"], lambda: MatriceDocuments.longueurs_documents(self.matrice_TF()))
+            self.idf = self._charger_annexe(chemins["ch_idf"], lambda: MatriceDocuments.idf_documents(self.matrice_TF()))
+            fragment = self.idf.get("frequences_documents") is not None
+            if fragment:
+                # Segment d'un index fragmenté : le vocabulaire et les statistiques communs ont pu grandir depuis
+                # son écriture (ajouts de documents) ; les poids sont calculés avec ceux du corpus entier
+                n_docs = self.idf["n_docs"]
+                self.longueurs = dict(self.longueurs, longueur_moyenne=self.idf["n_mots"] / n_docs if n_docs else 0.0)
+
+            if compresse:
+                # Les poids sont recalculés au décodage : ni la matrice TF-IDF ni la matrice BM25 ne sont chargées
+                segment = SegmentPostings.ouvrir(chemins["ch_postings"])
+                if fragment:
+                    segment = segment.etendre(len(self.vocab))
+                self.index = IndexCompresse(segment, self.ponderation, self.longueurs, self.k1, self.b,
+                                            self.idf.get("frequences_documents"), self.idf["n_docs"])
+            else:
+                self._charger_matrice_TFxIDF()
+                if self.calcul_scores == "compresse":
+                    # Segment non enregistré (ancien corpus) : construit en mémoire à partir de la matrice TF
+                    self.mat_poids = self.mat_TFxIDF if self.ponderation == "tfidf" else None
+                    self.index = IndexCompresse(SegmentPostings.depuis_matrice(self.mat_TF), self.ponderation,
+                                                self.longueurs, self.k1, self.b, self.idf.get("frequences_documents"),
+                                                self.idf["n_docs"])
+                else:
+                    self._charger_index()
+            self.metadonnees = self._charger_annexe(
+                chemins["ch_metadonnees"], lambda: MetadonneesDocuments(self.documents, self.documents.origines()))
+            self.index_positionnel = self._charger_annexe(
+                chemins["ch_positions"], lambda: IndexPositionnel(self.documents, self.vocab))
+            self.index_positionnel.etendre(self.index.n_termes)
       
             print(f"✅ Matrices et vocabulaire chargés pour le corpus '{self.nom_corpus}'.")
 
         except FileNotFoundError as e:
             raise ValueError(f"❌ Fichier manquant pour le corpus '{self.nom_corpus}': {e}")
 
+    def matrice_TF(self):
+        """
+        @brief Matrice TF du corpus, chargée au premier usage (le mode "compresse" s'en passe).
+        @details Format ".csr" : tableaux projetés en mémoire, partagés entre processus ; sinon ancien pickle.
+        @return Matrice creuse (Document x Mots).
+        """
+        if self.mat_TF is None:
+            self.mat_TF = MatriceCSR.charger(self.chemins["ch_TF"])
+        return self.mat_TF
+
+    def _charger_matrice_TFxIDF(self):
+        """
+        @brief Charge la matrice TF-IDF ou, pour un segment d'index fragmenté, la calcule avec les statistiques
+        du corpus entier.
+        """
+        if self.idf.get("frequences_documents") is not None:
+            # Le vocabulaire commun a pu grandir depuis l'écriture du segment : la matrice TF est élargie (sans copie)
+            self.mat_TF = csr_matrix((self.mat_TF.data, self.mat_TF.indices, self.mat_TF.indptr),
+                                     shape=(self.mat_TF.shape[0], len(self.vocab)))
+            self.mat_TFxIDF = MatriceDocuments.ponderer_tfidf(self.mat_TF, self.idf["frequences_documents"],
+                                                              self.idf["n_docs"])
+        else:
+            self.mat_TFxIDF = MatriceCSR.charger(self.chemins["ch_TFIDF"])
+        # Matrice au format CSR (indices triés) : le pickle peut contenir une matrice COO
+        self.mat_TFxIDF = csr_matrix(self.mat_TFxIDF)
+        self.mat_TFxIDF.sort_indices()
+
+    def _charger_index(self):
+        """
+        @brief Ouvre l'index inversé enregistré ou le construit en mémoire, et prépare la matrice des poids.
+        """
+        self.index = self._ouvrir_index()
+        if self.index is None:
+            # Index non enregistré (ancien corpus, segment d'index fragmenté, paramètres BM25 différents) :
+            # la matrice des poids et l'index sont construits en mémoire
+            if self.ponderation == "bm25":
+                self.mat_poids = MatriceDocuments.ponderer_bm25(
+                    self.mat_TF, self.longueurs, self.k1, self.b, self.idf.get("frequences_documents"),
+                    self.idf["n_docs"])
+            else:
+                self.mat_poids = self.mat_TFxIDF
+            self.index = IndexInverse(self.mat_poids)
+        elif self.ponderation == "bm25":
+            # Transposée de l'index projeté : vue CSC sans copie ; le mode "csr" la convertit en lignes
+            self.mat_poids = self.index.matrice_transposee().T
+            if self.calcul_scores == "csr":
+                self.mat_poids = self.mat_poids.tocsr()
+        else:
+            self.mat_poids = self.mat_TFxIDF
+        if self.calcul_scores == "csr" and self.n_workers > 1:
+            self.blocs = ScoresParBlocs(self.mat_poids, self.n_workers)
+
+    def _ouvrir_index(self):
+        """
+        @brief Ouvre l'index inversé enregistré à la construction des matrices, projeté en mémoire.
+        @details
+        L'index BM25 n'est enregistré que pour les paramètres k1 et b par défaut. Les segments d'un index fragmenté
+        n'en ont pas : leurs poids dépendent des statistiques du corpus entier, qui évoluent avec les ajouts.
+        @return Instance de IndexInverse, ou None si aucun index enregistré ne correspond à la pondération.
+        """
+        if self.idf.get("frequences_documents") is not None:
+            return None
+        chemin = self.chemins["ch_index_bm25" if self.ponderation == "bm25" else "ch_index"]
+        if not os.path.exists(chemin):
+            return None
+        index = IndexInverse.ouvrir(chemin)
+        if self.ponderation == "bm25" and index.parametres != {"k1": self.k1, "b": self.b}:
+            return None
+        if index.n_docs != self.mat_TF.shape[0] or index.n_termes != self.mat_TF.shape[1]:
+            return None  # index d'une construction précédente des matrices
+        return index
+
     def _charger_chemins_depuis_db(self):
         """
         @brief Récupère les chemins des fichiers liés au corpus depuis la base de données.
@@ -90,32 +277,279 @@ class SearchEngine:
             "ch_TFIDF": result[2],
             "ch_vocab": result[3],
             "ch_frequence": result[4],
-            
+            "ch_metadonnees": self._chemin_annexe(result[1], "metadonnees"),
+            "ch_positions": self._chemin_annexe(result[1], "positions"),
+            "ch_longueurs": self._chemin_annexe(result[1], "longueurs"),
+            "ch_idf": self._chemin_annexe_vocab(result[3], "idf"),
+            "ch_corrections": self._chemin_annexe_vocab(result[3], "corrections"),
+            "ch_documents": self._chemin_annexe(result[1], "documents", ".bin"),
+            "ch_postings": self._chemin_annexe(result[1], "postings", SegmentPostings.EXTENSION),
+            "ch_index": self._chemin_annexe(result[1], "index", MatriceCSR.EXTENSION),
+            "ch_index_bm25": self._chemin_annexe(result[1], "indexbm25", MatriceCSR.EXTENSION),
         }
 
-    def vecteur_aligne_matrice(self, mots_cles):
+    @staticmethod
+    def etat_fichier_base():
+        """
+        @brief Relève l'état du fichier de la base : compteur de modifications de son en-tête, date et taille
+        de son journal WAL.
+        @details SQLite incrémente le compteur de l'en-tête (octets 24 à 27) à chaque écriture validée ;
+        en mode WAL, les écritures s'ajoutent au journal. Tant que cet état est inchangé, la génération
+        lue dans la base l'est aussi.
+        @return Tuple comparable d'une lecture à l'autre (None pour un fichier absent).
+        """
+        try:
+            with open(DB_PATH, 'rb') as f:
+                f.seek(24)
+                compteur = f.read(4)
+        except OSError:
+            compteur = None
+        try:
+            journal = os.stat(f"{DB_PATH}-wal")
+            journal = (journal.st_mtime_ns, journal.st_size)
+        except OSError:
+            journal = None
+        return compteur, journal
+
+    def generation_courante(self):
+        """
+        @brief Lit dans la base la génération des matrices du corpus (incrémentée à chaque reconstruction).
+        @return Numéro de génération (0 si la base ne gère pas encore les générations).
+        """
+        conn = sqlite3.connect(DB_PATH)
+        try:
+            resultat = conn.execute(
+                "SELECT MAX(generation) FROM corpus WHERE nom_corpus = ?", (self.nom_corpus,)).fetchone()
+        except sqlite3.OperationalError:
+            resultat = None
+        finally:
+            conn.close()
+        return (resultat[0] or 0) if resultat else 0
+
+    def _chemin_annexe(self, chemin_TF, prefixe, extension=".pkl"):
+        """
+        @brief Construit le chemin d'un fichier annexe de l'index, rangé à côté de la matrice TF.
+        @param chemin_TF Chemin de la matrice TF du corpus.
+        @param prefixe Préfixe du fichier annexe (par exemple "metadonnees").
+        @param extension Extension du fichier (".pkl" sauf pour les formats binaires).
+        @return Chemin du fichier "<prefixe>_<nom_corpus><extension>".
+        """
+        return os.path.join(os.path.dirname(chemin_TF), f"{prefixe}_{self.nom_corpus}{extension}")
+
+    def _chemin_annexe_vocab(self, chemin_vocab, prefixe):
+        """
+        @brief Construit le chemin d'un fichier annexe calculé sur le vocabulaire (IDF, corrections), rangé à côté de lui.
+        @details Les fragments d'un index fragmenté partagent le vocabulaire de leur corpus, et donc ces fichiers.
+        @param chemin_vocab Chemin du vocabulaire "vocab_<nom>.pkl".
+        @param prefixe Préfixe du fichier annexe.
+        @return Chemin du fichier "<prefixe>_<nom>.pkl".
+        """
+        nom = os.path.splitext(os.path.basename(chemin_vocab))[0].split("_", 1)[-1]
+        return os.path.join(os.path.dirname(chemin_vocab), f"{prefixe}_{nom}.pkl")
+
+    def _charger_annexe(self, chemin, construire):
+        """
+        @brief Charge un fichier annexe de l'index, ou le reconstruit en mémoire s'il n'a pas encore été généré.
+        @param chemin Chemin du fichier pickle annexe.
+        @param construire Fonction sans argument reconstruisant l'objet à partir des données chargées.
+        @return Objet chargé ou reconstruit.
+        """
+        if os.path.exists(chemin):
+            with open(chemin, 'rb') as f:
+                return pickle.load(f)
+        return construire()
+
+    def signature_sources(self):
+        """
+        @brief Calcule la signature actuelle des fichiers sources du moteur.
+        @details Pour chaque fichier : chemin, date de modification (ns) et taille. Un fichier absent est signé par None.
+        @return Tuple comparable à l'attribut signature relevé au chargement.
         """
-        @brief Transforme une requête en vecteur aligné avec la matrice TF-IDF.
+        signature = []
+        for chemin in sorted(chemin for chemin in self.chemins.values() if chemin):
+            try:
+                etat = os.stat(chemin)
+                signature.append((chemin, etat.st_mtime_ns, etat.st_size))
+            except OSError:
+                signature.append((chemin, None, None))
+        return tuple(signature)
+
+    def est_perime(self):
+        """
+        @brief Indique si un fichier source a changé (date ou taille) depuis le chargement.
+        @return True si le moteur doit être rechargé.
+        """
+        return self.signature_sources() != self.signature
+
+    def empreinte_memoire(self):
+        """
+        @brief Estime la mémoire occupée par le moteur.
+        @details
+        Approximée par la taille des fichiers pickle chargés. Le magasin de documents, projeté en mémoire
+        et lu à la demande, n'est pas compté, ni le pickle du corpus quand le magasin le remplace,
+        ni l'index enregistré de l'autre pondération, ni les matrices que le mode "compresse" ne charge pas.
+        @return Taille estimée en octets.
+        """
+        non_charges = {self.chemins.get("ch_documents"),
+                       self.chemins.get("ch_index" if self.ponderation == "bm25" else "ch_index_bm25")}
+        if self.corpus is None:
+            non_charges.add(self.chemins.get("ch_corpus"))
+        if isinstance(self.index, IndexCompresse):
+            non_charges.update({self.chemins.get("ch_index"), self.chemins.get("ch_index_bm25")})
+        else:
+            non_charges.add(self.chemins.get("ch_postings"))
+        if self.mat_TF is None:
+            non_charges.update({self.chemins.get("ch_TF"), self.chemins.get("ch_TFIDF")})
+        return sum(taille for chemin, _, taille in self.signature if taille and chemin not in non_charges)
+
+    def resoudre_mot(self, mot):
+        """
+        @brief Mots du vocabulaire désignés par un mot de la requête, et nombre de fautes corrigées.
+        @details
+        Un mot du vocabulaire est pris tel quel. Un motif à jokers ("educat*", "c*mate"), ou un mot absent
+        pris comme préfixe ("clim" -> "clim*"), est développé par des recherches de plage dans le vocabulaire trié
+        en au plus limite_expansion mots, les plus fréquents en documents d'abord. Un mot absent qui ne préfixe
+        aucun mot est corrigé par l'index des suppressions ("helth" -> "health") en ses mots les plus proches.
+        @param mot Mot normalisé de la requête (voir Tokeniseur.tokens_requete).
+        @return Tuple (identifiants, distance) : tableau int64 des identifiants (vide si rien ne correspond)
+        et distance d'édition de la correction (0 sans correction).
+        """
+        if Tokeniseur.JOKER in mot:
+            return self.vocab.developper(mot, self.limite_expansion), 0
+        terme_id = self.vocab.identifiant(mot)
+        if terme_id >= 0:
+            return np.array([terme_id], dtype=np.int64), 0
+        termes = self.vocab.developper(mot + Tokeniseur.JOKER, self.limite_expansion)
+        if len(termes):
+            return termes, 0
+        return self.index_corrections().corriger(mot, self.vocab, self.limite_corrections)
+
+    def index_corrections(self):
+        """
+        @brief Index des suppressions du vocabulaire, chargé (ou construit) à la première faute à corriger.
+        @details Les requêtes sans mot inconnu n'en ont pas besoin : il n'alourdit pas le chargement du moteur.
+        @return Instance de IndexCorrections.
+        """
+        if self.corrections is None:
+            self.corrections = self._charger_annexe(
+                self.chemins["ch_corrections"], lambda: IndexCorrections(self.vocab))
+        return self.corrections
+
+    def termes_mot(self, mot):
+        """
+        @brief Identifiants des mots du vocabulaire désignés par un mot de la requête (voir resoudre_mot()).
+        @param mot Mot normalisé de la requête.
+        @return Tableau int64 des identifiants (vide si rien ne correspond).
+        """
+        return self.resoudre_mot(mot)[0]
+
+    def suggestion(self, mots_cles):
+        """
+        @brief Requête corrigée à proposer ("Vouliez-vous dire...") quand des mots de la requête ont été corrigés.
         @param mots_cles Mots-clés de la requête.
-        @return Vecteur de requête aligné avec la matrice TF-IDF.
+        @return Requête où chaque mot corrigé est remplacé par sa correction la plus fréquente, ou None.
         """
-        vecteur_requete = np.zeros(len(self.vocab))
-        mots = mots_cles.lower().split()
+        mots, corrigee = Tokeniseur.tokens_requete(mots_cles), False
+        for i, mot in enumerate(mots):
+            termes, distance = self.resoudre_mot(mot)
+            if distance > 0:
+                mots[i], corrigee = self.vocab.mot(termes[0]), True
+        return " ".join(mots) if corrigee else None
 
-        for mot in mots:
-            if mot in self.vocab:
-                vecteur_requete[self.vocab[mot]['id']] += 1
+    def termes_requete(self, mots_cles):
+        """
+        @brief Transforme une requête en liste creuse de mots pondérés.
+        @details
+        Les mots développés d'un joker ou d'un préfixe forment un OU pondéré : chacun compte comme une occurrence
+        dans la requête et apporte son propre poids, dans le même produit creux que les autres mots.
+        Le poids d'un mot corrigé est multiplié par penalite_correction à la puissance du nombre de fautes.
+        @param mots_cles Mots-clés de la requête.
+        @return Tuple (termes_ids, poids) : identifiants triés des mots présents dans le vocabulaire et leur poids
+        (occurrences x IDF en TF-IDF ; nombre d'occurrences en BM25, l'IDF étant déjà dans les poids des documents).
+        """
+        ids, facteurs = [np.empty(0, dtype=np.int64)], [np.empty(0)]
+        for mot in Tokeniseur.tokens_requete(mots_cles):
+            termes, distance = self.resoudre_mot(mot)
+            if len(termes):
+                ids.append(termes)
+                facteurs.append(np.full(len(termes), self.penalite_correction ** distance))
             else:
                 print(f"Mot absent du vocabulaire : {mot}")
 
-        for mot in mots:
-            if mot in self.vocab:
-                idf = np.log((len(self.corpus.id2doc) + 1) / (1 + self.frequence_mot[mot])) + 1
-                vecteur_requete[self.vocab[mot]['id']] *= idf
+        termes_ids, inverse, occurrences = np.unique(np.concatenate(ids), return_inverse=True, return_counts=True)
+        # Un mot à la fois écrit et obtenu par correction garde le facteur le plus favorable
+        facteur = np.zeros(len(termes_ids))
+        np.maximum.at(facteur, inverse, np.concatenate(facteurs))
+        if self.ponderation == "bm25":
+            return termes_ids, occurrences * facteur
+
+        # IDF précalculé à la construction des matrices ; il est appliqué une fois par occurrence du mot dans la requête
+        idf = self.idf["idf"][termes_ids].astype(np.float64)
+        return termes_ids, occurrences * idf ** occurrences * facteur
 
+    def vecteur_aligne_matrice(self, mots_cles):
+        """
+        @brief Transforme une requête en vecteur aligné avec la matrice des poids.
+        @param mots_cles Mots-clés de la requête.
+        @return Vecteur de requête aligné avec la matrice des poids.
+        """
+        vecteur_requete = np.zeros(len(self.vocab))
+        termes_ids, poids = self.termes_requete(mots_cles)
+        vecteur_requete[termes_ids] = poids
         return vecteur_requete
 
-    def search(self, mots_cles, n_resultats=20, auteur=None, date_debut=None, date_fin=None):
+    def calculer_scores(self, mots_cles, k=None, masque=None):
+        """
+        @brief Calcule les scores des documents pour une requête.
+        @details Avec l'index inversé, seuls les postings des mots de la requête sont parcourus ;
+        avec "csr", toute la matrice des poids (TF-IDF ou BM25) est multipliée par le vecteur de requête.
+        Si k est donné, l'index écarte les documents qui ne peuvent pas entrer dans les k meilleurs
+        (élagage MaxScore, voir IndexInverse.scorer_top_k()) : les k meilleurs sont inchangés.
+        @param mots_cles Mots-clés de la requête.
+        @param k Nombre de meilleurs documents à garantir (optionnel ; tous les documents par défaut).
+        @param masque Masque booléen des documents acceptés par les filtres, pris en compte par l'élagage (optionnel).
+        @return Tuple (doc_ids, scores) des documents de score strictement positif, triés par identifiant.
+        """
+        if self.calcul_scores != "csr":
+            if k is None:
+                doc_ids, scores = self.index.scorer(*self.termes_requete(mots_cles))
+            else:
+                doc_ids, scores = self.index.scorer_top_k(*self.termes_requete(mots_cles), k, masque)
+            positifs = scores > 0
+            return doc_ids[positifs], scores[positifs]
+
+        scores = self.mat_poids.dot(self.vecteur_aligne_matrice(mots_cles))
+        doc_ids = np.flatnonzero(scores > 0)
+        return doc_ids, scores[doc_ids]
+
+    def calculer_scores_blocs(self, mots_cles, masque=None, expression_exacte=True, k=None):
+        """
+        @brief Calcule et filtre les candidats bloc de documents par bloc, dans le pool de fils (mode "csr").
+        @details
+        Chaque bloc applique les filtres à ses documents puis ne garde que ses k meilleurs : les k meilleurs
+        du corpus sont parmi eux. Les documents de l'expression exacte sont cherchés une seule fois, avant les blocs.
+        Si l'expression doit être vérifiée sur le texte (accepter), tous les candidats filtrés sont gardés.
+        @param mots_cles Mots-clés de la requête.
+        @param masque Masque booléen des documents respectant les filtres auteur/dates (ou None).
+        @param expression_exacte Voir search().
+        @param k Nombre de meilleurs documents qui seront lus (optionnel ; tous les candidats par défaut).
+        @return Tuple (doc_ids, scores, accepter), comme filtrer_candidats().
+        """
+        filtre = self.filtre_expression(mots_cles, expression_exacte)
+
+        def traiter(doc_ids, scores):
+            doc_ids, scores, accepter = self.filtrer_candidats(mots_cles, doc_ids, scores, masque, expression_exacte,
+                                                               filtre)
+            if k is not None and accepter is None and len(doc_ids) > k:
+                meilleurs = np.sort(Utils.selection_top_k(doc_ids, scores, k))
+                doc_ids, scores = doc_ids[meilleurs], scores[meilleurs]
+            return doc_ids, scores
+
+        doc_ids, scores = self.blocs.scorer(self.vecteur_aligne_matrice(mots_cles), traiter, self.n_workers)
+        return doc_ids, scores, filtre[1]
+
+    def search(self, mots_cles, n_resultats=20, auteur=None, date_debut=None, date_fin=None, noms_corpus=None,
+               expression_exacte=True):
         """
         @brief Recherche des documents en fonction des mots-clés.
         @param mots_cles Mots-clés à rechercher.
@@ -123,54 +557,454 @@ class SearchEngine:
         @param auteur Filtrer par auteur (optionnel).
         @param date_debut Date de début de la plage (optionnel).
         @param date_fin Date de fin de la plage (optionnel).
+        @param noms_corpus Corpus d'origine acceptés, utile pour l'index unifié (optionnel).
+        @param expression_exacte True : les documents doivent contenir les mots dans l'ordre de la requête ;
+        False : OU pondéré des mots, chaque document étant classé par son score.
         @return DataFrame contenant les résultats triés par pertinence.
         """
-        if self.mat_TFxIDF is None:
-            raise ValueError("La matrice TF-IDF n'a pas été construite.")
+        self._verifier_generation()
+        cle = self.cle_cache(mots_cles, n_resultats, auteur, date_debut, date_fin, noms_corpus, expression_exacte)
+        resultats = self.cache.obtenir(cle)
+        if resultats is None:
+            resultats = self._search(mots_cles, n_resultats, auteur, date_debut, date_fin, noms_corpus, expression_exacte)
+            self.cache.stocker(cle, resultats)
+        return resultats.copy()
 
-        mots_cles_split = mots_cles.lower().split()
-        mots_non_trouves = [mot for mot in mots_cles_split if mot not in self.vocab]
+    def _verifier_generation(self):
+        """
+        @brief Vide les caches quand les matrices du corpus ont été reconstruites depuis leur remplissage.
+        @details La génération n'est relue dans la base que si son fichier a changé depuis la dernière lecture
+        (voir etat_fichier_base()) : une recherche servie par le cache ne lit que quelques octets de son en-tête.
+        """
+        etat = self.etat_fichier_base()
+        if etat == self.etat_base:
+            return
+        self.etat_base = etat
+        generation = self.generation_courante()
+        if generation != self.generation:
+            self.cache.vider()
+            self.tampons.vider()
+            self.generation = generation
 
-        if mots_non_trouves:
-            print(f"⚠️ Les mots suivants n'existent pas dans le vocabulaire : {', '.join(mots_non_trouves)}")
-            return pd.DataFrame(columns=["Titre", "Extrait", "URL", "Score"])
+    def search_page(self, mots_cles=None, taille_page=20, curseur=None, auteur=None, date_debut=None, date_fin=None,
+                    noms_corpus=None, expression_exacte=True):
+        """
+        @brief Recherche paginée : retourne une page de résultats et le curseur de la page suivante.
+        @details
+        Les candidats de la requête sont gardés dans un tampon (TamponCandidats) dont seul le préfixe déjà lu est trié :
+        la page suivante est lue après le dernier résultat du curseur, sans recalculer les scores.
+        Si le tampon a été évincé, les candidats sont recalculés et seuls ceux placés après le curseur sont gardés.
+        @param mots_cles Mots-clés à rechercher (ignorés si un curseur est fourni).
+        @param taille_page Nombre de résultats par page.
+        @param curseur Curseur opaque retourné par l'appel précédent (optionnel).
+        @param auteur Filtrer par auteur (optionnel, ignoré si un curseur est fourni).
+        @param date_debut Date de début de la plage (optionnel, ignoré si un curseur est fourni).
+        @param date_fin Date de fin de la plage (optionnel, ignoré si un curseur est fourni).
+        @param noms_corpus Corpus d'origine acceptés (optionnel, ignoré si un curseur est fourni).
+        @param expression_exacte Voir search() (ignoré si un curseur est fourni).
+        @return Tuple (DataFrame des résultats de la page, curseur de la page suivante ou None s'il n'y en a pas).
+        @throws ValueError Si le curseur est invalide ou si aucune requête n'est donnée.
+        """
+        apres = None
+        if curseur is not None:
+            etat = self.decoder_curseur(curseur)
+            mots_cles, auteur, date_debut, date_fin, noms_corpus, expression_exacte = (
+                etat["requete"], etat["auteur"], etat["date_debut"], etat["date_fin"], etat["corpus"],
+                etat["expression_exacte"])
+            apres = (etat["score"], etat["document"])
+        if mots_cles is None:
+            raise ValueError("❌ Une requête ou un curseur est nécessaire.")
+
+        self._verifier_generation()
+        cle = self.cle_cache(mots_cles, None, auteur, date_debut, date_fin, noms_corpus, expression_exacte)
+        tampon = self.tampons.obtenir(cle)
+        if tampon is None or not tampon.couvre(apres):
+            candidats = self.candidats(mots_cles, auteur, date_debut, date_fin, noms_corpus, expression_exacte)
+            if candidats is None:
+                return pd.DataFrame(columns=["Titre", "Extrait", "URL", "Score"]), None
+            doc_ids, scores, accepter, mots_extraits = candidats
+            tampon = TamponCandidats(doc_ids, scores, mots_extraits, accepter, self.documents, origine=apres)
+            self.tampons.stocker(cle, tampon)
 
-        vecteur_requete = self.vecteur_aligne_matrice(mots_cles)
+        # Un résultat de plus que la page indique s'il reste une page suivante
+        resultats = tampon.page(taille_page + 1, apres)
+        suivant = None
+        if len(resultats) > taille_page:
+            resultats = resultats[:taille_page]
+            suivant = self.encoder_curseur(mots_cles, resultats[-1], auteur, date_debut, date_fin, noms_corpus,
+                                           expression_exacte)
+        if not resultats:
+            return pd.DataFrame(columns=["Titre", "Extrait", "URL", "Score"]), None
+        return self.tableau_resultats(resultats, tampon.mots_cles), suivant
+
+    @staticmethod
+    def encoder_curseur(mots_cles, dernier, auteur=None, date_debut=None, date_fin=None, noms_corpus=None,
+                        expression_exacte=True):
+        """
+        @brief Encode le curseur d'une recherche paginée : requête, filtres et dernier résultat lu.
+        @details Le score est écrit en JSON, dont la représentation des flottants se relit à l'identique.
+        @param mots_cles Requête.
+        @param dernier Tuple (identifiant du document, score) du dernier résultat de la page.
+        @return Chaîne opaque (JSON en base64 pour URL).
+        """
+        dates = [date.fromordinal(MetadonneesDocuments.ordinal(d)).isoformat() if d else None
+                 for d in (date_debut, date_fin)]
+        etat = {"requete": mots_cles, "auteur": auteur or None, "date_debut": dates[0], "date_fin": dates[1],
+                "corpus": sorted(noms_corpus) if noms_corpus is not None else None,
+                "expression_exacte": bool(expression_exacte),
+                "score": float(dernier[1]), "document": int(dernier[0])}
+        return base64.urlsafe_b64encode(json.dumps(etat, ensure_ascii=False).encode("utf-8")).decode("ascii")
 
-        if self.mat_TFxIDF.shape[1] != len(self.vocab):
-            raise ValueError("La taille du vocabulaire ne correspond pas à la matrice TF-IDF. Veuillez régénérer les matrices.")
+    @staticmethod
+    def decoder_curseur(curseur):
+        """
+        @brief Décode un curseur produit par encoder_curseur().
+        @param curseur Chaîne opaque.
+        @return Dictionnaire (requete, auteur, date_debut, date_fin, corpus, expression_exacte, score, document).
+        @throws ValueError Si le curseur est invalide.
+        """
+        try:
+            etat = json.loads(base64.urlsafe_b64decode(curseur.encode("ascii")).decode("utf-8"))
+            if not isinstance(etat, dict) or not isinstance(etat.get("requete"), str):
+                raise ValueError(curseur)
+            etat = {cle: etat.get(cle) for cle in ("requete", "auteur", "date_debut", "date_fin", "corpus")} | {
+                "expression_exacte": bool(etat.get("expression_exacte", True)),
+                "score": float(etat["score"]), "document": int(etat["document"])}
+        except (ValueError, TypeError, KeyError, AttributeError):
+            raise ValueError("❌ Curseur de pagination invalide.") from None
+        return etat
 
-        scores = self.mat_TFxIDF.dot(vecteur_requete)
+    @staticmethod
+    def cle_cache(mots_cles, n_resultats, auteur=None, date_debut=None, date_fin=None, noms_corpus=None,
+                  expression_exacte=True):
+        """
+        @brief Construit la clé de cache d'une recherche.
+        @details
+        La requête est réduite à ses mots normalisés (voir Tokeniseur) ; une requête aux espaces inhabituels
+        garde son texte exact car la recherche d'expression la traite différemment. Une requête booléenne
+        est réduite à son arbre. Les dates sont ramenées à leur numéro de jour.
+        @return Tuple hachable.
+        """
+        expression = mots_cles.lower()
+        booleenne = SearchEngine.requete_booleenne(mots_cles)
+        if booleenne is not None:
+            requete = ("booleenne", booleenne.arbre)
+        elif expression == " ".join(expression.split()):
+            requete = tuple(Tokeniseur.tokens_requete(mots_cles))
+        else:
+            requete = expression
+        dates = tuple(MetadonneesDocuments.ordinal(d) if d else None for d in (date_debut, date_fin))
+        corpus = tuple(sorted(noms_corpus)) if noms_corpus is not None else None
+        return requete, n_resultats, auteur or None, dates, corpus, bool(expression_exacte)
 
-        resultats = list(zip(self.corpus.id2doc.values(), scores))
-        resultats_filtres = [
-            (doc, score) for doc, score in resultats
-            if mots_cles.lower() in doc.texte.lower() and \
-               score > 0 and \
-               (not auteur or doc.auteur == auteur) and \
-               (not date_debut or doc.date >= date_debut) and \
-               (not date_fin or doc.date <= date_fin)
-        ]
+    def _search(self, mots_cles, n_resultats, auteur, date_debut, date_fin, noms_corpus, expression_exacte=True):
+        """
+        @brief Exécute une recherche sans passer par le cache (voir search()).
+        @return DataFrame contenant les résultats triés par pertinence.
+        """
+        candidats = self.candidats(mots_cles, auteur, date_debut, date_fin, noms_corpus, expression_exacte,
+                                   k=n_resultats)
+        if candidats is None:
+            return pd.DataFrame(columns=["Titre", "Extrait", "URL", "Score"])
+        doc_ids, scores, accepter, mots_extraits = candidats
+
+        resultats_filtres = self.meilleurs_documents(doc_ids, scores, n_resultats, accepter)
 
         if not resultats_filtres:
             print("⚠️ Aucun document trouvé contenant l'expression exacte.")
             return pd.DataFrame(columns=["Titre", "Extrait", "URL", "Score"])
+        return self.tableau_resultats(resultats_filtres, mots_extraits)
+
+    def candidats(self, mots_cles, auteur=None, date_debut=None, date_fin=None, noms_corpus=None, expression_exacte=True,
+                  k=None):
+        """
+        @brief Calcule les documents candidats d'une recherche et leur score, avant la sélection des meilleurs.
+        @details
+        Si seuls les k meilleurs documents seront lus et qu'aucune vérification d'expression ne reste à faire,
+        les documents qui ne peuvent pas y entrer sont écartés dès le calcul des scores (élagage MaxScore).
+        @param mots_cles Mots-clés de la requête.
+        @param auteur Filtrer par auteur (optionnel).
+        @param date_debut Date de début de la plage (optionnel).
+        @param date_fin Date de fin de la plage (optionnel).
+        @param noms_corpus Corpus d'origine acceptés (optionnel).
+        @param expression_exacte Voir search().
+        @param k Nombre de meilleurs documents qui seront lus (optionnel ; tous les candidats par défaut).
+        @return Tuple (doc_ids, scores, accepter, mots_extraits) : candidats triés par identifiant, fonction doc -> bool
+        restant à appliquer (ou None) et requête transmise aux extraits ; None si un mot de la requête est absent.
+        """
+        if self.index is None:
+            raise ValueError("L'index du corpus n'a pas été construit.")
 
-        resultats_filtres = sorted(resultats_filtres, key=lambda x: x[1], reverse=True)
+        booleenne = self.requete_booleenne(mots_cles)
+        if booleenne is None and RequeteBooleenne.est_booleenne(mots_cles):
+            print(f"⚠️ Requête booléenne invalide : '{mots_cles}'. Recherche des mots de la requête.")
+        mots_non_trouves = self.mots_absents(mots_cles)
 
+        if mots_non_trouves:
+            print(f"⚠️ Les mots suivants n'existent pas dans le vocabulaire : {', '.join(mots_non_trouves)}")
+            # Requête booléenne ou OU pondéré : un mot absent est une liste vide (les autres mots gardent un sens)
+            if booleenne is None and expression_exacte:
+                return None
+
+        if self.index.n_termes != len(self.vocab):
+            raise ValueError("La taille du vocabulaire ne correspond pas à l'index. Veuillez régénérer les matrices.")
+
+        masque = self.metadonnees.masque(auteur, date_debut, date_fin, noms_corpus=noms_corpus)
+        if booleenne is None and self.blocs is not None:
+            doc_ids, scores, accepter = self.calculer_scores_blocs(mots_cles, masque, expression_exacte, k)
+        elif booleenne is None:
+            if k is not None and not (expression_exacte and self.expression_a_verifier(mots_cles)):
+                doc_ids, scores = self.calculer_scores(mots_cles, k, masque)
+            else:
+                doc_ids, scores = self.calculer_scores(mots_cles)
+            doc_ids, scores, accepter = self.filtrer_candidats(mots_cles, doc_ids, scores, masque, expression_exacte)
+        else:
+            doc_ids, scores = self.calculer_scores_booleens(booleenne)
+            doc_ids, scores, accepter = self.filtrer_candidats_booleens(doc_ids, scores, masque)
+            mots_cles = " ".join(booleenne.mots_positifs())  # mots cherchés dans les extraits
+        return doc_ids, scores, accepter, mots_cles
+
+    def tableau_resultats(self, resultats, mots_cles):
+        """
+        @brief Construit le tableau des résultats : document, extrait et surlignages.
+        @param resultats Liste de tuples (identifiant du document, score), dans l'ordre d'affichage.
+        @param mots_cles Requête dont les mots sont cherchés dans les extraits.
+        @return DataFrame des résultats.
+        """
+        generateur = GenerateurExtraits(self.requete_extraits(mots_cles))
         df_resultats = pd.DataFrame([
             {
                 "Titre": doc.titre,
-                "Extrait": Utils.extraire_extrait(doc.texte, mots_cles),
+                "Extrait": extrait,
                 "URL": doc.url,
                 "Auteur": doc.auteur,
                 "Date": doc.date,
-                "Score": score
+                "Score": score,
+                "Corpus": self.metadonnees.corpus[self.metadonnees.codes_corpus[doc_id]],
+                "Surlignages": surlignages
             }
-            for doc, score in resultats_filtres[:n_resultats]
+            for doc_id, score in resultats
+            for doc in [self.documents[doc_id]]
+            for extrait, surlignages in [generateur.extraire(doc.texte)]
         ])
         return df_resultats
 
+    def mots_absents(self, mots_cles):
+        """
+        @brief Liste les mots de la requête absents du vocabulaire.
+        @param mots_cles Mots-clés de la requête.
+        @return Liste des mots absents.
+        """
+        booleenne = self.requete_booleenne(mots_cles)
+        mots = Tokeniseur.tokens_requete(mots_cles) if booleenne is None else [mot for mot, _ in booleenne.mots()]
+        return [mot for mot in mots if len(self.termes_mot(mot)) == 0]
+
+    @staticmethod
+    def requete_booleenne(mots_cles):
+        """
+        @brief Analyse une requête contenant des opérateurs booléens (AND, OR, NOT) ou des parenthèses.
+        @details Une requête booléenne mal formée est traitée comme une requête ordinaire.
+        @param mots_cles Mots-clés de la requête.
+        @return Instance de RequeteBooleenne, ou None pour une requête ordinaire.
+        """
+        if not RequeteBooleenne.est_booleenne(mots_cles):
+            return None
+        try:
+            return RequeteBooleenne(mots_cles)
+        except ValueError:
+            return None
+
+    def calculer_scores_booleens(self, requete):
+        """
+        @brief Calcule les documents d'une requête booléenne et leur score.
+        @details
+        Les documents sont sélectionnés sur les listes de postings triées de l'index inversé (un mot à jokers,
+        préfixe ou corrigé y est l'union des postings de ses mots). Chacun reçoit le score de la requête formée
+        des mots hors négation, ou 0 s'il n'en contient aucun ("NOT politics").
+        @param requete Instance de RequeteBooleenne.
+        @return Tuple (doc_ids, scores) triés par identifiant.
+        """
+        doc_ids = requete.executer(lambda mot: self.index.documents(self.termes_mot(mot)), self.index.n_docs)
+        scores = np.zeros(len(doc_ids))
+        positifs = requete.mots_positifs()
+        if positifs and len(doc_ids):
+            ids_scores, valeurs = self.calculer_scores(" ".join(positifs))
+            presents = RequeteBooleenne.appartient(doc_ids, ids_scores)
+            scores[presents] = valeurs[np.searchsorted(ids_scores, doc_ids[presents])]
+        return doc_ids, scores
+
+    @staticmethod
+    def filtrer_candidats_booleens(doc_ids, scores, masque=None):
+        """
+        @brief Restreint les documents d'une requête booléenne aux filtres auteur/dates (pas d'expression exacte).
+        @param doc_ids Identifiants des documents, triés par ordre croissant.
+        @param scores Scores des documents.
+        @param masque Masque booléen des documents respectant les filtres (ou None).
+        @return Tuple (doc_ids, scores, None), au format de filtrer_candidats().
+        """
+        if masque is not None:
+            retenus = masque[doc_ids]
+            doc_ids, scores = doc_ids[retenus], scores[retenus]
+        return doc_ids, scores, None
+
+    def requete_extraits(self, mots_cles):
+        """
+        @brief Requête transmise au générateur d'extraits : motifs à jokers et mots corrigés y sont remplacés par leurs mots.
+        @details Un préfixe sans joker ("clim") est gardé : les extraits cherchent les mots comme sous-chaînes.
+        @param mots_cles Mots-clés de la requête.
+        @return Requête sans joker ni mot corrigé.
+        """
+        mots, remplaces = Tokeniseur.tokens_requete(mots_cles), False
+        for i, mot in enumerate(mots):
+            termes, distance = self.resoudre_mot(mot)
+            if Tokeniseur.JOKER in mot or distance > 0:
+                mots[i], remplaces = " ".join(self.vocab.mot(terme_id) for terme_id in termes), True
+        return " ".join(mots) if remplaces else mots_cles
+
+    @staticmethod
+    def expression_a_verifier(mots_cles):
+        """
+        @brief Indique si la recherche d'expression exacte restreint les candidats d'une requête.
+        @param mots_cles Mots-clés de la requête.
+        @return True pour une requête de plusieurs mots ou aux espaces inhabituels.
+        """
+        expression = mots_cles.lower()
+        if expression != " ".join(expression.split()) and Tokeniseur.JOKER not in expression:
+            return True
+        return len(Tokeniseur.tokens_requete(mots_cles)) > 1
+
+    def filtre_expression(self, mots_cles, expression_exacte=True):
+        """
+        @brief Prépare la vérification de l'expression exacte de la requête.
+        @param mots_cles Mots-clés de la requête.
+        @param expression_exacte False : aucune vérification (OU pondéré des mots).
+        @return Tuple (docs_expression, accepter) : tableau trié des documents contenant l'expression
+        (None si tous conviennent) et fonction doc -> bool restant à appliquer (ou None).
+        """
+        if not expression_exacte:
+            return None, None
+        expression = mots_cles.lower()
+        mots = Tokeniseur.tokens_requete(mots_cles)
+        if expression != " ".join(expression.split()) and Tokeniseur.JOKER not in expression:
+            # Espaces inhabituels : vérification directe sur le texte
+            return None, lambda doc: expression in doc.texte.lower()
+        if len(mots) > 1:
+            # Mot du vocabulaire : son identifiant ; joker ou préfixe : les identifiants de son développement
+            ids_mots = []
+            for mot in mots:
+                terme_id = self.vocab.identifiant(mot) if Tokeniseur.JOKER not in mot else -1
+                ids_mots.append((mot, terme_id if terme_id >= 0 else self.termes_mot(mot)))
+            return self.index_positionnel.documents_expression(ids_mots, self.vocab), None
+        return None, None
+
+    def filtrer_candidats(self, mots_cles, doc_ids, scores, masque=None, expression_exacte=True, filtre=None):
+        """
+        @brief Restreint les candidats aux filtres auteur/dates et à l'expression exacte de la requête.
+        @param mots_cles Mots-clés de la requête.
+        @param doc_ids Identifiants des documents candidats, triés par ordre croissant.
+        @param scores Scores des candidats.
+        @param masque Masque booléen des documents respectant les filtres auteur/dates (ou None).
+        @param expression_exacte False pour ne garder que les filtres auteur/dates (OU pondéré des mots).
+        @param filtre Résultat de filtre_expression() déjà calculé pour la requête (optionnel).
+        @return Tuple (doc_ids, scores, accepter) ; accepter est une fonction doc -> bool restant à appliquer, ou None.
+        """
+        if masque is not None:
+            retenus = masque[doc_ids]
+            doc_ids, scores = doc_ids[retenus], scores[retenus]
+        docs_expression, accepter = filtre if filtre is not None else self.filtre_expression(mots_cles, expression_exacte)
+        if docs_expression is not None:
+            retenus = np.isin(doc_ids, docs_expression, assume_unique=True)
+            doc_ids, scores = doc_ids[retenus], scores[retenus]
+        return doc_ids, scores, accepter
+
+    def search_batch(self, queries, k=20, filters=None):
+        """
+        @brief Recherche un lot de requêtes avec un seul produit de matrices creuses.
+        @details
+        Les vecteurs de toutes les requêtes forment une matrice creuse Q (requêtes x mots) ;
+        les scores de tout le lot sont obtenus par Q x (poids)ᵀ, la transposée étant lue directement dans l'index inversé.
+        Chaque requête suit ensuite les mêmes règles que search() : mots absents, filtres et expression exacte.
+        Les requêtes booléennes sont exécutées à part, sur les listes de postings (voir calculer_scores_booleens()).
+        @param queries Liste de requêtes (chaînes de mots-clés).
+        @param k Nombre maximum de résultats par requête.
+        @param filters Dictionnaire optionnel des paramètres de MetadonneesDocuments.masque()
+        ('auteur', 'date_debut', 'date_fin', 'noms_corpus', 'themes', 'sources') appliqué à toutes les requêtes.
+        @return Liste (une entrée par requête) de tuples (doc_ids, scores) triés par score décroissant.
+        """
+        masque = self.metadonnees.masque(**(filters or {}))
+        booleennes = [self.requete_booleenne(requete) for requete in queries]
+
+        lignes, colonnes, valeurs = [], [], []
+        for i, requete in enumerate(queries):
+            if booleennes[i] is not None or self.mots_absents(requete):
+                continue
+            termes_ids, poids = self.termes_requete(requete)
+            lignes.append(np.full(len(termes_ids), i))
+            colonnes.append(termes_ids)
+            valeurs.append(poids)
+
+        vide = (np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float64))
+        lignes.append(np.empty(0, dtype=np.int64))
+        colonnes.append(np.empty(0, dtype=np.int64))
+        valeurs.append(np.empty(0))
+
+        matrice_requetes = csr_matrix(
+            (np.concatenate(valeurs), (np.concatenate(lignes), np.concatenate(colonnes))),
+            shape=(len(queries), self.index.n_termes))
+        matrice_scores = matrice_requetes @ self.index.matrice_transposee()
+        matrice_scores.sort_indices()
+
+        resultats = []
+        for i, requete in enumerate(queries):
+            if booleennes[i] is not None:
+                doc_ids, scores, _ = self.filtrer_candidats_booleens(
+                    *self.calculer_scores_booleens(booleennes[i]), masque)
+                positions = Utils.selection_top_k(doc_ids, scores, k)
+                resultats.append((doc_ids[positions].astype(np.int32), scores[positions]))
+                continue
+            debut, fin = matrice_scores.indptr[i], matrice_scores.indptr[i + 1]
+            doc_ids, scores = matrice_scores.indices[debut:fin], matrice_scores.data[debut:fin]
+            positifs = scores > 0
+            if not positifs.any():
+                resultats.append(vide)
+                continue
+            doc_ids, scores, accepter = self.filtrer_candidats(requete, doc_ids[positifs], scores[positifs], masque)
+            if accepter is not None:
+                acceptes = np.array([accepter(self.documents[doc_id]) for doc_id in doc_ids], dtype=bool)
+                doc_ids, scores = doc_ids[acceptes], scores[acceptes]
+            positions = Utils.selection_top_k(doc_ids, scores, k)
+            resultats.append((doc_ids[positions].astype(np.int32), scores[positions]))
+        return resultats
+
+    def meilleurs_documents(self, doc_ids, scores, k, accepter=None):
+        """
+        @brief Retourne les k documents acceptés de meilleur score.
+        @details
+        Les candidats sont examinés par lots de meilleurs scores (k, puis 2k, 4k...) ;
+        seuls les documents examinés sont lus, les autres ne sont jamais matérialisés.
+        @param doc_ids Identifiants des documents candidats, triés par ordre croissant.
+        @param scores Scores des candidats.
+        @param k Nombre de documents à retourner.
+        @param accepter Fonction doc -> bool appliquée aux candidats (optionnelle).
+        @return Liste de tuples (identifiant du document, score) triée par score décroissant.
+        """
+        resultats = []
+        restants = np.arange(len(doc_ids))
+        taille_lot = k
+        while len(resultats) < k and len(restants):
+            selection = Utils.selection_top_k(doc_ids[restants], scores[restants], taille_lot)
+            for position in restants[selection]:
+                doc_id = doc_ids[position]
+                if accepter is None or accepter(self.documents[doc_id]):
+                    resultats.append((doc_id, scores[position]))
+                    if len(resultats) == k:
+                        break
+            examines = np.ones(len(restants), dtype=bool)
+            examines[selection] = False
+            restants = restants[examines]
+            taille_lot *= 2
+        return resultats
+
     def afficher_matrices(self):
         """
         @brief Affiche les matrices TF et TF-IDF pour débogage.
@@ -0,0 +1,335 @@
+import os
+import struct
+import numpy as np
+from scipy.sparse import csc_matrix
+
+"""
+@file SegmentPostings.py
+@brief Segment d'index compressé : listes de postings (documents, fréquences) empaquetées par blocs de bits.
+
+@details
+Les postings de chaque mot (documents triés et nombre d'occurrences) sont découpés en blocs de TAILLE_BLOC.
+Dans un bloc, le premier document est gardé en clair ; les suivants sont codés par leur écart au précédent,
+et les fréquences par tf - 1. Chaque bloc utilise la plus petite largeur (en bits) qui contient ses valeurs
+(frame of reference) : un mot fréquent a des écarts de quelques bits, une fréquence tient souvent en 0 à 3 bits.
+
+Le décodage est vectorisé : la position en bits de chaque valeur se déduit de son bloc et de son rang dans le bloc ;
+les 8 octets qui la contiennent sont lus d'un coup (uint64), décalés et masqués, puis les écarts sont cumulés.
+Aucune boucle Python ne parcourt les postings, quel que soit le nombre de mots décodés ensemble.
+
+Seuls sont stockés, dans le plus petit type entier suffisant : les pointeurs des mots, le premier document
+et les deux largeurs de chaque bloc, et les deux flux de bits. La position de chaque bloc (en blocs et en bits)
+s'en déduit par sommes cumulées à l'ouverture. Pour l'élagage MaxScore, chaque mot garde aussi sa plus grande
+fréquence et la plus petite longueur des documents qui le contiennent : le poids maximal du mot (ou un majorant
+en BM25) s'en déduit sans décoder ses postings. Ces deux tableaux manquent aux segments écrits avant eux.
+
+Format du fichier ".seg" (entiers little-endian) : en-tête (signature MAGIC, nombre de documents, de mots
+et de tableaux), table des tableaux (nom, type NumPy, taille, position), puis les tableaux bruts alignés
+sur ALIGNEMENT octets. ouvrir() les projette en mémoire.
+"""
+
+class SegmentPostings:
+    """
+    @brief Listes de postings compressées (écarts et fréquences empaquetés par blocs), décodées à la demande.
+    """
+
+    MAGIC = b"SEGPST01"
+    EN_TETE = struct.Struct("<8sQQQ")
+    ENTREE = struct.Struct("<16s8sQQ")
+    ALIGNEMENT = 64
+    EXTENSION = ".seg"
+    TAILLE_BLOC = 128
+    TABLEAUX = ("pointeurs", "premiers_docs", "largeurs_docs", "largeurs_tf", "flux_docs", "flux_tf")
+    TABLEAUX_OPTIONNELS = ("tf_max", "longueurs_min")
+
+    def __init__(self, n_docs, n_termes, tableaux):
+        """
+        @brief Initialise un segment à partir de ses tableaux (voir depuis_matrice() et ouvrir()).
+        @param n_docs Nombre de documents.
+        @param n_termes Nombre de mots.
+        @param tableaux Dictionnaire {nom: tableau NumPy} contenant les tableaux de TABLEAUX
+        (et, s'ils ont été écrits, ceux de TABLEAUX_OPTIONNELS).
+        """
+        self.n_docs = n_docs
+        self.n_termes = n_termes
+        self.pointeurs = tableaux["pointeurs"]          # postings du mot t : [pointeurs[t], pointeurs[t+1])
+        self.premiers_docs = tableaux["premiers_docs"]  # premier document de chaque bloc
+        self.largeurs_docs = tableaux["largeurs_docs"]  # largeur en bits des écarts de chaque bloc
+        self.largeurs_tf = tableaux["largeurs_tf"]      # largeur en bits des fréquences (tf - 1) de chaque bloc
+        self.flux_docs = tableaux["flux_docs"]          # écarts empaquetés (suivis de 8 octets nuls)
+        self.flux_tf = tableaux["flux_tf"]              # fréquences empaquetées (suivies de 8 octets nuls)
+        self.tf_max = tableaux.get("tf_max")            # plus grande fréquence de chaque mot (0 sans posting)
+        self.longueurs_min = tableaux.get("longueurs_min")  # plus petite longueur des documents de chaque mot
+
+        # Tableaux déduits : blocs du mot t dans [blocs_termes[t], blocs_termes[t+1]), position en bits des blocs
+        longueurs = np.diff(self.pointeurs.astype(np.int64))
+        self.blocs_termes = np.zeros(n_termes + 1, dtype=np.int64)
+        self.blocs_termes[1:] = np.cumsum(-(-longueurs // self.TAILLE_BLOC))
+        tailles_blocs = self.tailles_blocs(longueurs, self.blocs_termes)
+        self.bits_docs, self.bits_tf = (np.cumsum(largeurs * tailles_blocs) - largeurs * tailles_blocs
+                                        for largeurs in (self.largeurs_docs.astype(np.int64),
+                                                         self.largeurs_tf.astype(np.int64)))
+
+    @classmethod
+    def tailles_blocs(cls, longueurs, blocs_termes):
+        """
+        @brief Nombre de postings de chaque bloc : TAILLE_BLOC, sauf pour le dernier bloc de chaque mot.
+        @param longueurs Nombre de postings de chaque mot.
+        @param blocs_termes Pointeurs des blocs de chaque mot.
+        @return Tableau int64 des tailles.
+        """
+        tailles = np.full(int(blocs_termes[-1]), cls.TAILLE_BLOC, dtype=np.int64)
+        non_vides = longueurs > 0
+        tailles[blocs_termes[1:][non_vides] - 1] = longueurs[non_vides] - cls.TAILLE_BLOC * (
+            blocs_termes[1:][non_vides] - blocs_termes[:-1][non_vides] - 1)
+        return tailles
+
+    def noms_tableaux(self):
+        """
+        @brief Noms des tableaux présents dans le segment.
+        @return Liste des noms de TABLEAUX, suivis de ceux de TABLEAUX_OPTIONNELS présents.
+        """
+        return list(self.TABLEAUX) + [nom for nom in self.TABLEAUX_OPTIONNELS if getattr(self, nom) is not None]
+
+    @staticmethod
+    def _entiers(valeurs):
+        """
+        @brief Convertit des entiers positifs dans le plus petit type non signé qui les contient.
+        @param valeurs Tableau d'entiers positifs.
+        @return Tableau converti.
+        """
+        return valeurs.astype(np.min_scalar_type(int(valeurs.max()) if len(valeurs) else 0))
+
+    @staticmethod
+    def _largeurs(valeurs, blocs, n_blocs):
+        """
+        @brief Largeur en bits nécessaire à chaque bloc : celle de sa plus grande valeur.
+        @param valeurs Valeurs positives à coder.
+        @param blocs Bloc de chaque valeur.
+        @param n_blocs Nombre de blocs.
+        @return Tableau uint8 des largeurs (0 pour un bloc de zéros).
+        """
+        maximums = np.zeros(n_blocs, dtype=np.int64)
+        np.maximum.at(maximums, blocs, valeurs)
+        largeurs = np.zeros(n_blocs, dtype=np.uint8)
+        positifs = maximums > 0
+        largeurs[positifs] = np.floor(np.log2(maximums[positifs])).astype(np.uint8) + 1
+        return largeurs
+
+    @staticmethod
+    def _empaqueter(valeurs, largeurs):
+        """
+        @brief Écrit des valeurs bout à bout, chacune sur sa largeur en bits (bit de poids faible d'abord).
+        @param valeurs Valeurs positives.
+        @param largeurs Largeur en bits de chaque valeur.
+        @return Flux d'octets (uint8), suivi de 8 octets nuls pour le décodage par mots de 64 bits.
+        """
+        largeurs = largeurs.astype(np.int64)
+        total = int(largeurs.sum())
+        debuts = np.cumsum(largeurs) - largeurs
+        proprietaires = np.repeat(np.arange(len(valeurs)), largeurs)
+        rangs = np.arange(total) - debuts[proprietaires]
+        bits = ((valeurs[proprietaires].astype(np.uint64) >> rangs.astype(np.uint64)) & np.uint64(1)).astype(np.uint8)
+        return np.concatenate((np.packbits(bits, bitorder="little"), np.zeros(8, dtype=np.uint8)))
+
+    @staticmethod
+    def _extraire(flux, positions, largeurs):
+        """
+        @brief Lit des valeurs empaquetées à des positions en bits données (décodage vectorisé).
+        @param flux Flux d'octets produit par _empaqueter().
+        @param positions Position en bits de chaque valeur.
+        @param largeurs Largeur en bits de chaque valeur (au plus 56).
+        @return Tableau uint64 des valeurs.
+        """
+        # Vue des mots de 64 bits commençant à chaque octet du flux (pas d'un octet, lecture non alignée)
+        mots_flux = np.ndarray(shape=(len(flux) - 7,), dtype="<u8", buffer=flux, strides=(1,))
+        mots = mots_flux[positions >> 3]
+        masques = (np.uint64(1) << largeurs.astype(np.uint64)) - np.uint64(1)
+        return (mots >> (positions & 7).astype(np.uint64)) & masques
+
+    @classmethod
+    def depuis_matrice(cls, mat_TF):
+        """
+        @brief Construit le segment d'une matrice TF.
+        @param mat_TF Matrice creuse Document x Mots des nombres d'occurrences (entiers positifs).
+        @return Instance de SegmentPostings.
+        """
+        csc = csc_matrix(mat_TF)
+        csc.sum_duplicates()
+        csc.sort_indices()
+        n_docs, n_termes = csc.shape
+        pointeurs = csc.indptr.astype(np.int64)
+        docs = csc.indices.astype(np.int64)
+        tf = np.rint(csc.data).astype(np.int64)
+
+        longueurs = np.diff(pointeurs)
+        blocs_termes = np.zeros(n_termes + 1, dtype=np.int64)
+        blocs_termes[1:] = np.cumsum(-(-longueurs // cls.TAILLE_BLOC))
+        termes = np.repeat(np.arange(n_termes), longueurs)
+        rangs = np.arange(len(docs)) - pointeurs[termes]
+        blocs = blocs_termes[termes] + rangs // cls.TAILLE_BLOC
+        premiers = rangs % cls.TAILLE_BLOC == 0
+
+        ecarts = np.zeros(len(docs), dtype=np.int64)
+        ecarts[1:] = docs[1:] - docs[:-1]
+        ecarts[premiers] = 0
+        n_blocs = int(blocs_termes[-1])
+        largeurs_docs = cls._largeurs(ecarts, blocs, n_blocs)
+        largeurs_tf = cls._largeurs(tf - 1, blocs, n_blocs)
+
+        # Bornes de l'élagage : plus grande fréquence et plus petite longueur de document de chaque mot
+        longueurs_docs = np.bincount(docs, weights=tf, minlength=n_docs).astype(np.int64)
+        tf_max = np.zeros(n_termes, dtype=np.int64)
+        longueurs_min = np.zeros(n_termes, dtype=np.int64)
+        non_vides = np.flatnonzero(longueurs > 0)
+        if len(non_vides):
+            tf_max[non_vides] = np.maximum.reduceat(tf, pointeurs[non_vides])
+            longueurs_min[non_vides] = np.minimum.reduceat(longueurs_docs[docs], pointeurs[non_vides])
+
+        tableaux = {
+            "pointeurs": pointeurs.astype(np.uint32 if len(docs) <= np.iinfo(np.uint32).max else np.uint64),
+            "premiers_docs": docs[premiers].astype(np.uint16 if n_docs <= np.iinfo(np.uint16).max else np.uint32),
+            "largeurs_docs": largeurs_docs,
+            "largeurs_tf": largeurs_tf,
+            "flux_docs": cls._empaqueter(ecarts, largeurs_docs[blocs]),
+            "flux_tf": cls._empaqueter(tf - 1, largeurs_tf[blocs]),
+            "tf_max": cls._entiers(tf_max),
+            "longueurs_min": cls._entiers(longueurs_min),
+        }
+        return cls(n_docs, n_termes, tableaux)
+
+    def etendre(self, n_termes):
+        """
+        @brief Retourne le segment élargi à n_termes mots ; les mots ajoutés n'ont aucun posting.
+        @details Un segment d'index fragmenté ne connaît que les mots du vocabulaire à son écriture :
+        le vocabulaire commun grandit ensuite avec les documents ajoutés.
+        @param n_termes Nombre de mots.
+        @return Instance de SegmentPostings (le segment lui-même s'il a déjà n_termes mots).
+        """
+        if n_termes <= self.n_termes:
+            return self
+        tableaux = {nom: getattr(self, nom) for nom in self.noms_tableaux()}
+        tableaux["pointeurs"] = np.concatenate(
+            (self.pointeurs, np.full(n_termes - self.n_termes, self.pointeurs[-1], dtype=self.pointeurs.dtype)))
+        for nom in self.TABLEAUX_OPTIONNELS:
+            if nom in tableaux:
+                tableaux[nom] = np.concatenate((tableaux[nom], np.zeros(n_termes - self.n_termes, tableaux[nom].dtype)))
+        return SegmentPostings(self.n_docs, n_termes, tableaux)
+
+    def longueurs(self, termes_ids):
+        """
+        @brief Nombre de postings de chaque mot.
+        @param termes_ids Identifiants des mots.
+        @return Tableau int64 des longueurs.
+        """
+        termes_ids = np.asarray(termes_ids, dtype=np.int64)
+        return self.pointeurs[termes_ids + 1].astype(np.int64) - self.pointeurs[termes_ids]
+
+    def decoder(self, termes_ids, frequences=True):
+        """
+        @brief Décode ensemble les postings de plusieurs mots.
+        @param termes_ids Identifiants des mots.
+        @param frequences False pour ne décoder que les documents.
+        @return Tuple (docs, tf) : postings des mots mis bout à bout dans l'ordre de termes_ids
+        (documents int32 triés pour chaque mot, fréquences int64 ; tf vaut None si frequences est False).
+        """
+        termes_ids = np.asarray(termes_ids, dtype=np.int64)
+        longueurs = self.longueurs(termes_ids)
+        total = int(longueurs.sum())
+        if total == 0:
+            return np.empty(0, dtype=np.int32), (np.empty(0, dtype=np.int64) if frequences else None)
+
+        # Rang de chaque posting dans la liste de son mot, puis bloc et rang dans le bloc
+        debuts_locaux = np.cumsum(longueurs) - longueurs
+        mots = np.repeat(np.arange(len(termes_ids)), longueurs)
+        rangs = np.arange(total) - debuts_locaux[mots]
+        blocs = self.blocs_termes[termes_ids][mots] + rangs // self.TAILLE_BLOC
+        rangs_bloc = rangs % self.TAILLE_BLOC
+
+        largeurs = self.largeurs_docs[blocs]
+        ecarts = self._extraire(self.flux_docs, self.bits_docs[blocs] + rangs_bloc * largeurs, largeurs).astype(np.int64)
+        cumul = np.cumsum(ecarts)
+        docs = (self.premiers_docs[blocs].astype(np.int64) + cumul - cumul[np.arange(total) - rangs_bloc]).astype(np.int32)
+        if not frequences:
+            return docs, None
+        largeurs = self.largeurs_tf[blocs]
+        tf = self._extraire(self.flux_tf, self.bits_tf[blocs] + rangs_bloc * largeurs, largeurs).astype(np.int64) + 1
+        return docs, tf
+
+    def postings(self, terme_id):
+        """
+        @brief Décode la liste de postings d'un mot.
+        @param terme_id Identifiant du mot.
+        @return Tuple (docs, tf).
+        """
+        return self.decoder([terme_id])
+
+    def octets(self):
+        """
+        @brief Taille des tableaux du segment, en octets.
+        @return Nombre d'octets.
+        """
+        return sum(getattr(self, nom).nbytes for nom in self.noms_tableaux())
+
+    def ecrire(self, chemin):
+        """
+        @brief Écrit le segment au format ".seg".
+        @details Le fichier est écrit à côté puis renommé : une projection de l'ancien fichier reste valide.
+        @param chemin Chemin du fichier.
+        """
+        noms = self.noms_tableaux()
+        tableaux = [np.ascontiguousarray(getattr(self, nom), dtype=getattr(self, nom).dtype.newbyteorder("<"))
+                    for nom in noms]
+        positions = []
+        position = self.EN_TETE.size + self.ENTREE.size * len(tableaux)
+        for tableau in tableaux:
+            position = -(-position // self.ALIGNEMENT) * self.ALIGNEMENT
+            positions.append(position)
+            position += tableau.nbytes
+
+        temporaire = f"{chemin}.tmp"
+        with open(temporaire, 'wb') as f:
+            f.write(self.EN_TETE.pack(self.MAGIC, self.n_docs, self.n_termes, len(tableaux)))
+            for nom, tableau, position in zip(noms, tableaux, positions):
+                f.write(self.ENTREE.pack(nom.encode(), tableau.dtype.str.encode(), len(tableau), position))
+            for tableau, position in zip(tableaux, positions):
+                f.write(b"\0" * (position - f.tell()))
+                f.write(tableau.tobytes())
+        os.replace(temporaire, chemin)
+
+    @classmethod
+    def projeter(cls, chemin):
+        """
+        @brief Projette en mémoire les tableaux d'un segment ".seg", sans préparer leur décodage.
+        @details Suffit pour lire les longueurs et les bornes des mots (voir MoteurFragmente) : seuls l'en-tête
+        et la table sont lus, et aucun tableau déduit n'est calculé.
+        @param chemin Chemin du fichier.
+        @return Tuple (n_docs, n_termes, {nom: tableau NumPy}).
+        @throws ValueError Si le fichier n'est pas un segment de postings.
+        """
+        with open(chemin, 'rb') as f:
+            en_tete = f.read(cls.EN_TETE.size)
+            if len(en_tete) < cls.EN_TETE.size or en_tete[:8] != cls.MAGIC:
+                raise ValueError(f"❌ '{chemin}' n'est pas un segment de postings.")
+            _, n_docs, n_termes, n_tableaux = cls.EN_TETE.unpack(en_tete)
+            entrees = [cls.ENTREE.unpack(f.read(cls.ENTREE.size)) for _ in range(n_tableaux)]
+
+        tableaux = {}
+        for nom, type_tableau, taille, position in entrees:
+            dtype = np.dtype(type_tableau.rstrip(b"\0").decode())
+            if taille == 0:
+                tableau = np.empty(0, dtype=dtype)  # une projection ne peut pas être vide
+            else:
+                tableau = np.memmap(chemin, dtype=dtype, mode='r', offset=position, shape=(taille,))
+            tableaux[nom.rstrip(b"\0").decode()] = tableau
+        return n_docs, n_termes, tableaux
+
+    @classmethod
+    def ouvrir(cls, chemin):
+        """
+        @brief Ouvre un segment ".seg" en projetant ses tableaux en mémoire (seuls l'en-tête et la table sont lus).
+        @param chemin Chemin du fichier.
+        @return Instance de SegmentPostings.
+        @throws ValueError Si le fichier n'est pas un segment de postings.
+        """
+        return cls(*cls.projeter(chemin))
@@ -0,0 +1,126 @@
+import threading
+import numpy as np
+from src.Utils import Utils
+
+"""
+@file TamponCandidats.py
+@brief Candidats d'une recherche gardés entre deux pages : préfixe trié, le reste n'étant jamais trié.
+
+@details
+L'ordre des résultats est le score décroissant puis l'identifiant de document croissant : le couple
+(score, document) du dernier résultat affiché suffit à reprendre la lecture (curseur).
+Le tampon garde tous les candidats d'une requête, mais ne trie que le préfixe déjà demandé. Quand une page
+dépasse ce préfixe, les meilleurs candidats restants sont sélectionnés (Utils.selection_top_k) par lots
+au moins aussi grands que le préfixe, qui double donc à chaque extension : servir une page déjà couverte ne coûte
+qu'une dichotomie et une copie de la page, et le tri complet des candidats n'est jamais fait pour rien.
+
+Un tampon peut aussi être construit à partir d'un curseur (origine) quand celui de la requête a été évincé :
+seuls les candidats placés après le curseur y sont gardés, ce qui reprend la sélection là où elle s'était arrêtée.
+"""
+
+class TamponCandidats:
+    """
+    @brief Candidats triés à la demande, pour servir les pages successives d'une même recherche.
+    """
+
+    TAILLE_LOT_MIN = 64
+
+    def __init__(self, doc_ids, scores, mots_cles, accepter=None, documents=None, origine=None):
+        """
+        @brief Initialise le tampon d'une recherche.
+        @param doc_ids Identifiants des documents candidats, triés par ordre croissant.
+        @param scores Scores des candidats.
+        @param mots_cles Requête transmise aux extraits (voir SearchEngine.tableau_resultats).
+        @param accepter Fonction doc -> bool appliquée aux candidats au moment de leur tri (optionnelle).
+        @param documents Documents du moteur, nécessaires si accepter est fourni.
+        @param origine Tuple (score, document) : seuls les candidats placés après lui sont gardés (optionnel).
+        """
+        doc_ids = np.asarray(doc_ids)
+        scores = np.asarray(scores, dtype=np.float64)
+        if origine is not None:
+            apres = (scores < origine[0]) | ((scores == origine[0]) & (doc_ids > origine[1]))
+            doc_ids, scores = doc_ids[apres], scores[apres]
+        self.doc_ids = doc_ids
+        self.scores = scores
+        self.mots_cles = mots_cles
+        self.origine = origine
+        self._accepter = accepter
+        self._documents = documents
+        self._restants = np.arange(len(doc_ids))  # positions des candidats pas encore triés
+        self.docs_tries = np.empty(0, dtype=np.int64)
+        self._scores_negatifs = np.empty(0, dtype=np.float64)  # -score du préfixe trié, croissant
+        self._verrou = threading.Lock()
+
+    def __len__(self):
+        """
+        @brief Retourne le nombre de résultats déjà triés.
+        """
+        return len(self.docs_tries)
+
+    def couvre(self, curseur):
+        """
+        @brief Indique si le tampon contient tous les résultats placés après un curseur.
+        @param curseur Tuple (score, document) du dernier résultat lu, ou None pour la première page.
+        @return True si le tampon peut servir la page suivant le curseur.
+        """
+        if self.origine is None:
+            return True
+        if curseur is None:
+            return False
+        return (-curseur[0], curseur[1]) >= (-self.origine[0], self.origine[1])
+
+    def _position_apres(self, curseur):
+        """
+        @brief Position dans le préfixe trié du premier résultat placé après un curseur (double dichotomie).
+        @param curseur Tuple (score, document), ou None.
+        @return Position.
+        """
+        if curseur is None:
+            return 0
+        debut = np.searchsorted(self._scores_negatifs, -curseur[0], side="left")
+        fin = np.searchsorted(self._scores_negatifs, -curseur[0], side="right")
+        return int(debut + np.searchsorted(self.docs_tries[debut:fin], curseur[1], side="right"))
+
+    def _etendre(self, n):
+        """
+        @brief Trie au moins n candidats acceptés de plus (ou tous les restants).
+        @param n Nombre de résultats à ajouter au préfixe trié.
+        """
+        ajouts_docs, ajouts_scores, ajoutes = [], [], 0
+        taille_lot = max(n, len(self.docs_tries), self.TAILLE_LOT_MIN)
+        while ajoutes < n and len(self._restants):
+            selection = Utils.selection_top_k(self.doc_ids[self._restants], self.scores[self._restants], taille_lot)
+            positions = self._restants[selection]
+            if self._accepter is not None:
+                positions = positions[[bool(self._accepter(self._documents[doc_id]))
+                                       for doc_id in self.doc_ids[positions]]]
+            ajouts_docs.append(self.doc_ids[positions])
+            ajouts_scores.append(-self.scores[positions])
+            ajoutes += len(positions)
+            examines = np.ones(len(self._restants), dtype=bool)
+            examines[selection] = False
+            self._restants = self._restants[examines]
+            taille_lot *= 2
+        if ajouts_docs:
+            self.docs_tries = np.concatenate([self.docs_tries] + ajouts_docs).astype(np.int64)
+            self._scores_negatifs = np.concatenate([self._scores_negatifs] + ajouts_scores)
+
+    def page(self, taille, curseur=None):
+        """
+        @brief Retourne les résultats placés après un curseur.
+        @param taille Nombre maximal de résultats.
+        @param curseur Tuple (score, document) du dernier résultat lu, ou None pour la première page.
+        @return Liste de tuples (identifiant du document, score) par score décroissant.
+        @throws ValueError Si le tampon ne couvre pas le curseur (voir couvre()).
+        """
+        if not self.couvre(curseur):
+            raise ValueError("❌ Le curseur précède le début de ce tampon de résultats.")
+        with self._verrou:
+            while True:
+                debut = self._position_apres(curseur)
+                manquants = debut + taille - len(self.docs_tries)
+                if manquants <= 0 or not len(self._restants):
+                    break
+                self._etendre(manquants)
+            fin = debut + taille
+            return list(zip(self.docs_tries[debut:fin].tolist(), (-self._scores_negatifs[debut:fin]).tolist()))
@@ -0,0 +1,150 @@
+import re
+import string
+import sys
+import unicodedata
+
+"""
+@file Tokeniseur.py
+@brief Découpage en mots commun à l'indexation, aux requêtes et aux statistiques.
+
+@details
+Les tables sont compilées une seule fois et un texte n'est parcouru que par des opérations écrites en C
+(lower, normalize, translate, replace, split) au lieu d'une boucle Python par caractère :
+- la ponctuation ASCII est retirée par bytes.translate sur l'encodage UTF-8 (un octet ASCII n'apparaît jamais
+  à l'intérieur d'un caractère multi-octets) ;
+- texte ASCII : pas d'accents, la décomposition NFD est sautée ;
+- autre texte : NFD, puis seules les marques combinantes (catégorie Mn) présentes dans le texte sont retirées.
+
+Deux normalisations coexistent, avec leur sens historique :
+- normaliser() (ex-Utils.nettoyer_texte) : minuscules, accents et ponctuation ASCII supprimés, espaces simples ;
+  c'est celle de l'index, des textes de documents et des requêtes ;
+- normaliser_frequence() (ex-Frequence.nettoyer_texte) : ponctuation remplacée par une espace, chiffres supprimés.
+"""
+
+class Tokeniseur:
+    """
+    @brief Normalisation et découpage en mots des textes, un par un, par lots ou en flux.
+    """
+
+    # Ponctuation ASCII supprimée (les apostrophes de "don't" comprises : "dont")
+    PONCTUATION = string.punctuation.encode()
+    # Statistiques : ponctuation au sens de [^\w\s] remplacée par une espace, chiffres supprimés
+    _PONCTUATION_FREQUENCE = bytes(code for code in range(128) if re.match(r"[^\w\s]", chr(code)))
+    TABLE_FREQUENCE = bytes.maketrans(_PONCTUATION_FREQUENCE, b" " * len(_PONCTUATION_FREQUENCE))
+    CHIFFRES = string.digits.encode()
+    MOTIF_PONCTUATION = re.compile(r"[^\w\s]")
+    MOTIF_CHIFFRES = re.compile(r"\d+")
+    SEPARATEUR_LOT = "\x00"  # ni ponctuation, ni espace, ni lettre : traverse le nettoyage sans être modifié
+    JOKER = "*"  # joker des requêtes : suite quelconque de caractères
+    _MARQUE_JOKER = "\x01"  # remplace le joker (ponctuation) le temps du nettoyage
+
+    _marques_combinantes = None  # construit au premier texte non ASCII
+
+    @classmethod
+    def marques_combinantes(cls):
+        """
+        @brief Ensemble des marques combinantes (catégorie Unicode Mn), retirées après la décomposition NFD.
+        @details Construit une seule fois (parcours de tous les points de code, environ 0,3 s).
+        @return frozenset de caractères.
+        """
+        if cls._marques_combinantes is None:
+            cls._marques_combinantes = frozenset(chr(code) for code in range(sys.maxunicode + 1)
+                                                 if unicodedata.category(chr(code)) == 'Mn')
+        return cls._marques_combinantes
+
+    @staticmethod
+    def _nettoyer(texte):
+        """
+        @brief Minuscules, accents et ponctuation supprimés, espaces laissés tels quels.
+        @param texte Texte brut.
+        @return Texte nettoyé.
+        """
+        texte = texte.lower()
+        if texte.isascii():
+            return texte.encode('ascii').translate(None, Tokeniseur.PONCTUATION).decode('ascii')
+        texte = unicodedata.normalize('NFD', texte).encode('utf-8').translate(None, Tokeniseur.PONCTUATION).decode('utf-8')
+        for marque in Tokeniseur.marques_combinantes().intersection(texte):
+            texte = texte.replace(marque, '')
+        return texte
+
+    @staticmethod
+    def normaliser(texte):
+        """
+        @brief Normalise un texte : minuscules, sans accents ni ponctuation, mots séparés par une espace.
+        @param texte Texte brut.
+        @return Texte normalisé.
+        """
+        return ' '.join(Tokeniseur._nettoyer(texte).split())
+
+    @staticmethod
+    def tokens(texte):
+        """
+        @brief Découpe un texte en mots normalisés.
+        @param texte Texte brut ou requête.
+        @return Liste des mots.
+        """
+        return Tokeniseur.normaliser(texte).split()
+
+    @staticmethod
+    def tokens_requete(requete):
+        """
+        @brief Découpe une requête en mots normalisés comme tokens(), en gardant les jokers ("educat*", "c*mate").
+        @param requete Requête brute.
+        @return Liste des mots ou motifs.
+        """
+        requete = requete.replace(Tokeniseur._MARQUE_JOKER, "").replace(Tokeniseur.JOKER, Tokeniseur._MARQUE_JOKER)
+        return [mot.replace(Tokeniseur._MARQUE_JOKER, Tokeniseur.JOKER) for mot in Tokeniseur.tokens(requete)]
+
+    @staticmethod
+    def normaliser_lot(textes):
+        """
+        @brief Normalise une liste de textes (résultat identique à normaliser() sur chacun).
+        @details
+        Les textes ASCII sont mis bout à bout avec un séparateur et nettoyés en un seul appel, ce qui évite
+        le coût fixe par texte sur les textes courts ; les autres passent un par un par la décomposition NFD.
+        @param textes Liste de textes bruts.
+        @return Liste des textes normalisés, dans le même ordre.
+        """
+        resultats = [None] * len(textes)
+        ascii_ids = []
+        for i, texte in enumerate(textes):
+            if texte.isascii() and Tokeniseur.SEPARATEUR_LOT not in texte:
+                ascii_ids.append(i)
+            else:
+                resultats[i] = Tokeniseur.normaliser(texte)
+        if ascii_ids:
+            bloc = Tokeniseur._nettoyer(Tokeniseur.SEPARATEUR_LOT.join([textes[i] for i in ascii_ids]))
+            for i, morceau in zip(ascii_ids, bloc.split(Tokeniseur.SEPARATEUR_LOT)):
+                resultats[i] = ' '.join(morceau.split())
+        return resultats
+
+    @staticmethod
+    def flux_tokens(textes, taille_lot=256):
+        """
+        @brief Découpe en mots un flux de textes, normalisés par lots de taille bornée.
+        @param textes Itérable de textes bruts (par exemple un générateur sur les documents).
+        @param taille_lot Nombre de textes normalisés ensemble.
+        @return Générateur de listes de mots, une par texte, dans l'ordre.
+        """
+        lot = []
+        for texte in textes:
+            lot.append(texte)
+            if len(lot) == taille_lot:
+                yield from (texte.split() for texte in Tokeniseur.normaliser_lot(lot))
+                lot = []
+        if lot:
+            yield from (texte.split() for texte in Tokeniseur.normaliser_lot(lot))
+
+    @staticmethod
+    def normaliser_frequence(texte):
+        """
+        @brief Normalise un texte pour les statistiques : minuscules, ponctuation remplacée par une espace, sans chiffres.
+        @param texte Texte brut.
+        @return Texte normalisé.
+        """
+        texte = texte.lower()
+        if texte.isascii():
+            texte = texte.encode('ascii').translate(Tokeniseur.TABLE_FREQUENCE, Tokeniseur.CHIFFRES).decode('ascii')
+        else:
+            texte = Tokeniseur.MOTIF_CHIFFRES.sub('', Tokeniseur.MOTIF_PONCTUATION.sub(' ', texte))
+        return ' '.join(texte.split())
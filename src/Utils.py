@@ -1,9 +1,10 @@
  # Fichier Utils.py
 import re
-import unicodedata
-import string
 import os
 import pickle
+import numpy as np
+from src.GenerateurExtraits import GenerateurExtraits
+from src.Tokeniseur import Tokeniseur
 
 class Utils:
     """
@@ -29,21 +30,8 @@ class Utils:
         @param texte Texte à nettoyer.
         @return Texte nettoyé.
         """
-        # 1. Conversion en minuscules
-        texte = texte.lower()
-        
-        # 2. Suppression des accents
-        texte = ''.join((c for c in unicodedata.normalize('NFD', texte) if unicodedata.category(c) != 'Mn'))
-        
-        # 3. Gestion des contractions anglaises (don't -> dont, l'apostrophe est retirée)
-        texte = re.sub(r"(\w)'(\w)", r"\1\2", texte)  # don't -> dont, I'm -> im
-        
-        # 4. Suppression de la ponctuation
-        texte = texte.translate(str.maketrans('', '', string.punctuation))
-        
-        # 5. Suppression des espaces multiples
-        texte = ' '.join(texte.split())
-        return texte
+        # Minuscules, accents, ponctuation (don't -> dont) et espaces multiples : voir Tokeniseur
+        return Tokeniseur.normaliser(texte)
         
         """ texte = texte.lower()  # Convertir en minuscule
          # Remplacement spécifique pour ne pas perdre les formes comme L'IA
@@ -100,25 +88,38 @@ class Utils:
     
      
     @staticmethod
-    def extraire_extrait(texte, mot_cle, taille_contexte=10):
+    def extraire_extrait(texte, mot_cle, taille_contexte=15):
         """
         @brief Extrait un passage d'un texte autour d'un mot-clé.
+        @details Délègue à GenerateurExtraits ; pour plusieurs documents d'une même requête,
+        créer un seul GenerateurExtraits évite de recompiler la recherche.
         @param texte Texte source.
         @param mot_cle Mot-clé à rechercher.
         @param taille_contexte Nombre de mots autour du mot-clé à inclure dans l'extrait.
         @return Extrait contenant le mot-clé et son contexte.
         """
-        # Nettoyer le texte pour éviter les problèmes de casse
-        mots = texte.lower().split()
-        mot_cle = mot_cle.lower()
-
-        # Expression régulière pour capturer le mot-clé avec 10 mots avant et après
-        pattern = r'(\b\w+\b\s*){0,' + str(15) + r'}' + re.escape(mot_cle) + r'(\s*\b\w+\b){0,' + str(15) + r'}'
-        
-        matches = re.finditer(pattern, texte, re.MULTILINE)
-        
-        for matchNum, match in enumerate(matches, start=1):
-            if match:
-                return match.group()  # Retourne l'extrait complet (mot-clé + contexte)
-        return "Extrait non disponible"
+        return GenerateurExtraits(mot_cle, taille_contexte).extraire(texte)[0]
     
+
+    @staticmethod
+    def selection_top_k(identifiants, scores, k):
+        """
+        @brief Sélectionne les k meilleurs scores sans trier tout le tableau.
+        @details
+        np.argpartition isole les k plus grands scores en temps linéaire ; seuls ces k éléments sont ensuite triés.
+        À score égal, l'élément de plus petit identifiant passe en premier, comme avec un tri stable.
+        @param identifiants Identifiants des éléments (documents), triés par ordre croissant.
+        @param scores Scores associés.
+        @param k Nombre d'éléments à retenir.
+        @return Positions (dans identifiants/scores) des k meilleurs éléments, par score décroissant.
+        """
+        if k <= 0 or len(scores) == 0:
+            return np.empty(0, dtype=np.int64)
+        if k < len(scores):
+            seuil = scores[np.argpartition(scores, len(scores) - k)[len(scores) - k]]
+            superieurs = np.flatnonzero(scores > seuil)
+            egaux = np.flatnonzero(scores == seuil)[:k - len(superieurs)]
+            positions = np.concatenate((superieurs, egaux))
+        else:
+            positions = np.arange(len(scores))
+        return positions[np.lexsort((identifiants[positions], -scores[positions]))]
@@ -0,0 +1,284 @@
+import re
+import numpy as np
+from src.Tokeniseur import Tokeniseur
+
+"""
+@file Vocabulaire.py
+@brief Dictionnaire des mots compact : mots triés dans un seul bloc d'octets, statistiques dans des tableaux NumPy.
+
+@details
+Le vocabulaire {mot: {'id', 'freq', 'len'}} et le dictionnaire parallèle des fréquences documentaires coûtent
+plusieurs centaines d'octets par mot (un dictionnaire Python par mot) et sont longs à désérialiser.
+Ici, pour n mots :
+- bloc : les mots triés, encodés en UTF-8 et séparés par "\\n" (un mot ne contient jamais d'espace) ;
+- ids_tries : identifiant du mot à chaque rang trié ;
+- frequences, frequences_documents, longueurs : occurrences dans la collection, nombre de documents
+  contenant le mot et nombre de caractères, indexés par identifiant ;
+- debuts (position de chaque mot trié dans le bloc, n + 1 valeurs) et rangs (rang trié de chaque identifiant,
+  permutation inverse de ids_tries) : déduits du bloc et de ids_tries à la construction et au chargement,
+  ils ne sont pas enregistrés.
+Les tableaux sont gardés dans le plus petit type entier non signé qui contient leurs valeurs : le pickle
+coûte environ 16 octets par mot sur le corpus csvdiscours, dont 9 pour les mots eux-mêmes (171 Ko,
+contre 302 Ko pour le pickle de l'ancien dictionnaire).
+
+La recherche d'un mot est une dichotomie dans le bloc (l'ordre des octets UTF-8 est celui des points de code).
+Les mots commençant par un même préfixe sont contigus dans le bloc : un préfixe ou un motif à jokers ("educat*",
+"c*mate") est développé par deux dichotomies, puis, si le motif contient d'autres jokers, par une expression
+régulière appliquée à la seule tranche du bloc couverte par le préfixe.
+Un motif commençant par un joker ("*tion") est développé de la même façon, retourné, dans le vocabulaire
+des mots retournés (construit au premier motif de ce type) : son suffixe y devient un préfixe.
+Un motif sans partie littérale au début ni à la fin ("*", "*ati*") n'est pas accepté : il obligerait
+à parcourir tout le vocabulaire.
+"""
+
+class Vocabulaire:
+    """
+    @brief Vocabulaire d'un corpus : mot <-> identifiant de colonne de la matrice, et statistiques par mot.
+    """
+
+    SEPARATEUR = b"\n"
+    JOKER = Tokeniseur.JOKER
+
+    def __init__(self, mots, frequences=None, frequences_documents=None):
+        """
+        @brief Construit le vocabulaire.
+        @param mots Liste des mots, dans l'ordre de leurs identifiants (colonnes de la matrice).
+        @param frequences Nombre d'occurrences de chaque mot dans la collection (optionnel).
+        @param frequences_documents Nombre de documents contenant chaque mot (optionnel).
+        """
+        encodes = [mot.encode("utf-8") for mot in mots]
+        ordre = sorted(range(len(encodes)), key=encodes.__getitem__)
+        self.bloc = b"".join(encodes[i] + self.SEPARATEUR for i in ordre)
+        self.ids_tries = self._entiers(ordre)
+
+        n_mots = len(encodes)
+        self.frequences = self._entiers(frequences if frequences is not None else np.zeros(n_mots))
+        self.frequences_documents = self._entiers(
+            frequences_documents if frequences_documents is not None else np.zeros(n_mots))
+        self.longueurs = self._entiers([len(mot) for mot in mots])
+        self._retournes = None  # vocabulaire des mots retournés (motifs commençant par un joker)
+        self._deduire()
+
+    @staticmethod
+    def _entiers(valeurs):
+        """
+        @brief Convertit des entiers positifs dans le plus petit type non signé qui les contient.
+        @param valeurs Entiers positifs (séquence ou tableau).
+        @return Tableau converti.
+        """
+        valeurs = np.asarray(valeurs, dtype=np.int64)
+        return valeurs.astype(np.min_scalar_type(int(valeurs.max()) if len(valeurs) else 0))
+
+    def _deduire(self):
+        """
+        @brief Calcule les tableaux déduits du bloc et de ids_tries : debuts et rangs.
+        """
+        separateurs = np.flatnonzero(np.frombuffer(self.bloc, dtype=np.uint8) == self.SEPARATEUR[0])
+        self.debuts = self._entiers(np.concatenate(([0], separateurs + 1)))
+        rangs = np.empty(len(self.ids_tries), dtype=np.int64)
+        rangs[self.ids_tries] = np.arange(len(self.ids_tries))
+        self.rangs = self._entiers(rangs)
+
+    def __getstate__(self):
+        """
+        @brief État enregistré par pickle : les tableaux déduits et le vocabulaire des mots retournés,
+        reconstructibles, n'en font pas partie.
+        """
+        etat = dict(self.__dict__)
+        for attribut in ("debuts", "rangs"):
+            etat.pop(attribut, None)
+        etat["_retournes"] = None
+        return etat
+
+    def __setstate__(self, etat):
+        """
+        @brief Restaure un vocabulaire enregistré et recalcule ses tableaux déduits.
+        @param etat État enregistré par __getstate__() (ou par une version qui enregistrait aussi debuts et rangs).
+        """
+        self.__dict__.update(etat)
+        self._deduire()
+
+    @classmethod
+    def depuis_dict(cls, vocab, frequence_mot=None):
+        """
+        @brief Convertit l'ancien vocabulaire {mot: {'id', 'freq', 'len'}} et le dictionnaire des fréquences documentaires.
+        @param vocab Vocabulaire sous forme de dictionnaire.
+        @param frequence_mot Dictionnaire {mot: nombre de documents contenant le mot} (optionnel).
+        @return Instance de Vocabulaire.
+        """
+        mots = sorted(vocab, key=lambda mot: vocab[mot]['id'])
+        frequence_mot = frequence_mot or {}
+        return cls(mots,
+                   [vocab[mot].get('freq', 0) for mot in mots],
+                   [frequence_mot.get(mot, 0) for mot in mots])
+
+    def __len__(self):
+        """
+        @brief Retourne le nombre de mots.
+        """
+        return len(self.ids_tries)
+
+    def _mot_trie(self, rang):
+        """
+        @brief Retourne les octets du mot de rang trié donné.
+        @param rang Rang dans l'ordre trié.
+        @return Mot encodé en UTF-8.
+        """
+        return self.bloc[int(self.debuts[rang]):int(self.debuts[rang + 1]) - 1]
+
+    def identifiant(self, mot):
+        """
+        @brief Cherche l'identifiant d'un mot par dichotomie dans le bloc trié.
+        @param mot Mot recherché.
+        @return Identifiant du mot, ou -1 s'il est absent.
+        """
+        cle = mot.encode("utf-8")
+        rang = self._borne(cle)
+        if rang < len(self) and self._mot_trie(rang) == cle:
+            return int(self.ids_tries[rang])
+        return -1
+
+    def _borne(self, cle, bas=0):
+        """
+        @brief Rang trié du premier mot supérieur ou égal à une clé (dichotomie dans le bloc).
+        @param cle Clé encodée en UTF-8.
+        @param bas Rang à partir duquel chercher.
+        @return Rang trié.
+        """
+        haut = len(self)
+        while bas < haut:
+            milieu = (bas + haut) // 2
+            if self._mot_trie(milieu) < cle:
+                bas = milieu + 1
+            else:
+                haut = milieu
+        return bas
+
+    def plage_prefixe(self, prefixe):
+        """
+        @brief Plage des rangs triés des mots commençant par un préfixe.
+        @details L'octet 0xff n'apparaît jamais en UTF-8 : tout mot commençant par le préfixe est inférieur à prefixe + 0xff.
+        @param prefixe Préfixe recherché.
+        @return Tuple (debut, fin) : les mots de rangs debut à fin - 1 commencent par le préfixe.
+        """
+        cle = prefixe.encode("utf-8")
+        debut = self._borne(cle)
+        return debut, self._borne(cle + b"\xff", debut)
+
+    def termes_prefixe(self, prefixe):
+        """
+        @brief Identifiants des mots commençant par un préfixe.
+        @param prefixe Préfixe recherché.
+        @return Tableau int64 des identifiants, dans l'ordre trié des mots.
+        """
+        debut, fin = self.plage_prefixe(prefixe)
+        return self.ids_tries[debut:fin].astype(np.int64)
+
+    def developper(self, motif, limite=None):
+        """
+        @brief Développe un motif à jokers ("educat*", "c*mate", "*tion") en identifiants de mots.
+        @details
+        Seule la tranche du bloc commençant par la partie littérale du motif (avant le premier joker) est examinée ;
+        les autres jokers y sont cherchés par une expression régulière, ligne à ligne, sans boucle Python par mot.
+        Un motif commençant par un joker est cherché, retourné, dans le vocabulaire des mots retournés.
+        @param motif Motif normalisé ; JOKER remplace une suite quelconque de caractères (éventuellement vide).
+        @param limite Nombre maximal de mots retournés, les plus fréquents en documents d'abord (optionnel).
+        @return Tableau int64 des identifiants, par fréquence documentaire décroissante puis ordre alphabétique.
+        @throws ValueError Si le motif commence et finit par un joker.
+        """
+        prefixe, joker, _ = motif.partition(self.JOKER)
+        if not joker:
+            terme_id = self.identifiant(motif)
+            return np.array([terme_id] if terme_id >= 0 else [], dtype=np.int64)
+
+        if prefixe:
+            ids = self._termes_motif(motif)
+        elif not motif.endswith(self.JOKER):
+            ids = self.retournes()._termes_motif(motif[::-1])
+        else:
+            raise ValueError(f"❌ Le motif '{motif}' doit commencer ou finir par au moins une lettre.")
+        ordre = np.argsort(-self.frequences_documents[ids].astype(np.int64), kind="stable")
+        return ids[ordre[:limite]]
+
+    def _termes_motif(self, motif):
+        """
+        @brief Identifiants des mots correspondant à un motif à jokers, cherchés dans la plage de son préfixe.
+        @param motif Motif contenant au moins un joker.
+        @return Tableau int64 des identifiants, dans l'ordre trié des mots.
+        """
+        prefixe, _, suite = motif.partition(self.JOKER)
+        debut, fin = self.plage_prefixe(prefixe)
+        rangs = np.arange(debut, fin)
+        if suite.strip(self.JOKER):
+            # "." ne traverse pas le séparateur "\n" : chaque correspondance est un mot entier de la tranche
+            expression = re.compile(b"^" + b".*".join(re.escape(partie.encode("utf-8")) for partie in motif.split(self.JOKER))
+                                    + b"$", re.MULTILINE)
+            tranche = self.bloc[int(self.debuts[debut]):int(self.debuts[fin])]
+            positions = [correspondance.start() for correspondance in expression.finditer(tranche)]
+            rangs = debut + np.searchsorted(self.debuts[debut:fin] - self.debuts[debut], positions)
+        return self.ids_tries[rangs].astype(np.int64)
+
+    def retournes(self):
+        """
+        @brief Vocabulaire des mots retournés ("nation" -> "noitan"), de mêmes identifiants, construit au premier usage.
+        @details Les mots finissant par un même suffixe y sont contigus.
+        @return Instance de Vocabulaire (sans statistiques).
+        """
+        if getattr(self, "_retournes", None) is None:
+            self._retournes = Vocabulaire([mot[::-1] for mot in self.mots_par_id()])
+        return self._retournes
+
+    def identifiants(self, mots):
+        """
+        @brief Cherche les identifiants d'une liste de mots.
+        @param mots Liste de mots.
+        @return Tableau int64 des identifiants (-1 pour les mots absents).
+        """
+        return np.array([self.identifiant(mot) for mot in mots], dtype=np.int64)
+
+    def mot(self, terme_id):
+        """
+        @brief Retourne le mot d'un identifiant.
+        @param terme_id Identifiant du mot.
+        @return Mot.
+        """
+        return self._mot_trie(self.rangs[terme_id]).decode("utf-8")
+
+    def mots_tries(self):
+        """
+        @brief Retourne tous les mots dans l'ordre trié.
+        @return Liste de mots.
+        """
+        return self.bloc.decode("utf-8").split("\n")[:-1]
+
+    def mots_par_id(self):
+        """
+        @brief Retourne tous les mots dans l'ordre de leurs identifiants.
+        @return Liste de mots (l'élément i est le mot d'identifiant i).
+        """
+        mots_tries = self.mots_tries()
+        return [mots_tries[rang] for rang in self.rangs]
+
+    def __contains__(self, mot):
+        """
+        @brief Indique si un mot fait partie du vocabulaire.
+        """
+        return isinstance(mot, str) and self.identifiant(mot) >= 0
+
+    def __getitem__(self, mot):
+        """
+        @brief Accès compatible avec l'ancien vocabulaire : vocab[mot] -> {'id', 'freq', 'len'}.
+        @param mot Mot recherché.
+        @return Dictionnaire des statistiques du mot.
+        @throws KeyError Si le mot est absent.
+        """
+        terme_id = self.identifiant(mot)
+        if terme_id < 0:
+            raise KeyError(mot)
+        return {'id': terme_id, 'freq': int(self.frequences[terme_id]), 'len': int(self.longueurs[terme_id])}
+
+    def __iter__(self):
+        """
+        @brief Parcourt les mots dans l'ordre de leurs identifiants (comme l'ancien dictionnaire).
+        """
+        return iter(self.mots_par_id())
@@ -80,4 +80,127 @@ THEMESCORPUS = {
 @var THEMESCORPUS
 @brief Dictionnaire des thèmes disponibles dans l'application.
 @details Chaque thème est associé à deux listes : une pour Reddit/Arxiv et une pour les sources CSV.
-"""
\ No newline at end of file
+"""
+
+BUDGET_MEMOIRE_MOTEURS = int(os.getenv('BUDGET_MEMOIRE_MOTEURS', 256 * 1024 * 1024))
+"""
+@var BUDGET_MEMOIRE_MOTEURS
+@brief Mémoire maximale (en octets) occupée par les moteurs de recherche gardés en mémoire.
+@details Au-delà, le registre des moteurs décharge les corpus les moins récemment utilisés.
+"""
+
+
+DELAI_RECHERCHE_CORPUS = float(os.getenv('DELAI_RECHERCHE_CORPUS', 10))
+"""
+@var DELAI_RECHERCHE_CORPUS
+@brief Délai maximal (en secondes) d'une recherche sur plusieurs corpus.
+@details Les corpus étant interrogés en parallèle, le délai court pour tous à la fois depuis la soumission
+de la recherche : les corpus qui n'ont pas répondu à son terme sont signalés et ignorés dans les résultats.
+"""
+
+MODE_RECHERCHE_FEDEREE = os.getenv('MODE_RECHERCHE_FEDEREE', "fils")
+"""
+@var MODE_RECHERCHE_FEDEREE
+@brief Exécution de la recherche sur plusieurs corpus : "fils" (moteurs partagés) ou "processus" (un processus par corpus).
+"""
+
+NOM_CORPUS_UNIFIE = "unifie"
+"""
+@var NOM_CORPUS_UNIFIE
+@brief Nom du corpus regroupant les documents de tous les corpus dans un index unique.
+@details Le corpus d'origine, le thème et la source de chaque document y sont conservés comme facettes.
+"""
+
+INDEX_UNIFIE = os.getenv('INDEX_UNIFIE', "0") == "1"
+"""
+@var INDEX_UNIFIE
+@brief Si vrai, l'application interroge l'index unifié (filtré par corpus) au lieu d'un moteur par corpus.
+"""
+
+PONDERATION_SCORES = os.getenv('PONDERATION_SCORES', "tfidf")
+"""
+@var PONDERATION_SCORES
+@brief Pondération des scores utilisée par défaut par le moteur de recherche : "tfidf" ou "bm25".
+"""
+
+BM25_K1 = float(os.getenv('BM25_K1', 1.2))
+"""
+@var BM25_K1
+@brief Paramètre k1 de BM25 : saturation de la fréquence d'un mot dans un document.
+"""
+
+BM25_B = float(os.getenv('BM25_B', 0.75))
+"""
+@var BM25_B
+@brief Paramètre b de BM25 : normalisation par la longueur du document (0 : aucune, 1 : complète).
+"""
+
+TAILLE_CACHE_RESULTATS = int(os.getenv('TAILLE_CACHE_RESULTATS', 256))
+"""
+@var TAILLE_CACHE_RESULTATS
+@brief Nombre maximal de résultats de recherche gardés en cache par moteur (0 désactive le cache).
+"""
+
+DUREE_CACHE_RESULTATS = float(os.getenv('DUREE_CACHE_RESULTATS', 600))
+"""
+@var DUREE_CACHE_RESULTATS
+@brief Durée de vie (en secondes) d'un résultat de recherche gardé en cache.
+"""
+
+TAILLE_CACHE_PAGINATION = int(os.getenv('TAILLE_CACHE_PAGINATION', 32))
+"""
+@var TAILLE_CACHE_PAGINATION
+@brief Nombre maximal de recherches paginées dont les candidats sont gardés par moteur (0 : recalcul à chaque page).
+"""
+
+FILS_SCORES = int(os.getenv('FILS_SCORES', 1))
+"""
+@var FILS_SCORES
+@brief Nombre de fils calculant en parallèle les scores d'un corpus en mode "csr", découpé en autant de blocs de documents.
+@details 1 : la matrice des poids est multipliée d'un seul bloc dans le fil de la recherche.
+"""
+
+TAILLE_FRAGMENT = int(os.getenv('TAILLE_FRAGMENT', 100000))
+"""
+@var TAILLE_FRAGMENT
+@brief Nombre de documents par fragment d'un index fragmenté (voir IndexFragmente).
+@details Seuls les documents d'un fragment sont gardés en mémoire pendant la construction.
+"""
+
+FRAGMENTS_OUVERTS = int(os.getenv('FRAGMENTS_OUVERTS', 4))
+"""
+@var FRAGMENTS_OUVERTS
+@brief Nombre maximal de fragments d'un index fragmenté ouverts en même temps par le moteur (voir MoteurFragmente).
+@details Au-delà, les fragments les moins récemment utilisés sont refermés. Une recherche n'ouvre que les fragments
+dont la borne des scores peut entrer dans les k meilleurs ; une requête présente dans plus de FRAGMENTS_OUVERTS
+fragments referme et rouvre des fragments à chaque recherche non mise en cache.
+"""
+
+SEGMENTS_PAR_NIVEAU = int(os.getenv('SEGMENTS_PAR_NIVEAU', 4))
+"""
+@var SEGMENTS_PAR_NIVEAU
+@brief Nombre de segments consécutifs de même niveau de taille fusionnés en un seul après un ajout de documents
+(voir IndexFragmente.segments_a_fusionner()).
+@details Un segment de n documents est au niveau floor(log(n) / log(SEGMENTS_PAR_NIVEAU)) ;
+les fragments complets (TAILLE_FRAGMENT documents ou plus) ne sont plus fusionnés.
+"""
+
+LIMITE_EXPANSION_JOKER = int(os.getenv('LIMITE_EXPANSION_JOKER', 50))
+"""
+@var LIMITE_EXPANSION_JOKER
+@brief Nombre maximal de mots du vocabulaire substitués à un mot de requête à jokers ("educat*") ou à un préfixe ("clim").
+@details Les mots retenus sont les plus fréquents en documents.
+"""
+
+LIMITE_CORRECTIONS = int(os.getenv('LIMITE_CORRECTIONS', 3))
+"""
+@var LIMITE_CORRECTIONS
+@brief Nombre maximal de mots du vocabulaire substitués à un mot de requête inconnu mal orthographié.
+@details Ce sont les mots à la plus petite distance d'édition (une ou deux fautes), les plus fréquents en documents d'abord.
+"""
+
+PENALITE_CORRECTION = float(os.getenv('PENALITE_CORRECTION', 0.5))
+"""
+@var PENALITE_CORRECTION
+@brief Facteur appliqué au poids d'un mot corrigé, une fois par faute corrigée.
+"""
@@ -7,6 +7,7 @@ def main():
     @details 
     - Lance la création des corpus de discours à partir de fichiers CSV.
     - Récupère les données Reddit et Arxiv pour différents thèmes.
+    - Regroupe tous les corpus dans l'index unifié.
     - Propose de stocker les informations des fichiers pickle (PKL) dans la base de données.
     """
     manager = CorpusMatriceManager()
@@ -16,6 +17,7 @@ def main():
     
     manager.creer_corpus_discours()
     manager.creer_corpus_reddit_arxiv()
+    manager.creer_corpus_unifie()
 
     reponse = input("Voulez-vous stocker les PKL dans la base de données ? (o/n) : ")
     if reponse.lower() == "o":
@@ -0,0 +1,950 @@
+import os
+import re
+import pickle
+import fnmatch
+import shutil
+import string
+import unicodedata
+import pytest
+import pandas as pd
+import numpy as np
+from app import StreamlitApp
+from src.RegistreMoteurs import RegistreMoteurs
+from src.RechercheFederee import RechercheFederee
+from src.SearchEngine import SearchEngine
+from src.CorpusMatriceManager import CorpusMatriceManager
+from src.CacheResultats import CacheResultats
+from src.GenerateurExtraits import GenerateurExtraits
+from src.Tokeniseur import Tokeniseur
+from src.Frequence import Frequence
+from src.MagasinDocuments import MagasinDocuments
+from src.MatriceCSR import MatriceCSR
+from src.MigrationMatrices import migrer_matrices
+from src.Vocabulaire import Vocabulaire
+from src.IndexCorrections import IndexCorrections
+from src.RequeteBooleenne import RequeteBooleenne
+from src.IndexInverse import IndexInverse
+from src.SegmentPostings import SegmentPostings
+from src.ScoresParBlocs import ScoresParBlocs
+from src.MoteurFragmente import MoteurFragmente
+from src.Corpus import Corpus
+from src.constantes import *
+from src.Utils import Utils
+from datetime import date
+
+
+# Tests pour RegistreMoteurs
+def test_registre_reutilise_moteur():
+    """
+    Teste que le registre renvoie le même moteur d'une requête à l'autre.
+    """
+    RegistreMoteurs.reset_instance()
+    registre = RegistreMoteurs()
+    moteur = registre.obtenir("RedditArxiveducation")
+    assert RegistreMoteurs().obtenir("RedditArxiveducation") is moteur, "Le moteur a été rechargé inutilement."
+    assert registre.chargements == 1
+
+
+def test_registre_recharge_si_fichier_modifie():
+    """
+    Teste le rechargement d'un corpus lorsque la date d'un de ses fichiers change.
+    """
+    RegistreMoteurs.reset_instance()
+    registre = RegistreMoteurs()
+    moteur = registre.obtenir("RedditArxiveducation")
+    chemin = moteur.chemins["ch_vocab"]
+    etat = os.stat(chemin)
+    try:
+        os.utime(chemin, ns=(etat.st_atime_ns, etat.st_mtime_ns + 1_000_000_000))
+        assert registre.obtenir("RedditArxiveducation") is not moteur, "Le moteur périmé n'a pas été rechargé."
+    finally:
+        os.utime(chemin, ns=(etat.st_atime_ns, etat.st_mtime_ns))
+
+
+def test_registre_eviction_lru():
+    """
+    Teste le déchargement du corpus le moins récemment utilisé au-delà du budget mémoire.
+    """
+    RegistreMoteurs.reset_instance()
+    registre = RegistreMoteurs(budget_memoire=1)
+    registre.obtenir("RedditArxiveducation")
+    registre.obtenir("RedditArxivhealth")
+    assert registre.corpus_charges() == ["RedditArxivhealth"], "Le corpus le plus ancien aurait dû être déchargé."
+    assert registre.evictions == 1
+    RegistreMoteurs.reset_instance()
+
+
+# Tests pour l'index inversé
+@pytest.mark.parametrize("nom_corpus", ["csvdiscours", "RedditArxivscience"])
+def test_parite_index_inverse_csr(nom_corpus):
+    """
+    Teste que l'index inversé donne exactement les mêmes classements que le produit matrice CSR x vecteur.
+    """
+    moteur_index = SearchEngine(nom_corpus, calcul_scores="index")
+    moteur_csr = SearchEngine(nom_corpus, calcul_scores="csr")
+    for requete in ["climate", "public college", "health care", "we are going", "the"]:
+        doc_ids_index, scores_index = moteur_index.calculer_scores(requete)
+        doc_ids_csr, scores_csr = moteur_csr.calculer_scores(requete)
+        assert np.array_equal(doc_ids_index, doc_ids_csr), f"Documents différents pour '{requete}'."
+        assert np.array_equal(scores_index, scores_csr), f"Scores différents pour '{requete}'."
+
+        resultats_index = moteur_index.search(requete, n_resultats=20)
+        resultats_csr = moteur_csr.search(requete, n_resultats=20)
+        assert resultats_index.equals(resultats_csr), f"Classements différents pour '{requete}'."
+
+
+# Tests pour la sélection des k meilleurs documents
+def test_selection_top_k_egalites():
+    """
+    Teste que la sélection partielle respecte l'ordre d'un tri stable (score décroissant, puis identifiant croissant).
+    """
+    doc_ids = np.arange(8)
+    scores = np.array([1.0, 3.0, 2.0, 3.0, 0.5, 2.0, 2.0, 3.0])
+    attendu = sorted(range(8), key=lambda i: scores[i], reverse=True)
+    for k in range(1, 10):
+        positions = Utils.selection_top_k(doc_ids, scores, k)
+        assert list(positions) == attendu[:k], f"Sélection incorrecte pour k={k}."
+
+
+# Tests pour les métadonnées en colonnes
+def test_masque_metadonnees_identique_filtre_python():
+    """
+    Teste que le masque NumPy auteur/dates retient les mêmes documents que le filtre Python document par document.
+    """
+    moteur = SearchEngine("csvdiscours")
+    for auteur, date_debut, date_fin in [("CLINTON", None, None), (None, date(2016, 1, 1), date(2016, 6, 30)),
+                                         ("TRUMP", "2016-03-01", None), ("inconnu", None, None)]:
+        masque = moteur.metadonnees.masque(auteur, date_debut, date_fin)
+        debut = date.fromisoformat(date_debut) if isinstance(date_debut, str) else date_debut
+        attendu = [
+            (not auteur or doc.auteur == auteur) and (not debut or doc.date >= debut) and (not date_fin or doc.date <= date_fin)
+            for doc in moteur.documents
+        ]
+        assert masque.tolist() == attendu, f"Masque incorrect pour {auteur}, {date_debut}, {date_fin}."
+
+
+# Tests pour l'index positionnel
+@pytest.mark.parametrize("nom_corpus", ["csvdiscours", "RedditArxivscience", "RedditArxivpolitics", "RedditArxivhealth",
+                                        "RedditArxiveducation", "RedditArxivtechnology", "RedditArxivclimatechange"])
+def test_index_positionnel_expression_exacte(nom_corpus):
+    """
+    Teste que l'index positionnel retrouve exactement les documents où `expression in texte`, sur les corpus livrés.
+    """
+    moteur = SearchEngine(nom_corpus)
+    textes = [doc.texte.lower() for doc in moteur.documents]
+    expressions = ["public college", "health care", "we are going to", "in the", "climate change"]
+    for i in range(0, len(textes), max(1, len(textes) // 15)):
+        mots = textes[i].split()
+        expressions += [" ".join(mots[j:j + 2]) for j in range(0, len(mots) - 1, 7)][:3]
+        expressions += [" ".join(mots[j:j + 3]) for j in range(3, len(mots) - 2, 11)][:2]
+
+    for expression in expressions:
+        mots = expression.split()
+        if len(mots) < 2 or any(mot not in moteur.vocab for mot in mots):
+            continue
+        attendu = [doc_id for doc_id, texte in enumerate(textes) if expression in texte]
+        obtenu = moteur.index_positionnel.documents_expression([(mot, moteur.vocab[mot]['id']) for mot in mots],
+                                                               moteur.vocab)
+        assert obtenu.tolist() == attendu, f"Documents différents pour l'expression '{expression}'."
+
+
+
+# Tests pour la pondération BM25
+def test_bm25_formule():
+    """
+    Teste les scores BM25 contre un calcul direct sur le texte des documents.
+    """
+    k1, b = 1.5, 0.6
+    moteur = SearchEngine("RedditArxivhealth", ponderation="bm25", k1=k1, b=b)
+    textes = [Utils.nettoyer_texte(doc.texte).lower().split() for doc in moteur.documents]
+    longueur_moyenne = np.mean([len(mots) for mots in textes])
+    n_docs = len(textes)
+
+    requete = "health care health"
+    attendu = np.zeros(n_docs)
+    for mot in requete.split():
+        df = moteur.vocab.frequences_documents[moteur.vocab.identifiant(mot)]
+        idf = np.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+        for doc_id, mots in enumerate(textes):
+            tf = mots.count(mot)
+            attendu[doc_id] += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * len(mots) / longueur_moyenne))
+
+    doc_ids, scores = moteur.calculer_scores(requete)
+    assert doc_ids.tolist() == np.flatnonzero(attendu > 0).tolist()
+    assert np.allclose(scores, attendu[doc_ids])
+    with pytest.raises(ValueError):
+        SearchEngine("RedditArxivhealth", ponderation="inconnue")
+
+
+def test_idf_precalcule_sans_corpus():
+    """
+    Teste que le vecteur de requête se calcule à partir de l'IDF précalculé, sans le corpus.
+    """
+    moteur = SearchEngine("RedditArxivhealth")
+    n_docs = moteur.mat_TF.shape[0]
+    assert moteur.idf["n_docs"] == n_docs and moteur.idf["idf"].dtype == np.float32
+
+    requete = "health care health"
+    attendu = {}
+    for mot in requete.split():
+        idf = np.log((n_docs + 1) / (1 + moteur.vocab.frequences_documents[moteur.vocab.identifiant(mot)])) + 1
+        attendu[moteur.vocab[mot]['id']] = requete.split().count(mot) * idf ** requete.split().count(mot)
+
+    moteur.corpus, moteur.documents = None, []
+    termes_ids, poids = moteur.termes_requete(requete)
+    assert termes_ids.tolist() == sorted(attendu)
+    assert np.allclose(poids, [attendu[terme_id] for terme_id in termes_ids], rtol=1e-6)
+
+
+# Tests pour le cache des résultats
+def test_cache_lru_et_expiration():
+    """
+    Teste l'éviction LRU, l'expiration et les compteurs du cache.
+    """
+    cache = CacheResultats(taille_max=2, duree_vie=None)
+    cache.stocker("a", 1)
+    cache.stocker("b", 2)
+    assert cache.obtenir("a") == 1
+    cache.stocker("c", 3)  # "b" est la moins récemment utilisée
+    assert cache.obtenir("b") is None
+    assert cache.obtenir("c") == 3
+    assert (cache.succes, cache.echecs) == (2, 1)
+
+    cache_expire = CacheResultats(taille_max=2, duree_vie=-1)
+    cache_expire.stocker("a", 1)
+    assert cache_expire.obtenir("a") is None and len(cache_expire) == 0
+
+
+def test_cache_search(monkeypatch):
+    """
+    Teste que search réutilise le résultat d'une requête normalisée et l'invalide quand la génération du corpus change,
+    sans relire la base tant que son fichier est inchangé.
+    """
+    moteur = SearchEngine("RedditArxiveducation")
+    moteur.cache = CacheResultats(taille_max=16)
+    lectures = []
+    generation_courante = moteur.generation_courante
+    monkeypatch.setattr(moteur, "generation_courante", lambda: lectures.append(1) or generation_courante())
+    premier = moteur.search("Higher Education", n_resultats=5)
+    premier["Score"] = 0  # le résultat renvoyé est une copie
+    second = moteur.search("higher education", n_resultats=5)
+    assert moteur.cache.succes == 1 and moteur.cache.echecs == 1
+    assert lectures == [], "La génération a été relue alors que la base n'a pas changé."
+    assert len(second) == 5 and second["Score"].gt(0).all()
+    moteur.search("higher education", n_resultats=10)
+    assert moteur.cache.echecs == 2
+
+    manager = CorpusMatriceManager()
+    try:
+        manager.cursor.execute("UPDATE corpus SET generation = generation + 1 WHERE nom_corpus = 'RedditArxiveducation'")
+        manager.conn.commit()
+        moteur.search("higher education", n_resultats=5)
+        assert moteur.cache.echecs == 3, "Le cache aurait dû être invalidé par la nouvelle génération."
+        assert lectures == [1]
+    finally:
+        manager.cursor.execute("UPDATE corpus SET generation = generation - 1 WHERE nom_corpus = 'RedditArxiveducation'")
+        manager.conn.commit()
+        manager.fermer_connexion()
+
+
+# Tests pour les extraits
+def test_extrait_meilleur_groupe_et_surlignages():
+    """
+    Teste que l'extrait retient le groupe contenant le plus de mots de la requête et surligne leurs occurrences.
+    """
+    texte = " ".join(["health"] + ["mot"] * 200 + ["good", "health", "care", "for", "all"] + ["fin"] * 50)
+    extrait, surlignages = GenerateurExtraits("health care", taille_contexte=5).extraire(texte)
+    assert "health care" in extrait
+    assert len(extrait.split()) <= 2 * 5 + 2
+    assert [extrait[debut:fin] for debut, fin in surlignages] == ["health care"]
+
+    extrait, surlignages = GenerateurExtraits("care", taille_contexte=2).extraire("one two three careful four five six")
+    assert extrait == "two three careful four five"
+    assert [extrait[debut:fin] for debut, fin in surlignages] == ["care"]
+    assert GenerateurExtraits("absent").extraire("texte sans le mot") == (GenerateurExtraits.EXTRAIT_INDISPONIBLE, [])
+
+
+def test_extrait_texte_long():
+    """
+    Teste l'extrait d'un mot situé au milieu d'un très long texte.
+    """
+    texte = "mot " * 200000 + "cible " + "mot " * 200000
+    extrait, surlignages = GenerateurExtraits("cible", taille_contexte=3).extraire(texte.strip())
+    assert extrait == "mot mot mot cible mot mot mot"
+    assert surlignages == [(12, 17)]
+
+# Tests pour la recherche par lot
+def test_search_batch_identique_search():
+    """
+    Teste que search_batch renvoie, pour chaque requête, les mêmes documents que search.
+    """
+    moteur = SearchEngine("csvdiscours")
+    requetes = ["climate", "public college", "health care", "motinconnu", "we are going", "jobs"]
+    filtres = {"auteur": "CLINTON", "date_debut": date(2016, 1, 1)}
+    resultats = moteur.search_batch(requetes, k=10, filters=filtres)
+    assert len(resultats) == len(requetes)
+    for requete, (doc_ids, scores) in zip(requetes, resultats):
+        attendu = moteur.search(requete, n_resultats=10, **filtres)
+        urls = [moteur.documents[doc_id].url for doc_id in doc_ids]
+        assert urls == attendu["URL"].tolist(), f"Documents différents pour '{requete}'."
+        assert np.allclose(scores, attendu["Score"].to_numpy(dtype=float)), f"Scores différents pour '{requete}'."
+
+
+
+def test_moteur_independant_des_corpus_charges_ensuite():
+    """
+    Teste qu'un moteur conservé garde ses scores après le chargement d'un autre corpus (CorpusSingleton partagé).
+    """
+    moteur = SearchEngine("RedditArxivscience")
+    attendu = moteur.search("climate", n_resultats=5)
+    SearchEngine("csvdiscours")
+    obtenu = moteur.search("climate", n_resultats=5)
+    assert obtenu["Score"].tolist() == attendu["Score"].tolist()
+
+# Tests pour la recherche fédérée
+def test_recherche_federee_top_k_global():
+    """
+    Teste que la recherche fédérée renvoie les résultats de chaque corpus et leur fusion globale.
+    """
+    RegistreMoteurs.reset_instance()
+    noms_corpus = ["csvdiscours", "RedditArxivscience", "RedditArxivhealth"]
+    federation = RechercheFederee().rechercher(noms_corpus, "health", n_resultats=10)
+
+    assert list(federation["resultats_par_corpus"]) == noms_corpus
+    assert set(federation["durees"]) == set(noms_corpus)
+    assert federation["expires"] == [] and federation["erreurs"] == {}
+
+    tous = []
+    for nom_corpus in noms_corpus:
+        attendu = RegistreMoteurs().obtenir(nom_corpus).search("health", n_resultats=10)
+        assert federation["resultats_par_corpus"][nom_corpus]["URL"].tolist() == attendu["URL"].tolist()
+        tous += [(score, nom_corpus) for score in attendu["Score"]]
+
+    top_k = federation["top_k"]
+    assert len(top_k) == min(10, len(tous))
+    assert top_k["Score"].tolist() == sorted((score for score, _ in tous), reverse=True)[:10]
+    assert set(top_k["Corpus"]) <= set(noms_corpus)
+
+
+def test_recherche_federee_processus():
+    """
+    Teste que le mode processus renvoie les mêmes résultats que le mode fils.
+    """
+    noms_corpus = ["csvdiscours", "RedditArxivscience"]
+    try:
+        par_fils = RechercheFederee(mode="fils").rechercher(noms_corpus, "climate", n_resultats=5)
+        par_processus = RechercheFederee(mode="processus", delai_max=120).rechercher(noms_corpus, "climate", n_resultats=5)
+    finally:
+        RechercheFederee.arreter()
+    assert par_processus["expires"] == [] and par_processus["erreurs"] == {}
+    assert par_processus["top_k"]["URL"].tolist() == par_fils["top_k"]["URL"].tolist()
+    with pytest.raises(ValueError):
+        RechercheFederee(mode="inconnu")
+
+
+# Tests pour l'index unifié
+@pytest.fixture(scope="module")
+def moteur_unifie():
+    """
+    Construit l'index unifié pour les tests, puis supprime ses fichiers et son entrée en base.
+    """
+    manager = CorpusMatriceManager()
+    manager.creer_corpus_unifie()
+    yield SearchEngine(NOM_CORPUS_UNIFIE)
+    manager.cursor.execute("DELETE FROM corpus WHERE nom_corpus = ?", (NOM_CORPUS_UNIFIE,))
+    manager.conn.commit()
+    manager.fermer_connexion()
+    for fichier in os.listdir(DATA_DIR_PKL):
+        if os.path.splitext(fichier)[0].endswith(f"_{NOM_CORPUS_UNIFIE}"):
+            os.remove(os.path.join(DATA_DIR_PKL, fichier))
+
+
+@pytest.mark.parametrize("nom_corpus", ["csvdiscours", "RedditArxivscience", "RedditArxivhealth"])
+def test_index_unifie_facette_corpus(moteur_unifie, nom_corpus):
+    """
+    Teste que le filtre par corpus de l'index unifié retrouve les documents du moteur du corpus.
+    """
+    moteur = SearchEngine(nom_corpus)
+    urls_corpus = {doc.url for doc in moteur.documents}
+    for requete in ["climate", "health care", "the"]:
+        doc_ids, _ = moteur.calculer_scores(requete)
+        doc_ids_unifie, _ = moteur_unifie.calculer_scores(requete)
+        masque = moteur_unifie.metadonnees.masque(noms_corpus=[nom_corpus])
+        assert masque[doc_ids_unifie].sum() == len(doc_ids), f"Candidats différents pour '{requete}'."
+
+        resultats = moteur_unifie.search(requete, n_resultats=20, noms_corpus=[nom_corpus])
+        assert set(resultats["Corpus"]) <= {nom_corpus}
+        assert set(resultats["URL"]) <= urls_corpus
+
+
+def test_index_unifie_facettes_source_theme(moteur_unifie):
+    """
+    Teste les facettes source et thème de l'index unifié.
+    """
+    metadonnees = moteur_unifie.metadonnees
+    assert set(metadonnees.sources) == {"csv", "RedditArxiv"}
+    assert metadonnees.masque(sources=["csv"]).sum() == metadonnees.masque(noms_corpus=["csvdiscours"]).sum()
+    assert metadonnees.masque(themes=["science"]).sum() == metadonnees.masque(noms_corpus=["RedditArxivscience"]).sum()
+    assert not metadonnees.masque(noms_corpus=[]).any()
+
+
+# Tests pour Tokeniseur
+def nettoyer_texte_reference(texte):
+    """
+    Ancien nettoyage caractère par caractère, référence du tokeniseur.
+    """
+    texte = texte.lower()
+    texte = ''.join(c for c in unicodedata.normalize('NFD', texte) if unicodedata.category(c) != 'Mn')
+    texte = re.sub(r"(\w)'(\w)", r"\1\2", texte)
+    return ' '.join(texte.translate(str.maketrans('', '', string.punctuation)).split())
+
+
+def test_tokeniseur_identique_ancien_nettoyage():
+    """
+    Teste que le tokeniseur reproduit l'ancien nettoyage (textes, lots, flux) et la normalisation des statistiques.
+    """
+    textes = list(pd.read_csv(CSV_DISCOURS_PATH, sep='\t')['text'][:20]) + [
+        "Don't   panic: l'IA à l'École, ÇA ; «naïve» café", "a'b'c", "", "  \t\n", "Straße İ ﬁ", "x\x00y", "3D_printing ٣"]
+    for texte in textes:
+        assert Tokeniseur.normaliser(texte) == nettoyer_texte_reference(texte), f"Différence sur {texte[:40]!r}"
+        attendu = re.sub(r'\s+', ' ', re.sub(r'\d+', '', re.sub(r'[^\w\s]', ' ', texte.lower()))).strip()
+        assert Frequence.nettoyer_texte(texte) == attendu
+    assert Tokeniseur.normaliser_lot(textes) == [Tokeniseur.normaliser(texte) for texte in textes]
+    assert list(Tokeniseur.flux_tokens(iter(textes), taille_lot=3)) == [Tokeniseur.tokens(texte) for texte in textes]
+
+
+def test_requete_normalisee_comme_index():
+    """
+    Teste que la requête passe par le même découpage que l'index (majuscules, accents, ponctuation).
+    """
+    moteur = SearchEngine("csvdiscours")
+    attendu = moteur.search("health care", n_resultats=10)
+    resultats = moteur.search("Health, CARE!", n_resultats=10)
+    assert list(resultats["URL"]) == list(attendu["URL"])
+    assert list(moteur.search("Éducation", n_resultats=5)["URL"]) == list(moteur.search("education", n_resultats=5)["URL"])
+
+
+# Tests pour MagasinDocuments
+def test_magasin_documents_acces_direct(tmp_path):
+    """
+    Teste la relecture des documents d'un magasin, un par un, dans l'ordre des lignes de la matrice.
+    """
+    moteur = SearchEngine("RedditArxivhealth")
+    chemin = str(tmp_path / "documents.bin")
+    MagasinDocuments.ecrire(chemin, moteur.documents, moteur.documents.origines())
+    magasin = MagasinDocuments(chemin)
+
+    assert len(magasin) == len(moteur.documents)
+    assert magasin.origines() == moteur.documents.origines()
+    for doc_id in [0, np.int32(7), len(magasin) - 1]:
+        attendu, doc = moteur.documents[doc_id], magasin[doc_id]
+        assert (doc.titre, doc.auteur, doc.date, doc.url, doc.texte, doc.getType()) == \
+            (attendu.titre, attendu.auteur, attendu.date, attendu.url, attendu.texte, attendu.getType())
+    with pytest.raises(IndexError):
+        magasin[len(magasin)]
+
+
+def test_moteur_sans_pickle_du_corpus():
+    """
+    Teste qu'un moteur dont le magasin de documents existe ne charge pas le corpus et retourne les mêmes résultats.
+    """
+    moteur = SearchEngine("RedditArxiveducation")
+    chemin = moteur.chemins["ch_documents"]
+    MagasinDocuments.ecrire(chemin, moteur.documents, moteur.documents.origines())
+    try:
+        moteur_magasin = SearchEngine("RedditArxiveducation")
+        assert moteur_magasin.corpus is None
+        assert moteur_magasin.empreinte_memoire() < moteur.empreinte_memoire()
+        for requete in ["education", "higher education", "students"]:
+            attendu = moteur.search(requete, n_resultats=10)
+            resultats = moteur_magasin.search(requete, n_resultats=10)
+            assert resultats[["Titre", "URL", "Extrait", "Score"]].equals(attendu[["Titre", "URL", "Extrait", "Score"]])
+    finally:
+        os.remove(chemin)
+
+
+# Tests pour MatriceCSR
+def test_migration_matrices_csr(tmp_path, monkeypatch):
+    """
+    Teste la migration des matrices pickle vers le format projeté et la recherche sur les matrices migrées.
+    """
+    db_copie = str(tmp_path / "corpus.db")
+    shutil.copy(DB_PATH, db_copie)
+    moteur = SearchEngine("RedditArxivhealth")
+    if moteur.chemins["ch_TF"].endswith(MatriceCSR.EXTENSION):
+        pytest.skip("Les matrices de la base sont déjà migrées.")
+    migrees = migrer_matrices(db_copie, noms_corpus=["RedditArxivhealth"])
+    try:
+        assert [nom for nom, _, _ in migrees] == ["RedditArxivhealth", "RedditArxivhealth"]
+        monkeypatch.setattr("src.SearchEngine.DB_PATH", db_copie)
+        moteur_csr = SearchEngine("RedditArxivhealth")
+        assert moteur_csr.chemins["ch_TF"].endswith(MatriceCSR.EXTENSION)
+        assert not moteur_csr.mat_TFxIDF.data.flags.writeable, "Les tableaux ont été copiés au lieu d'être projetés."
+        assert (moteur_csr.mat_TF != moteur.mat_TF).nnz == 0
+        for requete in ["health care", "vaccine", "the"]:
+            attendu = moteur.search(requete, n_resultats=10)
+            assert moteur_csr.search(requete, n_resultats=10)[["URL", "Score"]].equals(attendu[["URL", "Score"]])
+        assert migrer_matrices(db_copie, noms_corpus=["RedditArxivhealth"]) == []
+    finally:
+        for _, _, chemin_natif in migrees:
+            os.remove(chemin_natif)
+
+
+@pytest.mark.parametrize("ponderation", ["tfidf", "bm25"])
+def test_index_inverse_projete(ponderation):
+    """
+    Teste qu'un index inversé enregistré est projeté au chargement (sans copie) et donne les mêmes résultats
+    que l'index construit en mémoire ; un index BM25 d'autres paramètres est ignoré.
+    """
+    moteur = SearchEngine("RedditArxivhealth", ponderation=ponderation)
+    chemin = moteur.chemins["ch_index_bm25" if ponderation == "bm25" else "ch_index"]
+    parametres = {"k1": moteur.k1, "b": moteur.b} if ponderation == "bm25" else {}
+    IndexInverse.ecrire(chemin, moteur.mat_poids, **parametres)
+    try:
+        projete = SearchEngine("RedditArxivhealth", ponderation=ponderation)
+        assert not projete.index.poids.flags.writeable, "Les postings ont été copiés au lieu d'être projetés."
+        for attribut in ("pointeurs", "docs", "poids", "maximums"):
+            assert np.array_equal(getattr(projete.index, attribut), getattr(moteur.index, attribut)), attribut
+        for requete in ["health care", "vaccine", "the", "vacc*", "health AND NOT care"]:
+            assert projete.search(requete, n_resultats=10).equals(moteur.search(requete, n_resultats=10)), requete
+        assert projete.search_batch(["health care", "the"]) is not None
+        csr = SearchEngine("RedditArxivhealth", calcul_scores="csr", ponderation=ponderation)
+        assert np.array_equal(csr.calculer_scores("health care")[1], moteur.calculer_scores("health care")[1])
+        if ponderation == "bm25":
+            assert SearchEngine("RedditArxivhealth", ponderation="bm25", k1=1.5).index.poids.flags.writeable
+    finally:
+        os.remove(chemin)
+        os.remove(IndexInverse.chemin_maximums(chemin))
+
+
+# Tests pour Vocabulaire
+def test_vocabulaire_compact_identique_dictionnaire():
+    """
+    Teste que le vocabulaire compact donne les mêmes identifiants et fréquences que l'ancien dictionnaire.
+    """
+    vocab = {"santé": {'id': 2, 'freq': 7, 'len': 5}, "care": {'id': 0, 'freq': 3, 'len': 4},
+             "health": {'id': 1, 'freq': 9, 'len': 6}, "zoé": {'id': 3, 'freq': 1, 'len': 3}}
+    frequence_mot = {"santé": 2, "care": 3, "health": 4, "zoé": 1}
+    compact = Vocabulaire.depuis_dict(vocab, frequence_mot)
+
+    assert len(compact) == len(vocab)
+    assert list(compact) == ["care", "health", "santé", "zoé"]
+    assert compact.mots_tries() == sorted(vocab)
+    for mot, valeurs in vocab.items():
+        assert mot in compact
+        assert compact[mot] == valeurs
+        assert compact.mot(valeurs['id']) == mot
+        assert compact.frequences_documents[valeurs['id']] == frequence_mot[mot]
+    for absent in ["", "sante", "healt", "healthy", "zzz", "a"]:
+        assert absent not in compact and compact.identifiant(absent) == -1
+        with pytest.raises(KeyError):
+            compact[absent]
+    assert list(compact.identifiants(["zoé", "absent", "care"])) == [3, -1, 0]
+    assert len(Vocabulaire([])) == 0 and "mot" not in Vocabulaire([])
+
+
+def test_vocabulaire_moteur_identique_pickle():
+    """
+    Teste le vocabulaire compact d'un moteur face aux pickles du vocabulaire et des fréquences documentaires,
+    et que son propre pickle, sans tableaux déduits, est plus petit que celui de l'ancien dictionnaire.
+    """
+    moteur = SearchEngine("RedditArxivhealth")
+    with open(moteur.chemins["ch_frequence"], 'rb') as f:
+        frequence_mot = pickle.load(f)
+    assert len(moteur.vocab) == len(frequence_mot) == moteur.mat_TF.shape[1]
+    for terme_id, mot in enumerate(moteur.vocab.mots_par_id()):
+        assert moteur.vocab.identifiant(mot) == terme_id
+        assert moteur.vocab.frequences_documents[terme_id] == frequence_mot[mot]
+
+    compact = Vocabulaire(moteur.vocab.mots_par_id(), moteur.vocab.frequences, moteur.vocab.frequences_documents)
+    octets = pickle.dumps(compact)
+    assert len(octets) < 0.6 * os.path.getsize(moteur.chemins["ch_vocab"])
+    recharge = pickle.loads(octets)
+    for attribut in ("debuts", "rangs", "ids_tries", "frequences", "longueurs"):
+        assert np.array_equal(getattr(recharge, attribut), getattr(compact, attribut)), attribut
+
+
+def test_vocabulaire_developpement_jokers():
+    """
+    Teste le développement des motifs à jokers face à un filtrage de tout le vocabulaire, et la limite par fréquence documentaire.
+    """
+    vocab = SearchEngine("csvdiscours").vocab
+    mots = vocab.mots_par_id()
+    for motif in ["educat*", "c*mate", "*tion", "*a*tion", "**ing", "e*u*n", "health", "zzzq*", "*zzzq"]:
+        attendu = {terme_id for terme_id, mot in enumerate(mots) if fnmatch.fnmatchcase(mot, motif)}
+        assert set(vocab.developper(motif).tolist()) == attendu
+    for motif in ["*", "*ati*"]:
+        with pytest.raises(ValueError):
+            vocab.developper(motif)
+    assert pickle.loads(pickle.dumps(vocab))._retournes is None
+    limites = vocab.developper("*tion", limite=5)
+    frequences = np.sort(vocab.frequences_documents[vocab.developper("*tion")])[::-1]
+    assert len(limites) == 5 and list(vocab.frequences_documents[limites]) == list(frequences[:5])
+
+
+def test_recherche_jokers_ou_pondere():
+    """
+    Teste qu'un joker ou un préfixe absent est cherché comme un OU pondéré des mots développés.
+    """
+    moteur = SearchEngine("csvdiscours")
+    developpement = moteur.vocab.developper("educat*", moteur.limite_expansion)
+    assert len(developpement) > 1
+    doc_ids, scores = moteur.calculer_scores("educat*")
+    attendu = moteur.mat_TFxIDF[:, developpement] @ moteur.idf["idf"][developpement].astype(np.float64)
+    assert np.allclose(scores, attendu[doc_ids]) and np.count_nonzero(attendu) == len(doc_ids)
+
+    assert moteur.mots_absents("clim") == [] and len(moteur.search("clim", n_resultats=5)) == 5
+    assert list(moteur.termes_mot("health")) == [moteur.vocab.identifiant("health")]
+    for doc_id, _ in moteur.meilleurs_documents(*moteur.filtrer_candidats("climate chan*", *moteur.calculer_scores("climate chan*"))[:2], 10):
+        assert "climate chan" in moteur.documents[doc_id].texte
+    assert moteur.search("xyzzyq*").empty
+
+
+
+# Tests pour IndexCorrections
+def distance_edition_reference(a, b):
+    """
+    Distance d'édition avec transpositions (programmation dynamique complète), référence des tests.
+    """
+    d = [[i + j if i * j == 0 else 0 for j in range(len(b) + 1)] for i in range(len(a) + 1)]
+    for i in range(1, len(a) + 1):
+        for j in range(1, len(b) + 1):
+            d[i][j] = min(d[i - 1][j] + 1, d[i][j - 1] + 1, d[i - 1][j - 1] + (a[i - 1] != b[j - 1]))
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                d[i][j] = min(d[i][j], d[i - 2][j - 2] + 1)
+    return d[-1][-1]
+
+
+def test_corrections_identiques_parcours_complet():
+    """
+    Teste la distance d'édition et les corrections de l'index des suppressions face à un parcours de tout le vocabulaire.
+    """
+    generateur = np.random.default_rng(0)
+    for _ in range(2000):
+        a, b = ("".join(generateur.choice(list("abcé"), size=generateur.integers(0, 7))) for _ in range(2))
+        assert IndexCorrections.distance_edition(a, b, 10) == distance_edition_reference(a, b)
+
+    vocab = SearchEngine("RedditArxivhealth").vocab
+    corrections = IndexCorrections(vocab)
+    mots = vocab.mots_par_id()
+    for mot in ["helth", "vacine", "goverment", "peple", "hospitl", "xyzzyqw"]:
+        maximum = corrections.distance_autorisee(mot)
+        distances = np.array([distance_edition_reference(mot, autre) for autre in mots])
+        distance = distances.min() if distances.min() <= maximum else 0
+        attendu = set(np.flatnonzero(distances == distance).tolist()) if distance else set()
+        ids, obtenue = corrections.corriger(mot, vocab)
+        assert (set(ids.tolist()), obtenue) == (attendu, distance)
+
+
+def test_recherche_tolerante_fautes():
+    """
+    Teste qu'un mot mal orthographié est remplacé par sa correction, avec une pénalité, et proposé en suggestion.
+    """
+    moteur = SearchEngine("csvdiscours")
+    assert moteur.mots_absents("helth care") == []
+    assert moteur.suggestion("helth care") == "health care" and moteur.suggestion("health care") is None
+    termes_ids, poids = moteur.termes_requete("helth")
+    attendus_ids, attendus_poids = moteur.termes_requete("health")
+    assert list(termes_ids) == list(attendus_ids) and np.allclose(poids, moteur.penalite_correction * attendus_poids)
+    # Mêmes documents candidats ; seul le classement change, le mot corrigé pesant moins
+    assert list(moteur.calculer_scores("helth care")[0]) == list(moteur.calculer_scores("health care")[0])
+    assert len(moteur.search("helth care", n_resultats=10)) == 10
+    assert moteur.search("xyzzyqw").empty
+
+
+
+# Tests pour RequeteBooleenne
+def test_requete_booleenne_analyse():
+    """
+    Teste l'arbre des requêtes booléennes (priorités, AND implicite, normalisation des mots) et le rejet des requêtes mal formées.
+    """
+    assert RequeteBooleenne("Climate AND NOT (politics OR Élection)").arbre == \
+        ("et", (("mot", "climate"), ("non", ("ou", (("mot", "politics"), ("mot", "election"))))))
+    assert RequeteBooleenne("a NOT b OR c").arbre == ("ou", (("et", (("mot", "a"), ("non", ("mot", "b")))), ("mot", "c")))
+    assert RequeteBooleenne("(educat* OR helth) NOT x").mots_positifs() == ["educat*", "helth"]
+    assert not RequeteBooleenne.est_booleenne("climate and not politics")
+    for invalide in ["a OR", "(a", "a )", "NOT", "AND b"]:
+        with pytest.raises(ValueError):
+            RequeteBooleenne(invalide)
+
+
+def test_requete_booleenne_identique_ensembles_python():
+    """
+    Teste les documents d'une requête booléenne face aux opérations d'ensembles Python sur les mots des documents,
+    ainsi que leurs scores et les filtres.
+    """
+    moteur = SearchEngine("RedditArxivhealth")
+    mots_docs = [set(doc.texte.split()) for doc in moteur.documents]
+    tous = set(range(len(mots_docs)))
+    docs = lambda mot: {doc_id for doc_id, mots in enumerate(mots_docs) if mot in mots}
+    cas = {
+        "health AND NOT vaccine": docs("health") - docs("vaccine"),
+        "(covid OR vaccine OR study) AND NOT (mask OR cancer)": (docs("covid") | docs("vaccine") | docs("study")) - docs("mask") - docs("cancer"),
+        "NOT health": tous - docs("health"),
+        "health (care OR insurance) NOT covid": docs("health") & (docs("care") | docs("insurance")) - docs("covid"),
+        "mental OR NOT (health AND care)": docs("mental") | (tous - (docs("health") & docs("care"))),
+    }
+    for texte, attendu in cas.items():
+        requete = RequeteBooleenne(texte)
+        assert all(mot in moteur.vocab for mot, _ in requete.mots())  # pas de développement en préfixe
+        doc_ids, scores = moteur.calculer_scores_booleens(requete)
+        assert set(doc_ids.tolist()) == attendu and list(doc_ids) == sorted(attendu), texte
+        ids_positifs, scores_positifs = moteur.calculer_scores(" ".join(requete.mots_positifs()))
+        references = dict(zip(ids_positifs.tolist(), scores_positifs))
+        assert np.allclose(scores, [references.get(doc_id, 0.0) for doc_id in doc_ids.tolist()])
+
+    resultats = moteur.search("health AND NOT vaccine", n_resultats=50, date_debut="2015-01-01")
+    assert len(resultats) > 0 and (pd.to_datetime(resultats["Date"]) >= pd.Timestamp("2015-01-01")).all()
+    doc_ids, scores = moteur.calculer_scores_booleens(RequeteBooleenne("health AND NOT vaccine"))
+    meilleurs = doc_ids[Utils.selection_top_k(doc_ids, scores, 10)]
+    assert list(moteur.search_batch(["health AND NOT vaccine"], k=10)[0][0]) == list(meilleurs)
+
+
+# Tests pour la pagination
+def test_pagination_identique_search():
+    """
+    Teste que les pages successives d'une recherche, servies par le tampon des candidats ou recalculées après son
+    éviction, reproduisent l'ordre de search() avec les filtres, et que le curseur est opaque et vérifié.
+    """
+    moteur = SearchEngine("RedditArxivpolitics")
+    for requete, filtres in [("election", {}), ("vot*", {}), ("policy", {"date_debut": "2015-01-01"}),
+                             ("government AND NOT trump", {})]:
+        reference = moteur.search(requete, n_resultats=10_000, **filtres)
+        assert len(reference) > 0
+        pages, curseur = [], None
+        page, curseur = moteur.search_page(requete, taille_page=3, **filtres)
+        pages.append(page)
+        while curseur is not None:
+            if len(pages) == 3:
+                moteur.tampons.vider()  # la suite est recalculée à partir du curseur
+            assert requete not in curseur
+            page, curseur = moteur.search_page(taille_page=3, curseur=curseur)
+            assert 0 < len(page) <= 3
+            pages.append(page)
+        resultats = pd.concat(pages, ignore_index=True)
+        assert len(pages) == -(-len(reference) // 3), requete
+        assert list(resultats["URL"]) == list(reference["URL"]), requete
+        assert np.allclose(resultats["Score"].astype(float), reference["Score"].astype(float))
+
+    assert moteur.search_page("xyzzyqw")[1] is None
+    with pytest.raises(ValueError):
+        moteur.search_page(curseur="pas-un-curseur")
+
+
+# Tests pour l'élagage MaxScore
+@pytest.mark.parametrize("ponderation", ["tfidf", "bm25"])
+def test_elagage_maxscore_identique_exhaustif(ponderation):
+    """
+    Teste que l'élagage MaxScore donne les mêmes k meilleurs documents et les mêmes scores (au bit près)
+    que le calcul exhaustif, avec et sans filtre, et que les mots fréquents ne sont plus parcourus.
+    """
+    moteur = SearchEngine("csvdiscours", ponderation=ponderation)
+    generateur = np.random.default_rng(0)
+    frequents = np.argsort(-np.diff(moteur.index.pointeurs))[:30]
+    for essai in range(200):
+        termes_ids = np.unique(np.concatenate([generateur.choice(frequents, generateur.integers(1, 3)),
+                                               generateur.integers(0, len(moteur.vocab), generateur.integers(1, 4))]))
+        poids = generateur.random(len(termes_ids)) + 0.1
+        k = int(generateur.choice([1, 5, 20, 50]))
+        masque = generateur.random(moteur.index.n_docs) < 0.5 if essai % 3 == 0 else None
+        resultats = []
+        for doc_ids, scores in [moteur.index.scorer(termes_ids, poids),
+                                moteur.index.scorer_top_k(termes_ids, poids, k, masque)]:
+            retenus = (scores > 0) & (masque[doc_ids] if masque is not None else True)
+            doc_ids, scores = doc_ids[retenus], scores[retenus]
+            meilleurs = Utils.selection_top_k(doc_ids, scores, k)
+            resultats.append((doc_ids[meilleurs].tolist(), scores[meilleurs].tolist()))
+        assert resultats[0] == resultats[1], (termes_ids, k)
+
+    assert len(moteur.calculer_scores("the climate", k=10)[0]) < len(moteur.calculer_scores("the climate")[0]) / 10
+    ou_pondere = moteur.search("the climate", n_resultats=10, expression_exacte=False)
+    assert list(ou_pondere["URL"]) == list(moteur.search("climate the", n_resultats=10, expression_exacte=False)["URL"])
+    assert len(ou_pondere) == 10 and len(moteur.search("the climate", n_resultats=10)) < 10
+
+
+@pytest.mark.parametrize("ponderation", ["tfidf", "bm25"])
+def test_segment_postings_identique_index(ponderation):
+    """
+    Teste que le segment compressé restitue exactement les postings de la matrice TF, après écriture et projection,
+    que le moteur "compresse" l'ouvre sans charger de matrice et donne les mêmes scores (au bit près)
+    que l'index inversé, avec des bornes d'élagage lues dans le segment.
+    """
+    moteur = SearchEngine("csvdiscours", ponderation=ponderation)
+    chemin = moteur.chemins["ch_postings"]
+    # Fichiers écrits par la construction des matrices : le mode "compresse" n'a besoin que d'eux
+    annexes = {moteur.chemins["ch_longueurs"]: moteur.longueurs, moteur.chemins["ch_idf"]: moteur.idf}
+    annexes = {chemin_annexe: annexe for chemin_annexe, annexe in annexes.items() if not os.path.exists(chemin_annexe)}
+    for chemin_annexe, annexe in annexes.items():
+        with open(chemin_annexe, 'wb') as f:
+            pickle.dump(annexe, f)
+    SegmentPostings.depuis_matrice(moteur.mat_TF).ecrire(chemin)
+    try:
+        segment = SegmentPostings.ouvrir(chemin)
+        assert segment.octets() < moteur.mat_TF.data.nbytes
+
+        reference = moteur.mat_TF.tocsc()
+        reference.sort_indices()
+        docs, tf = segment.decoder(np.arange(segment.n_termes))
+        assert np.array_equal(segment.pointeurs, reference.indptr)
+        assert np.array_equal(docs, reference.indices) and np.array_equal(tf, reference.data)
+
+        compresse = SearchEngine("csvdiscours", calcul_scores="compresse", ponderation=ponderation)
+        assert compresse.mat_TF is None and compresse.mat_TFxIDF is None and compresse.mat_poids is None
+        assert compresse.empreinte_memoire() < moteur.empreinte_memoire()
+        if ponderation == "bm25":
+            assert np.all(compresse.index.maximums >= moteur.index.maximums)
+        else:
+            assert np.array_equal(compresse.index.maximums, moteur.index.maximums)
+
+        generateur = np.random.default_rng(1)
+        for _ in range(50):
+            termes_ids = np.unique(generateur.integers(0, len(moteur.vocab), generateur.integers(1, 5)))
+            poids = generateur.random(len(termes_ids)) + 0.1
+            attendu, obtenu = moteur.index.scorer(termes_ids, poids), compresse.index.scorer(termes_ids, poids)
+            assert np.array_equal(attendu[0], obtenu[0]) and np.array_equal(attendu[1], obtenu[1])
+            meilleurs = []
+            for doc_ids, scores in [moteur.index.scorer_top_k(termes_ids, poids, 10),
+                                    compresse.index.scorer_top_k(termes_ids, poids, 10)]:
+                retenus = Utils.selection_top_k(doc_ids, scores, 10)
+                meilleurs.append((doc_ids[retenus].tolist(), scores[retenus].tolist()))
+            assert meilleurs[0] == meilleurs[1], termes_ids
+        for requete in ["climate", "health care", "educat*", "government AND NOT trump"]:
+            assert moteur.search(requete).equals(compresse.search(requete))
+    finally:
+        for chemin_annexe in [chemin, *annexes]:
+            os.remove(chemin_annexe)
+
+
+def test_scores_par_blocs_identiques_sequentiel():
+    """
+    Teste que le calcul des scores par blocs de documents en parallèle donne les mêmes résultats
+    (documents, scores au bit près, pages) que le produit de toute la matrice et que l'index inversé.
+    """
+    sequentiel = SearchEngine("csvdiscours", calcul_scores="csr")
+    parallele = SearchEngine("csvdiscours", calcul_scores="csr", n_workers=3)
+    index = SearchEngine("csvdiscours")
+    assert len(parallele.blocs) == 3 and parallele.blocs.blocs[0][0] == 0
+    assert sum(bloc.shape[0] for _, bloc in parallele.blocs.blocs) == parallele.mat_poids.shape[0]
+
+    vecteur = parallele.vecteur_aligne_matrice("health care")
+    doc_ids, scores = parallele.blocs.scorer(vecteur, n_workers=3)
+    attendu = sequentiel.mat_poids.dot(vecteur)
+    assert np.array_equal(doc_ids, np.flatnonzero(attendu > 0)) and np.array_equal(scores, attendu[doc_ids])
+
+    try:
+        for requete, filtres in [("climate", {}), ("health care", {}), ("the", {"date_debut": "2015-01-01"}),
+                                 ("educat*", {}), ("we are going", {"expression_exacte": False}),
+                                 ("public  college", {})]:
+            attendu = sequentiel.search(requete, n_resultats=15, **filtres)
+            assert attendu.equals(parallele.search(requete, n_resultats=15, **filtres)), requete
+            assert list(attendu["URL"]) == list(index.search(requete, n_resultats=15, **filtres)["URL"])
+        assert sequentiel.search_page("jobs", 7, None)[0].equals(parallele.search_page("jobs", 7, None)[0])
+    finally:
+        ScoresParBlocs.arreter()
+
+
+def test_index_fragmente_identique_index_complet(tmp_path, monkeypatch):
+    """
+    Teste qu'un index construit par fragments, ouverts à la demande, donne les mêmes résultats
+    que l'index du corpus construit d'un seul tenant (TF-IDF et BM25), sans ouvrir les fragments
+    dont la borne des scores est trop faible.
+    """
+    db_copie = str(tmp_path / "corpus.db")
+    shutil.copy(DB_PATH, db_copie)
+    shutil.copy(os.path.join(DATA_DIR_PKL, "corpus_csvdiscours.pkl"), tmp_path)
+    for module in ("src.SearchEngine", "src.CorpusMatriceManager", "src.MoteurFragmente"):
+        monkeypatch.setattr(f"{module}.DB_PATH", db_copie)
+    monkeypatch.setattr("src.CorpusMatriceManager.DATA_DIR_PKL", str(tmp_path))
+
+    gestionnaire = CorpusMatriceManager()
+    fragments = gestionnaire.creer_corpus_fragmente("discoursfragmente", ["csvdiscours"], taille_fragment=3000)
+    gestionnaire.fermer_connexion()
+    assert [fragment["n_documents"] for fragment in fragments] == [3000, 3000, 2443]
+    assert MoteurFragmente.est_fragmente("discoursfragmente") and not MoteurFragmente.est_fragmente("csvdiscours")
+
+    for ponderation in ["tfidf", "bm25"]:
+        complet = SearchEngine("csvdiscours", ponderation=ponderation)
+        fragmente = MoteurFragmente("discoursfragmente", ponderation=ponderation, fragments_ouverts=2)
+        assert fragmente.fragments_charges() == []
+        # Seul le premier fragment contient "ebola" : les autres ne sont pas ouverts
+        assert complet.search("ebola", n_resultats=15).equals(fragmente.search("ebola", n_resultats=15))
+        assert fragmente.fragments_charges() == ["discoursfragmente_0000"]
+        for requete, filtres in [("climate", {}), ("health care", {}), ("the", {"date_debut": "2015-01-01"}),
+                                 ("educat*", {}), ("helth", {}), ("government AND NOT trump", {}),
+                                 ("we are going", {"expression_exacte": False})]:
+            assert complet.search(requete, n_resultats=15, **filtres).equals(
+                fragmente.search(requete, n_resultats=15, **filtres)), (ponderation, requete)
+        for requete in ["climate", "health care", "educat*", "we are going"]:
+            bornes = fragmente.bornes_fragments(requete)
+            for rang in range(len(fragmente)):
+                _, scores = fragmente.fragment(rang).calculer_scores(requete)
+                assert bornes[rang] >= scores.max(initial=0), (ponderation, requete, rang)
+        assert len(fragmente.fragments_charges()) == 2
+
+    # Interface commune avec SearchEngine, jusqu'à l'application qui prend ses moteurs dans le registre
+    complet = SearchEngine("csvdiscours")
+    registre = RegistreMoteurs()
+    try:
+        fragmente = registre.obtenir("discoursfragmente")
+        assert isinstance(fragmente, MoteurFragmente)
+        assert fragmente.suggestion("helth care") == complet.suggestion("helth care") == "health care"
+        assert StreamlitApp().suggestion_requete(["discoursfragmente"], "helth care") == "health care"
+        requetes = ["health care", "the", "helth", "government AND NOT trump", "zzzzqx"]
+        for attendu, obtenu in zip(complet.search_batch(requetes, k=15), fragmente.search_batch(requetes, k=15)):
+            assert np.array_equal(attendu[0], obtenu[0]) and np.array_equal(attendu[1], obtenu[1])
+        with pytest.raises(ValueError):
+            fragmente.search_page("health care")
+    finally:
+        registre.invalider("discoursfragmente")
+
+
+def test_ajout_documents_index_fragmente(tmp_path, monkeypatch):
+    """
+    Teste l'ajout de documents par petits paquets à un index fragmenté : les petits segments sont fusionnés
+    par niveaux de taille, et les résultats sont ceux de l'index construit en une fois sur les mêmes documents.
+    """
+    db_copie = str(tmp_path / "corpus.db")
+    shutil.copy(DB_PATH, db_copie)
+    for nom_source in ["RedditArxivhealth", "csvdiscours"]:
+        shutil.copy(os.path.join(DATA_DIR_PKL, f"corpus_{nom_source}.pkl"), tmp_path)
+    for module in ("src.SearchEngine", "src.CorpusMatriceManager", "src.MoteurFragmente"):
+        monkeypatch.setattr(f"{module}.DB_PATH", db_copie)
+    monkeypatch.setattr("src.CorpusMatriceManager.DATA_DIR_PKL", str(tmp_path))
+
+    gestionnaire = CorpusMatriceManager()
+    gestionnaire.creer_corpus_fragmente("complet", ["RedditArxivhealth", "csvdiscours"], taille_fragment=3000)
+    gestionnaire.creer_corpus_fragmente("incremental", ["RedditArxivhealth"], taille_fragment=3000)
+    documents = list(Corpus.load(os.path.join(DATA_DIR_PKL, "corpus_csvdiscours.pkl")).id2doc.values())
+    gestionnaire.ajouter_documents("incremental", documents[:8000], "csvdiscours", en_arriere_plan=False,
+                                   taille_fragment=3000)
+    for debut in range(8000, len(documents), 10):
+        fil = gestionnaire.ajouter_documents("incremental", documents[debut:debut + 10], "csvdiscours",
+                                             taille_fragment=3000)
+        if fil is not None:
+            fil.join()
+    gestionnaire.fermer_connexion()
+
+    # 44 paquets de 10 documents : quatre segments consécutifs de même niveau sont fusionnés (10, 40 puis 160 documents)
+    fragments = MoteurFragmente.lire_manifeste("incremental")
+    premiers = [premier_document for _, premier_document, _ in fragments]
+    assert premiers == [0, 100, 3100, 6100, 8100, 8260, 8420, 8460, 8500, 8540]
+    # L'index positionnel d'un petit segment ne contient que les mots de ses documents
+    with open(tmp_path / f"positions_{fragments[-1][0]}.pkl", 'rb') as f:
+        positions = pickle.load(f)
+    assert 0 < len(positions.termes) == len(np.unique(positions.termes)) < positions.n_termes // 10
+    assert os.path.getsize(tmp_path / f"positions_{fragments[-1][0]}.pkl") < 100_000
+    assert not os.path.exists(tmp_path / "matriceTF_incremental_0004.csr")  # premier paquet de 10, fusionné
+    with open(tmp_path / "corrections_complet.pkl", 'rb') as f:
+        complet = pickle.load(f)
+    with open(tmp_path / "corrections_incremental.pkl", 'rb') as f:
+        incremental = pickle.load(f)
+    assert np.array_equal(complet.cles, incremental.cles) and np.array_equal(complet.termes, incremental.termes)
+
+    for ponderation in ["tfidf", "bm25"]:
+        moteur_complet = MoteurFragmente("complet", ponderation=ponderation)
+        moteur_incremental = MoteurFragmente("incremental", ponderation=ponderation)
+        for requete, filtres in [("climate", {}), ("health care", {}), ("vaccine", {"noms_corpus": ["RedditArxivhealth"]}),
+                                 ("the", {"date_debut": "2015-01-01"}), ("educat*", {}), ("helth", {}),
+                                 ("we are going", {"expression_exacte": False}), ("we are going", {}), ("*tion of", {})]:
+            assert moteur_complet.search(requete, n_resultats=15, **filtres).equals(
+                moteur_incremental.search(requete, n_resultats=15, **filtres)), (ponderation, requete)